@@ -0,0 +1,70 @@
+"""Add indexes for browsing the catalog by category
+
+Revision ID: a6e2c8f4d0b7
+Revises: f2d6b8e4a0c3
+Create Date: 2026-10-18 16:21:05.274418
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a6e2c8f4d0b7"
+down_revision: Union[str, None] = "f2d6b8e4a0c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Страница категории читается по индексу с позиции курсора (name, id) без сортировки.
+        op.create_index(
+            "idx_parts_category_id_name",
+            "parts",
+            ["category_id", "name", "part_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_products_category_id_name",
+            "products",
+            ["category_id", "name", "product_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_part_category_base_categoty_id",
+            "part_category",
+            ["base_categoty_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_product_category_base_categoty_id",
+            "product_category",
+            ["base_categoty_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_product_category_base_categoty_id",
+            table_name="product_category",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "idx_part_category_base_categoty_id",
+            table_name="part_category",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "idx_products_category_id_name", table_name="products", postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index("idx_parts_category_id_name", table_name="parts", postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,55 @@
+"""Add parsed part compatibility index and user cars lookup index
+
+Revision ID: b8d4f0a2c6e1
+Revises: a6e2c8f4d0b7
+Create Date: 2026-10-18 17:02:44.615230
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d4f0a2c6e1"
+down_revision: Union[str, None] = "a6e2c8f4d0b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "part_compatibility",
+        sa.Column("compatibility_id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column("part_id", sa.String(), nullable=False),
+        sa.Column("make", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=True),
+        sa.Column("year_from", sa.Integer(), nullable=True),
+        sa.Column("year_to", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["part_id"], ["parts.part_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("compatibility_id"),
+    )
+    op.create_index("idx_part_compatibility_part_id", "part_compatibility", ["part_id"])
+    op.create_index("idx_part_compatibility_vehicle", "part_compatibility", ["make", "model"])
+    # Индекс заполняется командой `python -m zapchastimira.tools.rebuild_compatibility`.
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_user_cars_user_id",
+            "user_cars",
+            ["user_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_user_cars_user_id", table_name="user_cars", postgresql_concurrently=True, if_exists=True)
+    op.drop_index("idx_part_compatibility_vehicle", table_name="part_compatibility")
+    op.drop_index("idx_part_compatibility_part_id", table_name="part_compatibility")
+    op.drop_table("part_compatibility")
@@ -0,0 +1,74 @@
+"""Restore search indexes and add user lookup indexes
+
+Revision ID: c3a9e4d1b7f2
+Revises: 9669d6587903
+Create Date: 2026-10-18 09:12:40.118254
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3a9e4d1b7f2"
+down_revision: Union[str, None] = "9669d6587903"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицы, но не может выполняться в транзакции.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_parts_search_vector",
+            "parts",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_products_search_vector",
+            "products",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_parts_part_number_trgm",
+            "parts",
+            ["part_number"],
+            postgresql_using="gin",
+            postgresql_ops={"part_number": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_user_tg_uid",
+            "user",
+            ["tg_uid"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_user_phone",
+            "user",
+            ["phone"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("idx_user_phone", table_name="user", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("idx_user_tg_uid", table_name="user", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("idx_parts_part_number_trgm", table_name="parts", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("idx_products_search_vector", table_name="products", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("idx_parts_search_vector", table_name="parts", postgresql_concurrently=True, if_exists=True)
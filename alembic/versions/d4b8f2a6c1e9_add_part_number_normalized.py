@@ -0,0 +1,73 @@
+"""Add normalized part number column for article lookups
+
+Revision ID: d4b8f2a6c1e9
+Revises: c3a9e4d1b7f2
+Create Date: 2026-10-18 11:04:27.530912
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b8f2a6c1e9"
+down_revision: Union[str, None] = "c3a9e4d1b7f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "parts",
+        sa.Column(
+            "part_number_normalized",
+            sa.String(),
+            sa.Computed("upper(regexp_replace(part_number, '[^[:alnum:]]', '', 'g'))", persisted=True),
+            nullable=False,
+        ),
+    )
+
+    with op.get_context().autocommit_block():
+        # text_pattern_ops обслуживает и точное сравнение, и поиск по префиксу (LIKE 'AB00%').
+        op.create_index(
+            "idx_parts_part_number_normalized",
+            "parts",
+            ["part_number_normalized"],
+            postgresql_ops={"part_number_normalized": "text_pattern_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "idx_parts_part_number_normalized_trgm",
+            "parts",
+            ["part_number_normalized"],
+            postgresql_using="gin",
+            postgresql_ops={"part_number_normalized": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Нечеткий поиск по артикулу теперь идет по part_number_normalized, индекс по part_number не нужен.
+        op.drop_index("idx_parts_part_number_trgm", table_name="parts", postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_parts_part_number_trgm",
+            "parts",
+            ["part_number"],
+            postgresql_using="gin",
+            postgresql_ops={"part_number": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "idx_parts_part_number_normalized_trgm", table_name="parts", postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            "idx_parts_part_number_normalized", table_name="parts", postgresql_concurrently=True, if_exists=True
+        )
+    op.drop_column("parts", "part_number_normalized")
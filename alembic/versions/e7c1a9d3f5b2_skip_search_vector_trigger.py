@@ -0,0 +1,62 @@
+"""Allow bulk imports to skip the product search vector trigger
+
+Revision ID: e7c1a9d3f5b2
+Revises: d4b8f2a6c1e9
+Create Date: 2026-10-18 13:21:05.774310
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7c1a9d3f5b2"
+down_revision: Union[str, None] = "d4b8f2a6c1e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VECTOR_BODY = """
+            NEW.search_vector = to_tsvector(
+                'simple',
+                COALESCE(NEW.name, '') || ' ' ||
+                COALESCE(NEW.description, '') || ' ' ||
+                COALESCE((SELECT name FROM product_category WHERE category_id = NEW.category_id), '') || ' ' ||
+                COALESCE(
+                    (
+                        SELECT c.name
+                        FROM categories c JOIN product_category s ON c.category_id = s.category_id
+                        WHERE s.category_id = NEW.category_id
+                    ), '')
+            );
+            RETURN NEW;
+"""
+
+
+def upgrade() -> None:
+    # Импорт каталога включает zapchastimira.skip_search_vector на время транзакции
+    # и записывает вектор сам, одним выражением на пакет строк.
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION update_product_search_vector() RETURNS TRIGGER AS $$
+        BEGIN
+            IF current_setting('zapchastimira.skip_search_vector', true) = 'on' THEN
+                RETURN NEW;
+            END IF;
+{VECTOR_BODY}
+        END;
+        $$ LANGUAGE plpgsql;
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION update_product_search_vector() RETURNS TRIGGER AS $$
+        BEGIN
+{VECTOR_BODY}
+        END;
+        $$ LANGUAGE plpgsql;
+    """
+    )
@@ -0,0 +1,234 @@
+"""Maintain weighted search vectors for parts and products with triggers
+
+Revision ID: f2d6b8e4a0c3
+Revises: e7c1a9d3f5b2
+Create Date: 2026-10-18 15:47:12.903128
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2d6b8e4a0c3"
+down_revision: Union[str, None] = "e7c1a9d3f5b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Названия категории и базовой категории хранятся в строке, чтобы триггеру не нужны были подзапросы.
+    op.add_column("parts", sa.Column("category_path", sa.String(), nullable=True))
+    op.add_column("products", sa.Column("category_path", sa.String(), nullable=True))
+
+    # Вектор строится одной функцией в триггерах, импорте и пересборке (zapchastimira.services.search_vector).
+    # Названия и описания индексируются и без стемминга, и со стеммингом, чтобы работали SEARCH_TS_CONFIG=simple
+    # и SEARCH_TS_CONFIG=russian. Артикул индексируется как есть и без разделителей.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION part_search_vector(
+            part_number text, name text, brand text, compatibility text, description text, category_path text
+        ) RETURNS tsvector LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT
+                setweight(
+                    to_tsvector(
+                        'simple',
+                        coalesce(part_number, '') || ' '
+                        || regexp_replace(coalesce(part_number, ''), '[^[:alnum:]]', '', 'g')
+                    )
+                    || to_tsvector('simple', coalesce(name, ''))
+                    || to_tsvector('russian', coalesce(name, '')),
+                    'A'
+                )
+                || setweight(to_tsvector('simple', coalesce(brand, '')), 'B')
+                || setweight(
+                    to_tsvector('simple', coalesce(compatibility, ''))
+                    || to_tsvector('simple', coalesce(category_path, ''))
+                    || to_tsvector('russian', coalesce(category_path, '')),
+                    'C'
+                )
+                || setweight(
+                    to_tsvector('simple', coalesce(description, ''))
+                    || to_tsvector('russian', coalesce(description, '')),
+                    'D'
+                )
+        $$;
+
+        CREATE OR REPLACE FUNCTION product_search_vector(
+            name text, description text, category_path text
+        ) RETURNS tsvector LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+            SELECT
+                setweight(to_tsvector('simple', coalesce(name, '')) || to_tsvector('russian', coalesce(name, '')), 'A')
+                || setweight(
+                    to_tsvector('simple', coalesce(category_path, ''))
+                    || to_tsvector('russian', coalesce(category_path, '')),
+                    'C'
+                )
+                || setweight(
+                    to_tsvector('simple', coalesce(description, ''))
+                    || to_tsvector('russian', coalesce(description, '')),
+                    'D'
+                )
+        $$;
+
+        CREATE OR REPLACE FUNCTION part_category_path(category_id text) RETURNS text LANGUAGE sql STABLE AS $$
+            SELECT concat_ws(' ', pc.name, c.name)
+            FROM part_category pc LEFT JOIN categories c ON c.category_id = pc.base_categoty_id
+            WHERE pc.category_id = $1
+        $$;
+
+        CREATE OR REPLACE FUNCTION product_category_path(category_id text) RETURNS text LANGUAGE sql STABLE AS $$
+            SELECT concat_ws(' ', pc.name, c.name)
+            FROM product_category pc LEFT JOIN categories c ON c.category_id = pc.base_categoty_id
+            WHERE pc.category_id = $1
+        $$;
+    """
+    )
+
+    # Категория читается только при вставке и смене категории; остальные обновления используют category_path.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_part_search_vector() RETURNS TRIGGER AS $$
+        BEGIN
+            IF current_setting('zapchastimira.skip_search_vector', true) = 'on' THEN
+                RETURN NEW;
+            END IF;
+            IF TG_OP = 'INSERT' OR NEW.category_id IS DISTINCT FROM OLD.category_id OR NEW.category_path IS NULL THEN
+                NEW.category_path = part_category_path(NEW.category_id);
+            END IF;
+            NEW.search_vector = part_search_vector(
+                NEW.part_number, NEW.name, NEW.brand, NEW.compatibility, NEW.description, NEW.category_path
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION update_product_search_vector() RETURNS TRIGGER AS $$
+        BEGIN
+            IF current_setting('zapchastimira.skip_search_vector', true) = 'on' THEN
+                RETURN NEW;
+            END IF;
+            IF TG_OP = 'INSERT' OR NEW.category_id IS DISTINCT FROM OLD.category_id OR NEW.category_path IS NULL THEN
+                NEW.category_path = product_category_path(NEW.category_id);
+            END IF;
+            NEW.search_vector = product_search_vector(NEW.name, NEW.description, NEW.category_path);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS products_search_vector_update ON products;
+
+        -- Триггеры срабатывают только при изменении индексируемых колонок: цена и остаток вектор не трогают.
+        CREATE TRIGGER parts_search_vector_update
+        BEFORE INSERT OR UPDATE OF part_number, name, brand, compatibility, description, category_id, category_path
+        ON parts FOR EACH ROW EXECUTE FUNCTION update_part_search_vector();
+
+        CREATE TRIGGER products_search_vector_update
+        BEFORE INSERT OR UPDATE OF name, description, category_id, category_path
+        ON products FOR EACH ROW EXECUTE FUNCTION update_product_search_vector();
+    """
+    )
+
+    # Переименование категории обновляет category_path одним запросом, что пересобирает векторы ее строк.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_part_category_path() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE parts SET category_path = part_category_path(NEW.category_id)
+            WHERE category_id = NEW.category_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION update_product_category_path() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE products SET category_path = product_category_path(NEW.category_id)
+            WHERE category_id = NEW.category_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE OR REPLACE FUNCTION update_base_category_path() RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE parts SET category_path = part_category_path(parts.category_id)
+            FROM part_category pc
+            WHERE pc.base_categoty_id = NEW.category_id AND parts.category_id = pc.category_id;
+            UPDATE products SET category_path = product_category_path(products.category_id)
+            FROM product_category pc
+            WHERE pc.base_categoty_id = NEW.category_id AND products.category_id = pc.category_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER part_category_path_update
+        AFTER UPDATE OF name, base_categoty_id ON part_category
+        FOR EACH ROW
+        WHEN (OLD.name IS DISTINCT FROM NEW.name OR OLD.base_categoty_id IS DISTINCT FROM NEW.base_categoty_id)
+        EXECUTE FUNCTION update_part_category_path();
+
+        CREATE TRIGGER product_category_path_update
+        AFTER UPDATE OF name, base_categoty_id ON product_category
+        FOR EACH ROW
+        WHEN (OLD.name IS DISTINCT FROM NEW.name OR OLD.base_categoty_id IS DISTINCT FROM NEW.base_categoty_id)
+        EXECUTE FUNCTION update_product_category_path();
+
+        CREATE TRIGGER base_category_path_update
+        AFTER UPDATE OF name ON categories
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION update_base_category_path();
+    """
+    )
+    # Существующие векторы пересобираются отдельно и пакетами:
+    # python -m zapchastimira.tools.rebuild_search_vectors
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        DROP TRIGGER IF EXISTS base_category_path_update ON categories;
+        DROP TRIGGER IF EXISTS product_category_path_update ON product_category;
+        DROP TRIGGER IF EXISTS part_category_path_update ON part_category;
+        DROP FUNCTION IF EXISTS update_base_category_path();
+        DROP FUNCTION IF EXISTS update_product_category_path();
+        DROP FUNCTION IF EXISTS update_part_category_path();
+
+        DROP TRIGGER IF EXISTS parts_search_vector_update ON parts;
+        DROP TRIGGER IF EXISTS products_search_vector_update ON products;
+        DROP FUNCTION IF EXISTS update_part_search_vector();
+
+        CREATE OR REPLACE FUNCTION update_product_search_vector() RETURNS TRIGGER AS $$
+        BEGIN
+            IF current_setting('zapchastimira.skip_search_vector', true) = 'on' THEN
+                RETURN NEW;
+            END IF;
+            NEW.search_vector = to_tsvector(
+                'simple',
+                COALESCE(NEW.name, '') || ' ' ||
+                COALESCE(NEW.description, '') || ' ' ||
+                COALESCE((SELECT name FROM product_category WHERE category_id = NEW.category_id), '') || ' ' ||
+                COALESCE(
+                    (
+                        SELECT c.name
+                        FROM categories c JOIN product_category s ON c.category_id = s.category_id
+                        WHERE s.category_id = NEW.category_id
+                    ), '')
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER products_search_vector_update
+        BEFORE INSERT OR UPDATE ON products
+        FOR EACH ROW EXECUTE FUNCTION update_product_search_vector();
+
+        DROP FUNCTION IF EXISTS product_category_path(text);
+        DROP FUNCTION IF EXISTS part_category_path(text);
+        DROP FUNCTION IF EXISTS product_search_vector(text, text, text);
+        DROP FUNCTION IF EXISTS part_search_vector(text, text, text, text, text, text);
+    """
+    )
+    op.drop_column("products", "category_path")
+    op.drop_column("parts", "category_path")
@@ -0,0 +1,144 @@
+"""
+Нагрузочное сравнение синхронного и асинхронного доступа к базе данных.
+
+Выполняет `--requests` поисков по каталогу (`CatalogSearchRepository.search`,
+без кэша) с `--concurrency` одновременными запросами двумя способами:
+
+- `sync` — пул потоков и синхронный движок (psycopg2), поток на каждый одновременный
+  запрос, транзакция `unit_of_work`;
+- `async` — задачи одного цикла событий и асинхронный движок (asyncpg), транзакция
+  `async_unit_of_work` (`zapchastimira.repositories.aio`).
+
+Оба движка берут размер пула из `POSTGRES_POOL_SIZE` и `POSTGRES_MAX_OVERFLOW`.
+`--db-latency` добавляет к каждому запросу `pg_sleep` в той же транзакции, чтобы
+смоделировать сетевую задержку до удаленной базы. Для каждого способа выводит
+скорость, задержки, максимальное количество потоков и ожидание соединений из пула.
+
+Примеры:
+    python -m benchmarks.async_db_load
+    POSTGRES_POOL_SIZE=10 POSTGRES_MAX_OVERFLOW=0 python -m benchmarks.async_db_load --concurrency 500 \\
+        --db-latency 0.005
+"""
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlalchemy as sa
+
+from zapchastimira.common.db_utils import dispose_async_engines, get_pool_metrics, get_sessionmaker
+from zapchastimira.repositories.aio import run_sync
+from zapchastimira.repositories.base import current_unit_of_work, unit_of_work
+from zapchastimira.repositories.search import CatalogSearchRepository, SearchHit
+from zapchastimira.services.search_service import normalize_query
+
+QUERIES = ["фильтр", "колодки", "диск", "масляный", "тормозной", "фильтр масляный", "колодки тормозные"]
+
+
+class PeakThreads:
+    """Фоновый замер максимального количества потоков процесса."""
+
+    def __init__(self) -> None:
+        self.peak = threading.active_count()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "PeakThreads":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+
+def handle_request(repository: CatalogSearchRepository, query: str, limit: int, latency: float) -> list[SearchHit]:
+    # Выполняется в транзакции текущей единицы работы: синхронной или асинхронной.
+    if latency > 0:
+        current_unit_of_work().session.execute(sa.select(sa.func.pg_sleep(latency)))
+    return repository.search(normalize_query(query), limit)
+
+
+def run_sync_mode(
+    repository: CatalogSearchRepository, queries: list[str], args: argparse.Namespace
+) -> tuple[list[float], dict]:
+    latencies: list[float] = []
+
+    def task(query: str) -> None:
+        started = time.perf_counter()
+        with unit_of_work():
+            handle_request(repository, query, args.limit, args.db_latency)
+        latencies.append(time.perf_counter() - started)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(task, queries))
+    return latencies, get_pool_metrics()
+
+
+async def run_async_mode(
+    repository: CatalogSearchRepository, queries: list[str], args: argparse.Namespace
+) -> tuple[list[float], dict]:
+    latencies: list[float] = []
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def task(query: str) -> None:
+        async with slots:
+            started = time.perf_counter()
+            await run_sync(handle_request, repository, query, args.limit, args.db_latency)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(task(query) for query in queries))
+    # Пул asyncpg закрывается до остановки цикла событий, метрики снимаются перед этим.
+    pools = get_pool_metrics()
+    await dispose_async_engines()
+    return latencies, pools
+
+
+def report(mode: str, latencies: list[float], elapsed: float, threads: int, pools: dict) -> None:
+    latencies.sort()
+    print(
+        f"{mode:>5}: {len(latencies)} requests in {elapsed:.2f} s ({len(latencies) / elapsed:.0f} req/s), "
+        f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms, peak threads {threads}"
+    )
+    for dsn, stats in pools.items():
+        if dsn.startswith("postgresql+asyncpg" if mode == "async" else "postgresql://"):
+            print(
+                f"{'':>7}{dsn.split('://')[0]}: pool size {stats['size']}, "
+                f"{stats['checkouts']} checkouts, wait avg {stats['wait_avg'] * 1000:.1f} ms, "
+                f"max {stats['wait_max'] * 1000:.1f} ms"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение синхронного и асинхронного доступа к базе данных")
+    parser.add_argument("--requests", type=int, default=2000, help="Количество поисковых запросов")
+    parser.add_argument("--concurrency", type=int, default=200, help="Количество одновременных запросов")
+    parser.add_argument("--limit", type=int, default=6, help="Размер выборки на запрос")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="Добавочная задержка запроса в секундах")
+    parser.add_argument("--mode", choices=["sync", "async"], action="append", help="Способ доступа")
+    args = parser.parse_args()
+
+    repository = CatalogSearchRepository(sessionmaker=get_sessionmaker())
+    queries = list(itertools.islice(itertools.cycle(QUERIES), args.requests))
+    for mode in args.mode or ["sync", "async"]:
+        with PeakThreads() as threads:
+            started = time.perf_counter()
+            if mode == "sync":
+                latencies, pools = run_sync_mode(repository, queries, args)
+            else:
+                latencies, pools = asyncio.run(run_async_mode(repository, queries, args))
+            elapsed = time.perf_counter() - started
+        report(mode, latencies, elapsed, threads.peak, pools)
+
+
+if __name__ == "__main__":
+    main()
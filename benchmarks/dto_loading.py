@@ -0,0 +1,112 @@
+"""
+Замер загрузки DTO в `PartRepository.get_all` и `ProductRepository.get_all`.
+
+Сравнивает прежний способ (`SELECT` целой ORM-сущности, включая `search_vector`,
+и копирование полей в DTO с `__dict__`) с текущим: выбор только колонок DTO и
+построение `__slots__`-DTO прямо из строк результата. Для каждого способа
+выводит время, пиковую память и память, занятую результатом, в пересчете на
+10 000 строк.
+
+Примеры:
+    python -m benchmarks.dto_loading --query масло
+    python -m benchmarks.dto_loading --kind parts --query фильтр --repeat 20
+"""
+
+import argparse
+import dataclasses
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable
+
+import sqlalchemy as sa
+
+from zapchastimira.common import tables
+from zapchastimira.common.search_query import parse_query
+from zapchastimira.repositories.base import BaseRepository, RepositoryDTO
+from zapchastimira.repositories.part import part_repository
+from zapchastimira.repositories.product import product_repository
+
+PER_ROWS = 10_000
+
+
+def dict_dto_class(dto_class: type[RepositoryDTO]) -> type:
+    # Копия DTO без __slots__, как до перехода на slots=True.
+    fields: list[tuple[Any, ...]] = []
+    for field in dataclasses.fields(dto_class):
+        if field.default is dataclasses.MISSING:
+            fields.append((field.name, field.type))
+        else:
+            fields.append((field.name, field.type, dataclasses.field(default=field.default)))
+    return dataclasses.make_dataclass(dto_class.__name__, fields, kw_only=True)
+
+
+def entity_loader(repository: BaseRepository, model: type[tables.Base]) -> Callable[[str], list[Any]]:
+    dto_class = dict_dto_class(repository.dto_class)
+    # Поле DTO -> атрибут сущности (у `page_url` запчасти это `image_url`).
+    attributes = {column.name: getattr(column, "element", column).key for column in repository.columns}
+
+    def load(query: str) -> list[Any]:
+        parsed = parse_query(query)
+        stmt = sa.select(model).where(model.search_vector.op("@@")(sa.func.to_tsquery(parsed.config, parsed.tsquery)))
+        with repository.sessionmaker() as session:
+            return [
+                dto_class(**{name: getattr(entity, attribute) for name, attribute in attributes.items()})
+                for entity in session.execute(stmt).scalars().all()
+            ]
+
+    return load
+
+
+def projected_loader(repository: BaseRepository) -> Callable[[str], list[Any]]:
+    def load(query: str) -> list[Any]:
+        return repository.get_all(query)[0]
+
+    return load
+
+
+def measure(load: Callable[[str], list[Any]], query: str, repeat: int) -> tuple[int, float, int, int]:
+    load(query)
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        rows = load(query)
+        timings.append(time.perf_counter() - started)
+        del rows
+
+    gc.collect()
+    tracemalloc.start()
+    rows = load(query)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(rows), statistics.median(timings), peak, retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замер загрузки DTO из репозиториев каталога")
+    parser.add_argument("--kind", choices=["parts", "products"], action="append", help="Что замерить; по умолчанию все")
+    parser.add_argument("--query", required=True, help="Поисковый запрос, передаваемый в get_all")
+    parser.add_argument("--repeat", type=int, default=10, help="Сколько раз повторить загрузку для замера времени")
+    args = parser.parse_args()
+
+    repositories = {"parts": (part_repository, tables.Part), "products": (product_repository, tables.Product)}
+    for kind in args.kind or list(repositories):
+        repository, model = repositories[kind]
+        for name, load in (
+            ("entity", entity_loader(repository, model)),
+            ("columns", projected_loader(repository)),
+        ):
+            rows, elapsed, peak, retained = measure(load, args.query, args.repeat)
+            if not rows:
+                parser.error(f"запрос {args.query!r} не нашел ни одной строки в {kind}")
+            scale = PER_ROWS / rows
+            print(
+                f"{kind:>8} {name:>7}: {rows} rows, per {PER_ROWS} rows: {elapsed * scale * 1000:.1f} ms, "
+                f"peak {peak * scale / 1024 / 1024:.1f} MiB, retained {retained * scale / 1024 / 1024:.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Локальная заглушка Telegram Bot API для замеров без обращения к Telegram.
+
+Запуск:
+    python -m benchmarks.fake_bot_api --port 8081
+
+Бот подключается к заглушке через `TELEGRAM_API_URL=http://127.0.0.1:8081/bot{0}/{1}`.
+Статистика отправленных сообщений доступна по `GET /stats`.
+
+С `--limits` заглушка, как Telegram, отвечает `429 Too Many Requests` с `retry_after`,
+если бот отправляет больше `--rate` сообщений в секунду всего или больше `--chat-rate`
+сообщений в секунду в один чат.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs
+
+from zapchastimira.interface.outbound import TokenBucket
+
+JITTER = 0.05
+
+
+class RateLimits:
+    def __init__(self, rate: float, chat_rate: float, chat_burst: int):
+        self.rate = rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.total = TokenBucket(rate, rate, time.monotonic())
+        self.chats: dict[str, TokenBucket] = {}
+
+    def check(self, chat_id: str) -> float:
+        # Возвращает retry_after в секундах или 0, если отправка разрешена.
+        now = time.monotonic()
+        chat = self.chats.setdefault(chat_id, TokenBucket(self.chat_rate, self.chat_burst, now))
+        wait = max(self.total.delay(now), chat.delay(now))
+        # Допуск на разницу между временем отправки запроса ботом и временем его приема.
+        if wait > JITTER:
+            return wait
+        self.total.take(now)
+        chat.take(now)
+        return 0.0
+
+
+class FakeBotApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], limits: RateLimits | None = None):
+        super().__init__(address, FakeBotApiHandler)
+        self.lock = threading.Lock()
+        self.limits = limits
+        self.calls: dict[str, int] = {}
+        self.rate_limited = 0
+        self.message_id = 0
+        self.first_call: float | None = None
+        self.last_call: float | None = None
+
+    def check_limits(self, chat_id: str) -> float:
+        if self.limits is None:
+            return 0.0
+        with self.lock:
+            wait = self.limits.check(chat_id)
+            if wait > 0:
+                self.rate_limited += 1
+            return wait
+
+    def record(self, method: str) -> int:
+        with self.lock:
+            now = time.perf_counter()
+            self.first_call = self.first_call or now
+            self.last_call = now
+            self.calls[method] = self.calls.get(method, 0) + 1
+            self.message_id += 1
+            return self.message_id
+
+    def stats(self) -> dict[str, Any]:
+        with self.lock:
+            elapsed = (self.last_call - self.first_call) if self.first_call and self.last_call else 0.0
+            return {"calls": dict(self.calls), "rate_limited": self.rate_limited, "elapsed": elapsed}
+
+
+class FakeBotApiHandler(BaseHTTPRequestHandler):
+    server: FakeBotApiServer
+
+    def do_GET(self) -> None:
+        if self.path == "/stats":
+            self._json(self.server.stats())
+            return
+        self._api_call()
+
+    def do_POST(self) -> None:
+        self._api_call()
+
+    def _api_call(self) -> None:
+        method = self.path.rstrip("/").rsplit("/", 1)[-1].split("?", 1)[0]
+        params = self._params()
+        if method.startswith("send"):
+            wait = self.server.check_limits(params.get("chat_id", ""))
+            if wait > 0:
+                retry_after = max(1, round(wait))
+                self._json(
+                    {
+                        "ok": False,
+                        "error_code": 429,
+                        "description": f"Too Many Requests: retry after {retry_after}",
+                        "parameters": {"retry_after": retry_after},
+                    },
+                    status=429,
+                )
+                return
+        message_id = self.server.record(method)
+
+        result: Any = True
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "fake", "username": "fake_bot"}
+        elif method.startswith("send") or method.startswith("edit"):
+            result = {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(params.get("chat_id", 0)), "type": "private"},
+                "text": params.get("text", ""),
+            }
+        elif method == "getUpdates":
+            result = []
+        self._json({"ok": True, "result": result})
+
+    def _params(self) -> dict[str, str]:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        if "?" in self.path:
+            body = body + "&" + self.path.split("?", 1)[1] if body else self.path.split("?", 1)[1]
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            return {key: str(value) for key, value in json.loads(body or "{}").items()}
+        return {key: values[-1] for key, values in parse_qs(body).items()}
+
+    def _json(self, payload: Any, status: int = 200) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Заглушка Telegram Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--limits", action="store_true", help="Отвечать 429 при превышении лимитов Telegram")
+    parser.add_argument("--rate", type=float, default=30.0, help="Сообщений в секунду всего")
+    parser.add_argument("--chat-rate", type=float, default=1.0, help="Сообщений в секунду в один чат")
+    parser.add_argument("--chat-burst", type=int, default=3, help="Сообщений подряд в один чат без ожидания")
+    args = parser.parse_args()
+
+    limits = RateLimits(args.rate, args.chat_rate, args.chat_burst) if args.limits else None
+    server = FakeBotApiServer((args.host, args.port), limits)
+    print(f"Fake Bot API on http://{args.host}:{args.port}/bot{{0}}/{{1}}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Нагрузочная проверка отправки сообщений под лимитами Telegram.
+
+Запускает в процессе заглушку Bot API (`benchmarks.fake_bot_api`) с лимитами Telegram
+(`429 Too Many Requests` при превышении общей частоты или частоты в чат) и отправляет
+`--messages` ответов в `--chats` чатов; каждый `--batch`-й ответ в чат состоит из
+трех частей. Сравнивает два способа:
+
+- `direct` — потоки вызывают Bot API сразу, как это делали обработчики раньше;
+  ответы 429 считаются ошибками;
+- `scheduler` — сообщения отправляет `zapchastimira.interface.outbound.OutboundScheduler`.
+
+Для каждого способа выводит время, скорость отправки, количество ответов 429,
+повторов и недоставленных сообщений, а также задержку доставки по приоритетам.
+
+Примеры:
+    python -m benchmarks.outbound_load
+    python -m benchmarks.outbound_load --messages 600 --chats 100 --mode scheduler
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+
+import telebot
+from telebot import apihelper
+
+from benchmarks.fake_bot_api import FakeBotApiServer, RateLimits
+from zapchastimira.interface.outbound import OutboundScheduler, Priority
+
+
+def plan(messages: int, chats: int, batch: int) -> list[tuple[int, int, Priority]]:
+    # (чат, количество частей, приоритет); каждый batch-й ответ в чат состоит из трех частей.
+    jobs = []
+    for i in range(messages):
+        parts = 3 if batch and i // chats % batch == 0 else 1
+        priority = Priority.HIGH if i % 4 == 0 else Priority.NORMAL
+        jobs.append((1000 + i % chats, parts, priority))
+    return jobs
+
+
+def run_direct(bot: telebot.TeleBot, jobs: list[tuple[int, int, Priority]], workers: int) -> dict:
+    latencies: dict[Priority, list[float]] = {priority: [] for priority in Priority}
+    failed = 0
+    lock = threading.Lock()
+
+    def send(chat_id: int, parts: int, priority: Priority, queued: float) -> None:
+        nonlocal failed
+        try:
+            for part in range(parts):
+                bot.send_message(chat_id, f"part {part}")
+        except apihelper.ApiTelegramException:
+            with lock:
+                failed += 1
+            return
+        with lock:
+            latencies[priority].append(time.perf_counter() - queued)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for chat_id, parts, priority in jobs:
+            executor.submit(send, chat_id, parts, priority, time.perf_counter())
+    return {"latencies": latencies, "failed": failed, "retried": 0}
+
+
+def run_scheduler(bot: telebot.TeleBot, jobs: list[tuple[int, int, Priority]], workers: int, rate: float) -> dict:
+    latencies: dict[Priority, list[float]] = {priority: [] for priority in Priority}
+    scheduler = OutboundScheduler(rate=rate, workers=workers)
+    futures: list[Future] = []
+
+    def done(priority: Priority, queued: float, future: Future) -> None:
+        if future.exception() is None:
+            latencies[priority].append(time.perf_counter() - queued)
+
+    for chat_id, parts, priority in jobs:
+        calls = [partial(bot.send_message, chat_id, f"part {part}") for part in range(parts)]
+        future = scheduler.submit_batch(chat_id, calls, priority=priority)
+        future.add_done_callback(partial(done, priority, time.perf_counter()))
+        futures.append(future)
+    wait(futures)
+    scheduler.stop()
+    stats = scheduler.stats()
+    return {"latencies": latencies, "failed": stats.failed, "retried": stats.retried}
+
+
+def report(mode: str, server: FakeBotApiServer, result: dict, elapsed: float) -> None:
+    stats = server.stats()
+    sent = sum(count for method, count in stats["calls"].items() if method.startswith("send"))
+    print(
+        f"{mode:>9}: {sent} sent in {elapsed:.1f} s ({sent / elapsed:.1f} msg/s), "
+        f"{stats['rate_limited']} rate limited, {result['retried']} retried, {result['failed']} failed"
+    )
+    for priority, values in result["latencies"].items():
+        if values:
+            values.sort()
+            print(
+                f"{'':>11}{priority.name.lower():>6}: p50 {statistics.median(values):.2f} s, "
+                f"p95 {values[int(len(values) * 0.95) - 1]:.2f} s, max {values[-1]:.2f} s"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочная проверка отправки сообщений под лимитами Telegram")
+    parser.add_argument("--messages", type=int, default=300, help="Количество ответов")
+    parser.add_argument("--chats", type=int, default=50, help="Количество чатов")
+    parser.add_argument("--batch", type=int, default=5, help="Каждый какой ответ в чат из трех частей (0 — нет)")
+    parser.add_argument("--workers", type=int, default=8, help="Количество потоков отправки")
+    parser.add_argument("--rate", type=float, default=30.0, help="Лимит заглушки, сообщений в секунду всего")
+    parser.add_argument("--chat-rate", type=float, default=1.0, help="Лимит заглушки, сообщений в секунду в чат")
+    parser.add_argument("--chat-burst", type=int, default=3, help="Сообщений подряд в чат без ожидания")
+    parser.add_argument("--mode", choices=["direct", "scheduler"], action="append", help="Способ отправки")
+    args = parser.parse_args()
+
+    jobs = plan(args.messages, args.chats, args.batch)
+    for mode in args.mode or ["direct", "scheduler"]:
+        server = FakeBotApiServer(("127.0.0.1", 0), RateLimits(args.rate, args.chat_rate, args.chat_burst))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        apihelper.API_URL = f"http://127.0.0.1:{server.server_address[1]}/bot{{0}}/{{1}}"
+        bot = telebot.TeleBot("1:benchmark", threaded=False)
+        try:
+            started = time.perf_counter()
+            if mode == "direct":
+                result = run_direct(bot, jobs, args.workers)
+            else:
+                result = run_scheduler(bot, jobs, args.workers, args.rate)
+            report(mode, server, result, time.perf_counter() - started)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
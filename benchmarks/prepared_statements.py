@@ -0,0 +1,110 @@
+"""
+Замер задержки частых запросов с подготовкой на сервере и без нее.
+
+Повторяет запросы к базе, которые выполняет обработка сообщения пользователя
+(`handle_message`): пользователь по Telegram ID, его автомобили, поиск по
+артикулу и полнотекстовый поиск, а также смену состояния (`set_state`) из
+`/search`. Репозитории создаются без кэшей, чтобы каждый вызов дошел до базы.
+Запросы выполняются по очереди в двух режимах: `plain` — как раньше, PostgreSQL
+разбирает и планирует каждый запрос; `prepared` — `PREPARE` один раз на
+соединение и `EXECUTE` дальше (`zapchastimira.repositories.prepared`). Для
+каждого запроса выводит задержку p50/p95 в обоих режимах и ускорение p50.
+
+Смена состояния записывает пользователю его текущее состояние, поэтому данные не меняются.
+
+Примеры:
+    python -m benchmarks.prepared_statements
+    python -m benchmarks.prepared_statements --iterations 5000 --query "масляный фильтр"
+"""
+
+import argparse
+import itertools
+import statistics
+import time
+from typing import Any, Callable
+
+import sqlalchemy as sa
+from sqlalchemy.orm import sessionmaker
+
+from zapchastimira.common import tables
+from zapchastimira.common.db_utils import PREPARED_STATEMENTS_OPTION, get_engine
+from zapchastimira.common.search_query import normalize_part_number
+from zapchastimira.common.settings import SearchSettings
+from zapchastimira.repositories.search import CatalogSearchRepository
+from zapchastimira.repositories.user import UserRepository
+from zapchastimira.repositories.user_cars import UserCarsRepository
+from zapchastimira.services.search_service import normalize_query
+
+MODES = {"plain": False, "prepared": True}
+
+
+def handle_message_calls(prepared: bool, args: argparse.Namespace) -> dict[str, Callable[[Any], Any]]:
+    engine = get_engine().execution_options(**{PREPARED_STATEMENTS_OPTION: prepared})
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    users = UserRepository(sessionmaker=factory)
+    user_cars = UserCarsRepository(sessionmaker=factory)
+    catalog = CatalogSearchRepository(sessionmaker=factory)
+    search_settings = SearchSettings()
+    query = normalize_query(args.query)
+    part_number = normalize_part_number(args.part_number)
+
+    return {
+        "get_user_by_telegram_id": lambda user: users.get_user_by_telegram_id(user.tg_uid),
+        "get_vehicles": lambda user: user_cars.get_vehicles(user.user_id),
+        "find_by_part_number": lambda user: catalog.find_by_part_number(
+            part_number, search_settings.page_size + 1, search_settings.part_number_similarity or None
+        ),
+        "search": lambda user: catalog.search(query, search_settings.page_size + 1),
+        "set_state": lambda user: users.set_state(user.user_id, user.state),
+    }
+
+
+def measure(calls: dict[str, Callable[[Any], Any]], users: list[sa.Row], iterations: int) -> dict[str, list[float]]:
+    latencies: dict[str, list[float]] = {name: [] for name in calls}
+    for user in itertools.islice(itertools.cycle(users), iterations):
+        for name, call in calls.items():
+            started = time.perf_counter()
+            call(user)
+            latencies[name].append(time.perf_counter() - started)
+    return latencies
+
+
+def percentile(values: list[float], share: float) -> float:
+    values = sorted(values)
+    return values[max(int(len(values) * share) - 1, 0)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение частых запросов с подготовкой на сервере и без нее")
+    parser.add_argument("--iterations", type=int, default=2000, help="Количество повторов каждого запроса")
+    parser.add_argument("--warmup", type=int, default=50, help="Повторы перед замером (подготовка, кэши)")
+    parser.add_argument("--users", type=int, default=100, help="Сколько пользователей из базы перебирать")
+    parser.add_argument("--query", default="фильтр", help="Поисковый запрос")
+    parser.add_argument("--part-number", default="AB-00001.1", help="Артикул для поиска по артикулу")
+    args = parser.parse_args()
+
+    with get_engine().connect() as connection:
+        users = connection.execute(
+            sa.select(tables.User.tg_uid, tables.User.user_id, tables.User.state).limit(args.users)
+        ).all()
+    if not users:
+        parser.error("no users in the database")
+
+    results = {}
+    for mode, prepared in MODES.items():
+        calls = handle_message_calls(prepared, args)
+        measure(calls, users, args.warmup)
+        results[mode] = measure(calls, users, args.iterations)
+
+    print(f"{'query':<26}{'plain p50':>12}{'p95':>10}{'prepared p50':>15}{'p95':>10}{'speedup':>10}")
+    for name in results["plain"]:
+        plain, prepared = results["plain"][name], results["prepared"][name]
+        print(
+            f"{name:<26}{statistics.median(plain) * 1e6:>10.0f}us{percentile(plain, 0.95) * 1e6:>8.0f}us"
+            f"{statistics.median(prepared) * 1e6:>13.0f}us{percentile(prepared, 0.95) * 1e6:>8.0f}us"
+            f"{statistics.median(plain) / statistics.median(prepared):>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Замер форматирования выдачи поиска без базы данных и Telegram.
+
+Генерирует `--count` запчастей и товаров и форматирует их двумя способами:
+прежним (pydantic-модели `OutputSearchDataPart`/`OutputSearchDataProduct`,
+`str()` и склейка строки через `+=`) и модулем `zapchastimira.interface.renderer`
+(готовые шаблоны и деление на сообщения Telegram). Для каждого способа выводит
+время форматирования, количество сообщений и длину самого длинного из них.
+
+Примеры:
+    python -m benchmarks.render_results
+    python -m benchmarks.render_results --count 1000 --description-length 2000 --repeat 50
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable
+
+from zapchastimira.interface.models import OutputSearchDataPart, OutputSearchDataProduct
+from zapchastimira.interface.renderer import MESSAGE_LIMIT, render_search_results
+from zapchastimira.repositories.search import CatalogSearchRepository, SearchHit
+
+
+def generate_hits(count: int, description_length: int) -> list[SearchHit]:
+    description = ("Описание товара " * (description_length // 16 + 1))[:description_length]
+    hits = []
+    for i in range(count):
+        if i % 2:
+            hits.append(
+                SearchHit(
+                    kind=CatalogSearchRepository.PART,
+                    item_id=f"p{i}",
+                    name=f"Фильтр масляный {i}",
+                    description=description,
+                    price=100.0 + i,
+                    stock_quantity=i % 50,
+                    page_url=None,
+                    part_number=f"AB-{i:05d}",
+                    brand="Bosch",
+                    compatibility="Kia Rio 2015-2020",
+                    rank=0.5,
+                )
+            )
+        else:
+            hits.append(
+                SearchHit(
+                    kind=CatalogSearchRepository.PRODUCT,
+                    item_id=f"t{i}",
+                    name=f"Домкрат подкатной {i}",
+                    description=description,
+                    price=2500.0 + i,
+                    stock_quantity=i % 20,
+                    page_url=f"https://example.com/{i}",
+                    part_number=None,
+                    brand=None,
+                    compatibility=None,
+                    rank=0.4,
+                )
+            )
+    return hits
+
+
+def legacy_render(hits: list[SearchHit]) -> list[str]:
+    result_answer = "Результаты поиска:\n\n"
+    for i in hits:
+        if i.kind == CatalogSearchRepository.PART:
+            tmp = OutputSearchDataPart(
+                name=i.name,
+                brand=i.brand,
+                part_number=i.part_number,
+                price=i.price,
+                stock_quantity=i.stock_quantity,
+                description=i.description,
+                url=i.page_url,
+                compatibility=i.compatibility,
+            )
+        else:
+            tmp = OutputSearchDataProduct(
+                name=i.name,
+                price=i.price,
+                stock_quantity=i.stock_quantity,
+                description=i.description,
+                url=i.page_url,
+            )
+        result_answer += str(tmp) + "\n\n"
+    result_answer += "Чтобы выйти нажмите /start"
+    return [result_answer]
+
+
+def renderer_render(hits: list[SearchHit]) -> list[str]:
+    return list(render_search_results(hits))
+
+
+def run(name: str, render: Callable[[list[SearchHit]], list[str]], hits: list[SearchHit], repeat: int) -> None:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        messages = render(hits)
+        timings.append(time.perf_counter() - started)
+    longest = max(len(message) for message in messages)
+    print(
+        f"{name:>8}: {len(hits)} results in {statistics.median(timings) * 1000:.2f} ms, "
+        f"{len(messages)} messages, longest {longest} chars"
+        + (f" (over the {MESSAGE_LIMIT} limit)" if longest > MESSAGE_LIMIT else "")
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замер форматирования выдачи поиска")
+    parser.add_argument("--count", type=int, default=1000, help="Количество результатов")
+    parser.add_argument("--description-length", type=int, default=200, help="Длина описания в символах")
+    parser.add_argument("--repeat", type=int, default=20, help="Сколько раз повторить форматирование")
+    args = parser.parse_args()
+
+    hits = generate_hits(args.count, args.description_length)
+    if "".join(renderer_render(hits)) != legacy_render(hits)[0]:
+        parser.error("renderer output differs from the legacy output")
+    run("legacy", legacy_render, hits, args.repeat)
+    run("renderer", renderer_render, hits, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Воспроизведение обновлений Telegram для замера пропускной способности webhook.
+
+Отправляет JSON-объекты `Update` на запущенный `python -m zapchastimira.interface.webhook`
+и измеряет скорость и задержку подтверждений. Если бот направлен на заглушку
+(`python -m benchmarks.fake_bot_api`), дополнительно ждет, пока бот ответит на все
+обновления, и считает сквозную пропускную способность.
+
+Примеры:
+    python -m benchmarks.replay_updates --file updates.jsonl
+    python -m benchmarks.replay_updates --generate 5000 --chats 200 --text "колодки" \\
+        --stats-url http://127.0.0.1:8081/stats
+"""
+
+import argparse
+import itertools
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
+
+
+def generate_updates(count: int, chats: int, text: str) -> Iterator[dict[str, Any]]:
+    for update_id in range(1, count + 1):
+        chat_id = 100000 + update_id % chats
+        yield {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "bench"},
+                "text": text,
+            },
+        }
+
+
+def read_updates(path: str) -> Iterator[dict[str, Any]]:
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def post_update(url: str, payload: bytes, secret: str | None) -> tuple[int, float]:
+    request = urllib.request.Request(url, data=payload, method="POST")
+    request.add_header("Content-Type", "application/json")
+    if secret:
+        request.add_header("X-Telegram-Bot-Api-Secret-Token", secret)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            status = response.status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def fetch_replies(stats_url: str) -> int:
+    with urllib.request.urlopen(stats_url, timeout=5) as response:
+        stats = json.loads(response.read())
+    return sum(count for method, count in stats["calls"].items() if method.startswith("send"))
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q) - 1] if len(values) > 1 else values[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Воспроизведение обновлений Telegram через webhook")
+    parser.add_argument("--url", default="http://127.0.0.1:8080/telegram/webhook")
+    parser.add_argument("--secret", default=None)
+    parser.add_argument("--file", help="JSONL-файл с объектами Update")
+    parser.add_argument("--generate", type=int, default=1000, help="Сколько обновлений сгенерировать")
+    parser.add_argument("--chats", type=int, default=100, help="Количество разных чатов при генерации")
+    parser.add_argument("--text", default="фильтры", help="Текст сообщений при генерации")
+    parser.add_argument("--repeat", type=int, default=1, help="Сколько раз повторить набор из файла")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--stats-url", help="Адрес /stats заглушки Bot API для замера сквозной обработки")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    if args.file:
+        updates = list(read_updates(args.file))
+        payloads = [json.dumps(update).encode() for update in itertools.chain.from_iterable([updates] * args.repeat)]
+    else:
+        payloads = [json.dumps(update).encode() for update in generate_updates(args.generate, args.chats, args.text)]
+
+    replies_before = fetch_replies(args.stats_url) if args.stats_url else 0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda payload: post_update(args.url, payload, args.secret), payloads))
+    ack_elapsed = time.perf_counter() - started
+
+    latencies = [latency for _, latency in results]
+    statuses: dict[int, int] = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print(f"updates sent:    {len(payloads)}")
+    print(f"statuses:        {statuses}")
+    print(f"ack throughput:  {len(payloads) / ack_elapsed:.1f} updates/s")
+    print(
+        "ack latency:     "
+        f"p50={percentile(latencies, 50) * 1000:.2f}ms "
+        f"p95={percentile(latencies, 95) * 1000:.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.2f}ms"
+    )
+
+    if args.stats_url:
+        expected = statuses.get(200, 0)
+        replies = 0
+        while time.perf_counter() - started < args.timeout:
+            replies = fetch_replies(args.stats_url) - replies_before
+            if replies >= expected:
+                break
+            time.sleep(0.05)
+        total_elapsed = time.perf_counter() - started
+        print(f"replies:         {replies}/{expected}")
+        print(f"end-to-end:      {replies / total_elapsed:.1f} updates/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Замер качества и скорости поиска по корпусу реальных запросов.
+
+Читает JSONL-файл (по одному объекту на строку), берет текст запроса из поля
+`--field` и выполняет поиск по каталогу двумя способами: прежним
+(`" & ".join(query.split())`) и через `parse_query`. Для каждого способа
+выводит долю запросов с непустой выдачей, количество ошибок синтаксиса
+tsquery и задержку (p50/p95/p99).
+
+Примеры:
+    python -m benchmarks.search_queries --file queries.jsonl
+    python -m benchmarks.search_queries --file requests.jsonl --field title --config russian
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, Iterator
+
+import sqlalchemy as sa
+
+from zapchastimira.common.db_utils import get_sessionmaker
+from zapchastimira.common.search_query import ParsedQuery, parse_query
+from zapchastimira.repositories.search import CatalogSearchRepository
+
+
+def read_queries(path: str, field: str) -> Iterator[str]:
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                value = json.loads(line).get(field)
+                if isinstance(value, str) and value.strip():
+                    yield value
+
+
+def legacy_query(query: str) -> ParsedQuery:
+    terms = query.split()
+    return ParsedQuery(terms=terms, tsquery=" & ".join(terms), config="simple")
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q) - 1] if len(values) > 1 else values[0]
+
+
+def run(
+    name: str,
+    queries: list[str],
+    build: Callable[[str], ParsedQuery],
+    repository: CatalogSearchRepository,
+    limit: int,
+) -> None:
+    matched = errors = 0
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        try:
+            hits = repository.search(build(query), limit)
+        except sa.exc.DBAPIError:
+            errors += 1
+            hits = []
+        latencies.append(time.perf_counter() - started)
+        matched += bool(hits)
+
+    total = len(queries)
+    print(
+        f"{name:>8}: matched {matched}/{total} ({matched / total:.1%}), errors {errors}, "
+        f"p50 {percentile(latencies, 50) * 1000:.2f} ms, p95 {percentile(latencies, 95) * 1000:.2f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Замер поиска по корпусу запросов")
+    parser.add_argument("--file", required=True, help="JSONL-файл с запросами")
+    parser.add_argument("--field", default="query", help="Поле с текстом запроса")
+    parser.add_argument("--config", default="simple", help="Конфигурация полнотекстового поиска для parse_query")
+    parser.add_argument("--no-prefix", action="store_true", help="Отключить поиск по префиксу")
+    parser.add_argument("--limit", type=int, default=6, help="Размер выборки на запрос")
+    parser.add_argument("--repeat", type=int, default=1, help="Сколько раз повторить корпус")
+    args = parser.parse_args()
+
+    queries = list(read_queries(args.file, args.field)) * args.repeat
+    if not queries:
+        parser.error(f"в файле нет непустых значений поля {args.field!r}")
+
+    repository = CatalogSearchRepository(sessionmaker=get_sessionmaker())
+    print(f"{len(queries)} queries from {args.file}")
+    run("legacy", queries, legacy_query, repository, args.limit)
+    run(
+        "parsed",
+        queries,
+        lambda query: parse_query(query, config=args.config, prefix_match=not args.no_prefix),
+        repository,
+        args.limit,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Iterator
+
+import pytest
+import telebot
+from telebot import apihelper
+from telebot.apihelper import ApiTelegramException
+
+from benchmarks.fake_bot_api import FakeBotApiServer, RateLimits
+from zapchastimira.interface.outbound import OutboundScheduler, Priority
+
+TIMEOUT = 5.0
+# Сколько реального времени ждать, чтобы убедиться, что сообщение не отправлено.
+SETTLE = 0.1
+
+
+class ManualClock:
+    """
+    Время, которое идет только по `advance`.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Harness:
+    """
+    Планировщик с ручным временем и журналом отправок `(время, чат, сообщение)`.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.clock = ManualClock()
+        self.scheduler = OutboundScheduler(clock=self.clock, **kwargs)
+        self.sent: list[tuple[float, Any, Any]] = []
+        self._lock = threading.Lock()
+
+    def send(self, chat_id: Any, message: Any) -> Any:
+        with self._lock:
+            self.sent.append((self.clock(), chat_id, message))
+        return message
+
+    def submit(self, chat_id: Any, message: Any, priority: Priority = Priority.NORMAL) -> Future:
+        return self.scheduler.submit(chat_id, self.send, chat_id, message, priority=priority)
+
+    def advance(self, seconds: float) -> None:
+        # Под блокировкой планировщика: поток планировщика либо еще не вычислил время ожидания
+        # и увидит новое время, либо уже ждет и будет разбужен.
+        with self.scheduler._condition:
+            self.clock.now += seconds
+            self.scheduler._condition.notify_all()
+
+    def messages(self, chat_id: Any | None = None) -> list[Any]:
+        with self._lock:
+            return [message for _, chat, message in self.sent if chat_id is None or chat == chat_id]
+
+
+@pytest.fixture
+def harness_factory() -> Iterator[Callable[..., Harness]]:
+    harnesses: list[Harness] = []
+
+    def create(**kwargs: Any) -> Harness:
+        harness = Harness(**kwargs)
+        harnesses.append(harness)
+        return harness
+
+    yield create
+    for harness in harnesses:
+        harness.scheduler.stop(wait=False)
+
+
+def wait_all(futures: list[Future]) -> list[Any]:
+    return [future.result(timeout=TIMEOUT) for future in futures]
+
+
+def wait_for(condition: Callable[[], bool]) -> None:
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, "condition was not met in time"
+        time.sleep(0.01)
+
+
+def assert_pending(future: Future) -> None:
+    with pytest.raises(FutureTimeoutError):
+        future.result(timeout=SETTLE)
+
+
+def rate_limited(retry_after: int) -> ApiTelegramException:
+    return ApiTelegramException(
+        "sendMessage",
+        None,
+        {
+            "ok": False,
+            "error_code": 429,
+            "description": f"Too Many Requests: retry after {retry_after}",
+            "parameters": {"retry_after": retry_after},
+        },
+    )
+
+
+def test_messages_of_one_chat_are_sent_in_submission_order(harness_factory: Callable[..., Harness]) -> None:
+    harness = harness_factory(rate=1000, chat_rate=1000, chat_burst=1000, workers=8)
+    priorities = [Priority.LOW, Priority.HIGH, Priority.NORMAL]
+
+    futures = []
+    for index in range(30):
+        for chat_id in ("a", "b", "c"):
+            futures.append(harness.submit(chat_id, index, priority=priorities[index % 3]))
+    wait_all(futures)
+
+    # Приоритет упорядочивает чаты между собой, но не сообщения внутри чата.
+    for chat_id in ("a", "b", "c"):
+        assert harness.messages(chat_id) == list(range(30))
+
+
+def test_batch_parts_are_not_interleaved_with_other_messages(harness_factory: Callable[..., Harness]) -> None:
+    harness = harness_factory(rate=1000, chat_rate=1000, chat_burst=1000, workers=8)
+
+    batch = harness.scheduler.submit_batch("a", [lambda part=part: harness.send("a", part) for part in "xyz"])
+    single = harness.submit("a", "after")
+
+    assert batch.result(timeout=TIMEOUT) == ["x", "y", "z"]
+    assert single.result(timeout=TIMEOUT) == "after"
+    assert harness.messages("a") == ["x", "y", "z", "after"]
+
+
+def test_global_rate_is_paced_by_token_bucket(harness_factory: Callable[..., Harness]) -> None:
+    harness = harness_factory(rate=2, chat_rate=1000, chat_burst=1000)
+
+    futures = [harness.submit(chat_id, chat_id) for chat_id in range(5)]
+    # Корзина вмещает rate токенов: два сообщения уходят сразу, остальные по одному в 0.5 с.
+    wait_all(futures[:2])
+    assert_pending(futures[2])
+
+    harness.advance(0.5)
+    futures[2].result(timeout=TIMEOUT)
+    assert_pending(futures[3])
+
+    harness.advance(0.5)
+    futures[3].result(timeout=TIMEOUT)
+    harness.advance(0.5)
+    futures[4].result(timeout=TIMEOUT)
+
+    assert [sent_at for sent_at, _, _ in harness.sent] == [0.0, 0.0, 0.5, 1.0, 1.5]
+
+
+def test_chat_rate_delays_only_its_chat(harness_factory: Callable[..., Harness]) -> None:
+    harness = harness_factory(rate=1000, chat_rate=1, chat_burst=2)
+
+    futures = [harness.submit("a", index) for index in range(3)]
+    other = harness.submit("b", 0)
+    # Всплеск chat_burst уходит сразу, третье сообщение ждет токена чата, другой чат не ждет.
+    wait_all([*futures[:2], other])
+    assert_pending(futures[2])
+
+    harness.advance(0.5)
+    assert_pending(futures[2])
+
+    harness.advance(0.5)
+    futures[2].result(timeout=TIMEOUT)
+    assert [(sent_at, message) for sent_at, chat_id, message in harness.sent if chat_id == "a"] == [
+        (0.0, 0),
+        (0.0, 1),
+        (1.0, 2),
+    ]
+
+
+def test_retry_after_postpones_chat_and_retries(harness_factory: Callable[..., Harness]) -> None:
+    harness = harness_factory(rate=1000, chat_rate=1000, chat_burst=1000, max_retries=3)
+    attempts: list[float] = []
+
+    def flaky() -> str:
+        attempts.append(harness.clock())
+        if len(attempts) < 3:
+            raise rate_limited(retry_after=5)
+        return "delivered"
+
+    future = harness.scheduler.submit("a", flaky)
+    queued_after = harness.submit("a", "next")
+    other = harness.submit("b", "other")
+
+    other.result(timeout=TIMEOUT)
+    # Повтор откладывается от момента ответа 429, поэтому время двигается только после него.
+    wait_for(lambda: harness.scheduler.stats().retried == 1)
+    harness.advance(4)
+    assert_pending(future)
+    harness.advance(1)
+    wait_for(lambda: harness.scheduler.stats().retried == 2)
+    assert_pending(future)
+    harness.advance(5)
+
+    assert future.result(timeout=TIMEOUT) == "delivered"
+    assert queued_after.result(timeout=TIMEOUT) == "next"
+    assert attempts == [0.0, 5.0, 10.0]
+    stats = harness.scheduler.stats()
+    assert (stats.sent, stats.retried, stats.failed, stats.queued) == (3, 2, 0, 0)
+
+
+def test_retries_stop_after_max_retries(harness_factory: Callable[..., Harness]) -> None:
+    harness = harness_factory(rate=1000, chat_rate=1000, chat_burst=1000, max_retries=1)
+    attempts: list[float] = []
+
+    def always_limited() -> None:
+        attempts.append(harness.clock())
+        raise rate_limited(retry_after=2)
+
+    future = harness.scheduler.submit("a", always_limited)
+    queued_after = harness.submit("a", "next")
+    wait_for(lambda: harness.scheduler.stats().retried == 1)
+    assert_pending(queued_after)
+    harness.advance(2)
+
+    with pytest.raises(ApiTelegramException):
+        future.result(timeout=TIMEOUT)
+    assert attempts == [0.0, 2.0]
+    assert queued_after.result(timeout=TIMEOUT) == "next"
+    stats = harness.scheduler.stats()
+    assert (stats.retried, stats.failed, stats.queued) == (1, 1, 0)
+
+
+def test_failed_batch_part_aborts_remaining_parts(harness_factory: Callable[..., Harness]) -> None:
+    harness = harness_factory(rate=1000, chat_rate=1000, chat_burst=1000)
+
+    def broken() -> None:
+        raise ValueError("message is too long")
+
+    batch = harness.scheduler.submit_batch(
+        "a", [lambda: harness.send("a", "first"), broken, lambda: harness.send("a", "third")]
+    )
+    queued_after = harness.submit("a", "next")
+
+    with pytest.raises(ValueError):
+        batch.result(timeout=TIMEOUT)
+    assert queued_after.result(timeout=TIMEOUT) == "next"
+    assert harness.messages("a") == ["first", "next"]
+    assert harness.scheduler.stats().failed == 1
+
+
+def test_stopped_scheduler_rejects_messages(harness_factory: Callable[..., Harness]) -> None:
+    harness = harness_factory()
+    harness.submit("a", "first").result(timeout=TIMEOUT)
+    harness.scheduler.stop()
+
+    with pytest.raises(RuntimeError):
+        harness.submit("a", "second")
+
+
+@pytest.fixture
+def fake_bot_api() -> Iterator[FakeBotApiServer]:
+    server = FakeBotApiServer(("127.0.0.1", 0), RateLimits(rate=100, chat_rate=1, chat_burst=1))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = apihelper.API_URL
+    apihelper.API_URL = f"http://127.0.0.1:{server.server_address[1]}/bot{{0}}/{{1}}"
+    try:
+        yield server
+    finally:
+        apihelper.API_URL = api_url
+        server.shutdown()
+        server.server_close()
+
+
+def test_bot_api_rate_limit_is_retried(fake_bot_api: FakeBotApiServer) -> None:
+    # Планировщик настроен быстрее лимита заглушки (1 сообщение в секунду в чат),
+    # поэтому второе сообщение получает 429 и повторяется через retry_after.
+    bot = telebot.TeleBot("1:test", threaded=False)
+    scheduler = OutboundScheduler(rate=100, chat_rate=100, chat_burst=10, max_retries=3)
+    try:
+        started = time.monotonic()
+        futures = [scheduler.submit(42, bot.send_message, 42, text) for text in ("first", "second")]
+        messages = [future.result(timeout=TIMEOUT) for future in futures]
+        elapsed = time.monotonic() - started
+    finally:
+        scheduler.stop()
+
+    assert [message.text for message in messages] == ["first", "second"]
+    assert fake_bot_api.rate_limited >= 1
+    assert scheduler.stats().retried == fake_bot_api.rate_limited
+    assert elapsed >= 1.0
@@ -0,0 +1,315 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    """
+    Статистика использования кэша.
+
+    Attributes:
+        hits (int): Количество попаданий.
+        misses (int): Количество промахов (включая устаревшие записи).
+        evictions (int): Количество записей, вытесненных из-за ограничения размера.
+        size (int): Текущее количество записей.
+        maxsize (int): Максимальное количество записей.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    maxsize: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Доля попаданий среди всех обращений.
+
+        Returns:
+            float: Значение от 0 до 1.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Потокобезопасный LRU-кэш с ограничением времени жизни записей.
+
+    При превышении `maxsize` вытесняется запись, к которой дольше всего не
+    обращались. Запись старше `ttl` секунд считается отсутствующей.
+
+    Attributes:
+        maxsize (int): Максимальное количество записей.
+        ttl (float): Время жизни записи в секундах.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Инициализирует кэш.
+
+        Args:
+            maxsize (int): Максимальное количество записей.
+            ttl (float): Время жизни записи в секундах.
+            clock (Callable[[], float]): Источник времени, по умолчанию `time.monotonic`.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: K) -> V | None:
+        """
+        Возвращает значение по ключу.
+
+        Args:
+            key (K): Ключ.
+
+        Returns:
+            V | None: Значение, если оно есть и не устарело, иначе None.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """
+        Сохраняет значение.
+
+        Args:
+            key (K): Ключ.
+            value (V): Значение.
+            ttl (float | None): Время жизни записи; по умолчанию используется `self.ttl`.
+        """
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: K) -> None:
+        """
+        Удаляет значение по ключу, если оно есть.
+
+        Args:
+            key (K): Ключ.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Удаляет все записи. Статистика сохраняется.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> CacheStats:
+        """
+        Возвращает статистику кэша.
+
+        Returns:
+            CacheStats: Снимок счетчиков.
+        """
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._data),
+                maxsize=self.maxsize,
+            )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class VersionCounter:
+    """
+    Потокобезопасный счетчик версии данных.
+
+    Кэши включают текущее значение счетчика в ключ: после `bump()` старые
+    записи становятся недостижимыми и вытесняются по LRU или TTL, поэтому
+    инвалидация не требует перебора кэша.
+    """
+
+    def __init__(self) -> None:
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        """
+        Текущая версия.
+
+        Returns:
+            int: Значение счетчика.
+        """
+        return self._value
+
+    def bump(self) -> int:
+        """
+        Увеличивает версию.
+
+        Returns:
+            int: Новое значение счетчика.
+        """
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+class CacheBackend(ABC):
+    """
+    Интерфейс общего для нескольких процессов хранилища кэша.
+
+    Реализации (например, поверх Redis) хранят значения, сериализуемые в JSON,
+    чтобы данные могли читать все реплики бота.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        """
+        Возвращает значение по ключу.
+
+        Args:
+            key (str): Ключ.
+
+        Returns:
+            Any | None: Значение или None, если ключа нет.
+        """
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Сохраняет значение.
+
+        Args:
+            key (str): Ключ.
+            value (Any): Значение, сериализуемое в JSON.
+            ttl (float): Время жизни записи в секундах.
+        """
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Удаляет значение по ключу.
+
+        Args:
+            key (str): Ключ.
+        """
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Реализация `CacheBackend` в памяти процесса.
+
+    Используется вместо внешнего хранилища при локальной разработке и замерах:
+    несколько экземпляров `UserCache` с общим объектом `InMemoryCacheBackend`
+    ведут себя как реплики с общим кэшем.
+    """
+
+    def __init__(self, maxsize: int = 100_000, ttl: float = 3600.0):
+        """
+        Инициализирует хранилище.
+
+        Args:
+            maxsize (int): Максимальное количество записей.
+            ttl (float): Время жизни записи по умолчанию в секундах.
+        """
+        self._cache: TTLCache[str, Any] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> Any | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Реализация `CacheBackend` поверх Redis, общая для всех реплик бота.
+
+    Значения хранятся в JSON. Требует пакет `redis` (`pip install redis`);
+    соединение устанавливается при первом обращении.
+    """
+
+    def __init__(self, url: str, prefix: str = "zapchastimira:"):
+        """
+        Инициализирует хранилище.
+
+        Args:
+            url (str): Адрес Redis, например `redis://localhost:6379/0`.
+            prefix (str): Префикс ключей, чтобы не пересекаться с другими приложениями.
+        """
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("Shared cache backend requires redis: pip install redis") from exc
+
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Any | None:
+        data = self._client.get(self._prefix + key)
+        return None if data is None else json.loads(data)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._client.set(self._prefix + key, json.dumps(value), px=max(int(ttl * 1000), 1))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+
+def get_shared_cache_backend(url: str | None) -> CacheBackend | None:
+    """
+    Создает общее хранилище кэша по адресу из настроек.
+
+    Args:
+        url (str | None): Адрес хранилища (`redis://...`, `rediss://...`) или `memory://`
+            для хранилища в памяти процесса; None — без общего хранилища.
+
+    Returns:
+        CacheBackend | None: Хранилище или None.
+
+    Raises:
+        ValueError: Если схема адреса не поддерживается.
+    """
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryCacheBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported shared cache URL: {url}")
@@ -0,0 +1,143 @@
+import re
+from typing import NamedTuple
+
+# Записи совместимости разделяются `;`, переводом строки или запятой, за которой не идет цифра.
+ENTRY_SEPARATOR_RE = re.compile(r"[;\n]+|,(?!\s*\d)")
+# Годы выпуска: «2012-2018», «2012 – 2018», «2016», «2012+» или «2012-н.в.» (по настоящее время).
+YEARS_RE = re.compile(r"(?<!\d)((?:19|20)\d{2})(?:\s*([-–—])\s*(?:((?:19|20)\d{2})(?!\d))?|\s*(\+))?")
+WORD_RE = re.compile(r"[^\W_]+(?:-[^\W_]+)*")
+
+# Разные написания одной марки приводятся к одному.
+MAKE_ALIASES = {
+    "vw": "volkswagen",
+    "фольксваген": "volkswagen",
+    "mercedes": "mercedes-benz",
+    "мерседес": "mercedes-benz",
+    "ваз": "lada",
+    "лада": "lada",
+    "тойота": "toyota",
+    "киа": "kia",
+    "хендай": "hyundai",
+    "хундай": "hyundai",
+    "шкода": "skoda",
+    "рено": "renault",
+    "ниссан": "nissan",
+}
+# Марки из двух слов: второе слово — часть марки, а не модели.
+TWO_WORD_MAKES = {("land", "rover"), ("alfa", "romeo"), ("aston", "martin"), ("mercedes", "benz")}
+
+
+class Fitment(NamedTuple):
+    """
+    Автомобили, к которым подходит запчасть.
+
+    Attributes:
+        make (str): Марка в нормализованном виде (см. `normalize_make`).
+        model (str | None): Модель в нижнем регистре; None — любая модель марки.
+        year_from (int | None): Первый год выпуска; None — без ограничения.
+        year_to (int | None): Последний год выпуска; None — без ограничения.
+    """
+
+    make: str
+    model: str | None
+    year_from: int | None
+    year_to: int | None
+
+
+class Vehicle(NamedTuple):
+    """
+    Автомобиль пользователя в нормализованном виде.
+
+    Attributes:
+        make (str): Марка (см. `normalize_make`).
+        model (str): Модель в нижнем регистре (см. `normalize_model`).
+        year (int): Год выпуска.
+    """
+
+    make: str
+    model: str
+    year: int
+
+
+def normalize_make(make: str) -> str:
+    """
+    Приводит марку к виду, в котором она хранится в индексе совместимости.
+
+    Args:
+        make (str): Марка в произвольной записи («VW», «Mercedes Benz»).
+
+    Returns:
+        str: Марка в нижнем регистре с учетом синонимов («volkswagen», «mercedes-benz»).
+    """
+    make = "-".join(WORD_RE.findall(make.casefold()))
+    return MAKE_ALIASES.get(make, make)
+
+
+def normalize_model(model: str) -> str:
+    """
+    Приводит модель к виду, в котором она хранится в индексе совместимости.
+
+    Args:
+        model (str): Модель в произвольной записи («Land  Cruiser»).
+
+    Returns:
+        str: Слова модели в нижнем регистре через пробел («land cruiser»).
+    """
+    return " ".join(WORD_RE.findall(model.casefold()))
+
+
+def parse_fitment(entry: str) -> Fitment | None:
+    """
+    Разбирает одну запись совместимости вида «Марка Модель 2012-2018».
+
+    Марка — первое слово (или два слова для марок из `TWO_WORD_MAKES`), модель —
+    остальные слова до годов выпуска. Запись без годов подходит для любого года,
+    запись без модели — для любой модели марки.
+
+    Args:
+        entry (str): Запись совместимости.
+
+    Returns:
+        Fitment | None: Разобранная запись или None, если в записи нет марки.
+    """
+    # Годы — последнее число в записи: в «Peugeot 2008 2013-2019» 2008 — это модель.
+    years = None
+    for match in YEARS_RE.finditer(entry):
+        years = match
+    year_from = year_to = None
+    if years is not None:
+        year_from = int(years.group(1))
+        if years.group(3):
+            year_to = int(years.group(3))
+        elif not years.group(2) and not years.group(4):
+            year_to = year_from
+        if year_to is not None and year_to < year_from:
+            year_from, year_to = year_to, year_from
+        entry = entry[: years.start()]
+
+    words = WORD_RE.findall(entry.casefold())
+    if not words:
+        return None
+    size = 2 if tuple(words[:2]) in TWO_WORD_MAKES else 1
+    make = normalize_make(" ".join(words[:size]))
+    model = " ".join(words[size:]) or None
+    return Fitment(make=make, model=model, year_from=year_from, year_to=year_to)
+
+
+def parse_compatibility(text: str | None) -> list[Fitment]:
+    """
+    Разбирает колонку `parts.compatibility` в записи индекса совместимости.
+
+    Записи разделяются `;`, переводом строки или запятой: «Kia Rio 2015-2020; Hyundai Solaris 2011-2017».
+    Нераспознанные записи пропускаются, повторы удаляются.
+
+    Args:
+        text (str | None): Текст совместимости.
+
+    Returns:
+        list[Fitment]: Записи в порядке появления в тексте.
+    """
+    if not text:
+        return []
+    fitments = (parse_fitment(entry) for entry in ENTRY_SEPARATOR_RE.split(text))
+    return list(dict.fromkeys(fitment for fitment in fitments if fitment is not None))
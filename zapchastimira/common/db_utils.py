@@ -1,25 +1,552 @@
-from typing import Generator
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any, Generator, Iterator
 
-from sqlalchemy import create_engine
+import sqlalchemy as sa
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from zapchastimira.common.settings import PostgresSettings
 
+logger = logging.getLogger(__name__)
 
-def get_sessionmaker() -> sessionmaker[Session]:
+
+@dataclass
+class PoolMetrics:
+    """
+    Счетчики выдачи соединений из пула.
+
+    Attributes:
+        checkouts (int): Количество успешно выданных соединений.
+        timeouts (int): Количество попыток, завершившихся таймаутом ожидания пула.
+        wait_total (float): Суммарное время ожидания соединения в секундах.
+        wait_max (float): Максимальное время ожидания соединения в секундах.
+    """
+
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        """
+        Учитывает одну попытку получить соединение из пула.
+
+        Args:
+            wait (float): Время ожидания в секундах.
+            timed_out (bool): Завершилась ли попытка таймаутом.
+        """
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+
+class MeteredQueuePool(QueuePool):
+    """
+    `QueuePool`, который замеряет время ожидания соединения.
+
+    Метрики переживают пересоздание пула (`Engine.dispose()`), поэтому
+    их можно читать в течение всей жизни процесса.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        self._metrics_lock = threading.Lock()
+
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except Exception as exc:
+            with self._metrics_lock:
+                self.metrics.record(time.perf_counter() - started, timed_out=isinstance(exc, PoolTimeoutError))
+            raise
+        with self._metrics_lock:
+            self.metrics.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self) -> QueuePool:
+        pool = super().recreate()
+        if isinstance(pool, MeteredQueuePool):
+            pool.metrics = self.metrics
+            pool._metrics_lock = self._metrics_lock
+        return pool
+
+
+class MeteredAsyncQueuePool(MeteredQueuePool, AsyncAdaptedQueuePool):
+    """
+    `AsyncAdaptedQueuePool` с теми же метриками ожидания, что и `MeteredQueuePool`.
+    """
+
+
+# Опция выполнения движка: разрешает `PreparedStatement` подготавливать запросы на сервере.
+PREPARED_STATEMENTS_OPTION = "prepared_statements"
+
+_registry_lock = threading.Lock()
+_engines: dict[str, Engine] = {}
+_sessionmakers: dict[str, sessionmaker[Session]] = {}
+_async_engines: dict[str, AsyncEngine] = {}
+_async_sessionmakers: dict[str, async_sessionmaker[AsyncSession]] = {}
+_replica_routers: dict[str, "ReplicaRouter"] = {}
+
+
+@cache
+def _default_settings() -> PostgresSettings:
+    # Настройки из окружения читаются один раз: `unit_of_work()` и `run_sync()` без аргументов
+    # обращаются к реестру на каждый вызов.
+    return PostgresSettings()  # type: ignore
+
+
+def _pool_options(db_settings: PostgresSettings) -> dict[str, Any]:
+    return {
+        "pool_size": db_settings.pool_size,
+        "max_overflow": db_settings.max_overflow,
+        "pool_timeout": db_settings.pool_timeout,
+        "pool_recycle": db_settings.pool_recycle,
+        "pool_pre_ping": db_settings.pool_pre_ping,
+    }
+
+
+def _build_engine(db_settings: PostgresSettings, dsn: str) -> Engine:
+    connect_args: dict[str, Any] = {}
+    if db_settings.statement_timeout > 0:
+        connect_args["options"] = f"-c statement_timeout={db_settings.statement_timeout}"
+
+    return create_engine(
+        dsn,
+        poolclass=MeteredQueuePool,
+        connect_args=connect_args,
+        execution_options={PREPARED_STATEMENTS_OPTION: db_settings.prepared_statements},
+        **_pool_options(db_settings),
+    )
+
+
+def _build_async_engine(db_settings: PostgresSettings) -> AsyncEngine:
+    connect_args: dict[str, Any] = {}
+    if db_settings.statement_timeout > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(db_settings.statement_timeout)}
+    # asyncpg подготавливает каждый запрос; кэш подготовленных запросов соединения
+    # отключается той же настройкой, что и `PREPARE` для psycopg2.
+    if not db_settings.prepared_statements:
+        connect_args["prepared_statement_cache_size"] = 0
+
+    return create_async_engine(
+        db_settings.async_dsn,
+        poolclass=MeteredAsyncQueuePool,
+        connect_args=connect_args,
+        **_pool_options(db_settings),
+    )
+
+
+def _registered_engine(db_settings: PostgresSettings, dsn: str) -> Engine:
+    engine = _engines.get(dsn)
+    if engine is not None:
+        return engine
+
+    with _registry_lock:
+        engine = _engines.get(dsn)
+        if engine is None:
+            engine = _build_engine(db_settings, dsn)
+            _engines[dsn] = engine
+        return engine
+
+
+def _registered_sessionmaker(db_settings: PostgresSettings, dsn: str) -> sessionmaker[Session]:
+    factory = _sessionmakers.get(dsn)
+    if factory is not None:
+        return factory
+
+    engine = _registered_engine(db_settings, dsn)
+    with _registry_lock:
+        factory = _sessionmakers.get(dsn)
+        if factory is None:
+            factory = sessionmaker(bind=engine, autoflush=True, expire_on_commit=False)
+            _sessionmakers[dsn] = factory
+        return factory
+
+
+def get_engine(db_settings: PostgresSettings | None = None) -> Engine:
+    """
+    Возвращает общий для процесса движок SQLAlchemy.
+
+    Движок создается лениво при первом обращении и переиспользуется всеми
+    репозиториями, поэтому процесс держит один пул соединений на базу данных.
+
+    Args:
+        db_settings (PostgresSettings | None): Настройки подключения. Если не указаны,
+            загружаются из переменных окружения.
+
+    Returns:
+        Engine: Движок, привязанный к DSN из настроек.
+    """
+    db_settings = db_settings or _default_settings()
+    return _registered_engine(db_settings, db_settings.dsn)
+
+
+def get_sessionmaker(db_settings: PostgresSettings | None = None) -> sessionmaker[Session]:
     """
     Создает фабрику сессий SQLAlchemy для подключения к базе данных PostgreSQL.
 
-    Эта функция использует настройки подключения из `PostgresSettings` и
-    создает движок SQLAlchemy. Затем она создает `sessionmaker`,
-    который используется для создания сессий базы данных.
+    Фабрика привязана к общему движку из `get_engine` и кэшируется по DSN,
+    так что повторные вызовы не открывают новые пулы соединений.
+
+    Args:
+        db_settings (PostgresSettings | None): Настройки подключения. Если не указаны,
+            загружаются из переменных окружения.
 
     Returns:
         sessionmaker[Session]: Фабрика сессий, готовая для создания новых сессий.
     """
-    db_settings = PostgresSettings()
-    engine = create_engine(db_settings.dsn)
-    return sessionmaker(bind=engine, autoflush=True, expire_on_commit=False)
+    db_settings = db_settings or _default_settings()
+    return _registered_sessionmaker(db_settings, db_settings.dsn)
+
+
+def get_async_engine(db_settings: PostgresSettings | None = None) -> AsyncEngine:
+    """
+    Возвращает общий для процесса асинхронный движок SQLAlchemy с драйвером asyncpg.
+
+    Движок создается лениво и кэшируется по DSN, как и синхронный (`get_engine`);
+    его пул настраивается теми же параметрами `POSTGRES_POOL_*`. Для драйвера
+    нужна дополнительная зависимость `async`.
+
+    Args:
+        db_settings (PostgresSettings | None): Настройки подключения. Если не указаны,
+            загружаются из переменных окружения.
+
+    Returns:
+        AsyncEngine: Асинхронный движок, привязанный к DSN из настроек.
+    """
+    db_settings = db_settings or _default_settings()
+    dsn = db_settings.async_dsn
+    engine = _async_engines.get(dsn)
+    if engine is not None:
+        return engine
+
+    with _registry_lock:
+        engine = _async_engines.get(dsn)
+        if engine is None:
+            engine = _build_async_engine(db_settings)
+            _async_engines[dsn] = engine
+        return engine
+
+
+def get_async_sessionmaker(db_settings: PostgresSettings | None = None) -> async_sessionmaker[AsyncSession]:
+    """
+    Создает фабрику асинхронных сессий, привязанную к общему движку из `get_async_engine`.
+
+    Args:
+        db_settings (PostgresSettings | None): Настройки подключения. Если не указаны,
+            загружаются из переменных окружения.
+
+    Returns:
+        async_sessionmaker[AsyncSession]: Фабрика асинхронных сессий.
+    """
+    db_settings = db_settings or _default_settings()
+    dsn = db_settings.async_dsn
+    factory = _async_sessionmakers.get(dsn)
+    if factory is not None:
+        return factory
+
+    engine = get_async_engine(db_settings)
+    with _registry_lock:
+        factory = _async_sessionmakers.get(dsn)
+        if factory is None:
+            factory = async_sessionmaker(bind=engine, autoflush=True, expire_on_commit=False)
+            _async_sessionmakers[dsn] = factory
+        return factory
+
+
+# Отставание реплики в секундах. Если реплика получает WAL в потоковом режиме и все полученное
+# применила, отставания нет, даже когда на основном сервере давно не было записей и время последней
+# транзакции старое. Если WAL receiver отключен (или его статус не виден роли без `pg_read_all_stats`),
+# совпадение LSN ничего не значит: отставание считается по времени последней примененной транзакции,
+# а реплика, не применившая ни одной транзакции, считается бесконечно отстающей.
+REPLICA_LAG_QUERY = sa.text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+            AND EXISTS (SELECT FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp())::float8, 'Infinity'::float8)
+    END
+    """)
+
+
+@dataclass
+class Replica:
+    """
+    Реплика для чтения и ее состояние.
+
+    Attributes:
+        name (str): DSN реплики без пароля.
+        factory (sessionmaker[Session]): Фабрика сессий реплики.
+        reads (int): Количество выданных сессий.
+        failures (int): Сколько раз реплика признавалась недоступной или отстающей.
+        lag (float | None): Отставание при последней проверке в секундах.
+        checked_at (float): Время последней проверки отставания (`time.monotonic()`).
+        down_until (float): До какого момента реплика не используется (`time.monotonic()`).
+    """
+
+    name: str
+    factory: sessionmaker[Session] = field(repr=False)
+    reads: int = 0
+    failures: int = 0
+    lag: float | None = None
+    checked_at: float = float("-inf")
+    down_until: float = float("-inf")
+
+
+class ReplicaRouter:
+    """
+    Распределяет запросы только на чтение между репликами с переходом на основной сервер.
+
+    Реплики выбираются по кругу. Соединение выбранной реплики берется из пула
+    сразу (с `pool_pre_ping`); ошибка подключения или таймаут ожидания пула
+    переключают чтение на следующую реплику. Не чаще чем раз в `check_interval` секунд на нем
+    проверяется отставание реплики. Недоступная или отстающая больше `max_lag`
+    реплика пропускается `retry_interval` секунд, после чего снова проверяется.
+    Если подходящих реплик нет, сессия открывается на основном сервере.
+
+    Attributes:
+        primary (sessionmaker[Session]): Фабрика сессий основного сервера.
+        replicas (list[Replica]): Реплики.
+        check_interval (float): Как часто проверять отставание реплики в секундах.
+        retry_interval (float): Сколько секунд не использовать недоступную реплику.
+        max_lag (float): Допустимое отставание реплики в секундах; 0 отключает проверку.
+        fallbacks (int): Сколько сессий открыто на основном сервере, потому что реплики недоступны.
+    """
+
+    def __init__(
+        self,
+        primary: sessionmaker[Session],
+        replicas: list[Replica],
+        check_interval: float = 10.0,
+        retry_interval: float = 30.0,
+        max_lag: float = 30.0,
+    ):
+        """
+        Инициализирует маршрутизатор.
+
+        Args:
+            primary (sessionmaker[Session]): Фабрика сессий основного сервера.
+            replicas (list[Replica]): Реплики; пустой список — все сессии на основном сервере.
+            check_interval (float): Как часто проверять отставание реплики в секундах.
+            retry_interval (float): Сколько секунд не использовать недоступную реплику.
+            max_lag (float): Допустимое отставание реплики в секундах; 0 отключает проверку.
+        """
+        self.primary = primary
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self.retry_interval = retry_interval
+        self.max_lag = max_lag
+        self.fallbacks = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        """
+        Открывает сессию для чтения на реплике или, если подходящих нет, на основном сервере.
+
+        Yields:
+            Session: Сессия SQLAlchemy.
+        """
+        for replica in self._candidates():
+            session = replica.factory()
+            try:
+                usable = self._check(replica, session)
+            except (DBAPIError, PoolTimeoutError) as exc:
+                # PoolTimeoutError: все соединения пула реплики заняты дольше `pool_timeout`.
+                session.close()
+                self._mark_down(replica)
+                logger.warning(
+                    "Replica %s is unavailable, skipping it for %.0f s: %s", replica.name, self.retry_interval, exc
+                )
+                continue
+            if not usable:
+                session.close()
+                continue
+
+            with self._lock:
+                replica.reads += 1
+            with session:
+                yield session
+            return
+
+        if self.replicas:
+            with self._lock:
+                self.fallbacks += 1
+        with self.primary() as session:
+            yield session
+
+    def _candidates(self) -> list[Replica]:
+        if not self.replicas:
+            return []
+        start = next(self._counter) % len(self.replicas)
+        now = time.monotonic()
+        return [replica for replica in self.replicas[start:] + self.replicas[:start] if replica.down_until <= now]
+
+    def _check(self, replica: Replica, session: Session) -> bool:
+        # Соединение берется из пула здесь, а не при первом запросе, чтобы ошибка
+        # подключения переключила чтение на другую реплику.
+        connection = session.connection()
+        now = time.monotonic()
+        if self.max_lag <= 0 or now - replica.checked_at < self.check_interval:
+            return True
+
+        replica.checked_at = now
+        replica.lag = float(connection.execute(REPLICA_LAG_QUERY).scalar_one())
+        if replica.lag <= self.max_lag:
+            return True
+        self._mark_down(replica)
+        logger.warning(
+            "Replica %s lags %.1f s behind the primary, skipping it for %.0f s",
+            replica.name,
+            replica.lag,
+            self.retry_interval,
+        )
+        return False
+
+    def _mark_down(self, replica: Replica) -> None:
+        with self._lock:
+            replica.failures += 1
+            replica.down_until = time.monotonic() + self.retry_interval
+            # После паузы реплика сразу проверяется на отставание.
+            replica.checked_at = float("-inf")
+
+    def status(self) -> dict[str, dict[str, Any]]:
+        """
+        Возвращает состояние реплик.
+
+        Returns:
+            dict[str, dict[str, Any]]: Состояние по DSN реплики без пароля и количество
+            переходов на основной сервер по ключу `primary`.
+        """
+        now = time.monotonic()
+        report: dict[str, dict[str, Any]] = {
+            replica.name: {
+                "available": replica.down_until <= now,
+                "reads": replica.reads,
+                "failures": replica.failures,
+                "lag": replica.lag,
+            }
+            for replica in self.replicas
+        }
+        report["primary"] = {"fallbacks": self.fallbacks}
+        return report
+
+
+def get_replica_router(db_settings: PostgresSettings | None = None) -> ReplicaRouter:
+    """
+    Возвращает общий для процесса маршрутизатор чтения по репликам из `POSTGRES_REPLICA_DSNS`.
+
+    Движки реплик создаются с теми же параметрами пула, что и основной, кроме
+    `pool_timeout` (используется `replica_pool_timeout`), и регистрируются вместе
+    с ним (см. `get_pool_metrics`, `dispose_engines`).
+
+    Args:
+        db_settings (PostgresSettings | None): Настройки подключения. Если не указаны,
+            загружаются из переменных окружения.
+
+    Returns:
+        ReplicaRouter: Маршрутизатор; без реплик все сессии открываются на основном сервере.
+    """
+    db_settings = db_settings or _default_settings()
+    router = _replica_routers.get(db_settings.dsn)
+    if router is not None:
+        return router
+
+    # Перегруженная реплика не должна задерживать чтение на полный `pool_timeout` перед переходом на основной сервер.
+    replica_settings = db_settings.model_copy(update={"pool_timeout": db_settings.replica_pool_timeout})
+    replicas = [
+        Replica(
+            name=sa.make_url(dsn).render_as_string(hide_password=True),
+            factory=_registered_sessionmaker(replica_settings, dsn),
+        )
+        for dsn in db_settings.replica_dsns
+    ]
+    primary = get_sessionmaker(db_settings)
+    with _registry_lock:
+        router = _replica_routers.get(db_settings.dsn)
+        if router is None:
+            router = ReplicaRouter(
+                primary,
+                replicas,
+                check_interval=db_settings.replica_check_interval,
+                retry_interval=db_settings.replica_retry_interval,
+                max_lag=db_settings.replica_max_lag,
+            )
+            _replica_routers[db_settings.dsn] = router
+        return router
+
+
+def get_pool_metrics() -> dict[str, dict[str, Any]]:
+    """
+    Возвращает состояние и метрики всех пулов соединений процесса.
+
+    Returns:
+        dict[str, dict[str, Any]]: Метрики по каждому движку, ключ — DSN без пароля.
+    """
+    report: dict[str, dict[str, Any]] = {}
+    engines = [*_engines.values(), *(engine.sync_engine for engine in _async_engines.values())]
+    for engine in engines:
+        pool = engine.pool
+        stats: dict[str, Any] = {"status": pool.status()}
+        if isinstance(pool, MeteredQueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+                checkouts=pool.metrics.checkouts,
+                timeouts=pool.metrics.timeouts,
+                wait_total=pool.metrics.wait_total,
+                wait_max=pool.metrics.wait_max,
+                wait_avg=pool.metrics.wait_total / pool.metrics.checkouts if pool.metrics.checkouts else 0.0,
+            )
+        report[engine.url.render_as_string(hide_password=True)] = stats
+    return report
+
+
+def dispose_engines() -> None:
+    """
+    Закрывает все пулы соединений и очищает реестр движков.
+
+    Используется при завершении процесса и после `fork()`, чтобы дочерний
+    процесс не унаследовал открытые соединения родителя.
+    """
+    with _registry_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _sessionmakers.clear()
+        _replica_routers.clear()
+
+
+async def dispose_async_engines() -> None:
+    """
+    Закрывает пулы соединений асинхронных движков и очищает их реестр.
+
+    Вызывается перед завершением цикла событий: соединения asyncpg нельзя
+    корректно закрыть после остановки цикла.
+    """
+    with _registry_lock:
+        engines = list(_async_engines.values())
+        _async_engines.clear()
+        _async_sessionmakers.clear()
+    for engine in engines:
+        await engine.dispose()
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -0,0 +1,127 @@
+import re
+from dataclasses import dataclass, field
+
+# Слово — буквы и цифры; внутри слова допускаются разделители артикулов (AB-123.4, W712/75).
+TOKEN_RE = re.compile(r"[^\W_]+(?:[-./][^\W_]+)*")
+DIGIT_RE = re.compile(r"\d")
+# Артикул — латиница и цифры, части которого могут разделяться `-`, `.`, `/` или пробелом.
+PART_NUMBER_CHUNK_RE = re.compile(r"[A-Za-z0-9]+(?:[-./][A-Za-z0-9]+)*")
+PART_NUMBER_SEPARATORS_RE = re.compile(r"[\W_]+")
+
+
+@dataclass
+class ParsedQuery:
+    """
+    Разобранный поисковый запрос пользователя.
+
+    Attributes:
+        terms (list[str]): Слова запроса в нижнем регистре, без служебных символов tsquery.
+        part_numbers (list[str]): Слова, похожие на артикул (содержат цифры).
+        tsquery (str): Текст для `to_tsquery`; пустая строка, если искать нечего.
+        config (str): Конфигурация полнотекстового поиска PostgreSQL.
+    """
+
+    terms: list[str] = field(default_factory=list)
+    part_numbers: list[str] = field(default_factory=list)
+    tsquery: str = ""
+    config: str = "simple"
+
+    @property
+    def is_empty(self) -> bool:
+        """
+        Пустой ли запрос (например, состоял только из знаков препинания).
+
+        Returns:
+            bool: True, если запрос не содержит ни одного слова.
+        """
+        return not self.terms
+
+
+def is_part_number(token: str) -> bool:
+    """
+    Проверяет, похоже ли слово на артикул.
+
+    Args:
+        token (str): Слово запроса.
+
+    Returns:
+        bool: True, если слово содержит цифры.
+    """
+    return DIGIT_RE.search(token) is not None
+
+
+def normalize_part_number(part_number: str) -> str:
+    """
+    Приводит артикул к виду колонки `parts.part_number_normalized`.
+
+    Args:
+        part_number (str): Артикул в произвольной записи (`ab-00012.3`, `0 986 452 041`).
+
+    Returns:
+        str: Артикул без разделителей в верхнем регистре (`AB000123`).
+    """
+    return PART_NUMBER_SEPARATORS_RE.sub("", part_number).upper()
+
+
+def looks_like_part_number(query: str, min_length: int = 4) -> bool:
+    """
+    Проверяет, похож ли весь запрос на артикул.
+
+    Запрос считается артикулом, если каждая его часть, отделенная пробелом,
+    состоит из латиницы и цифр (с разделителями `-`, `.`, `/`) и содержит
+    цифру, а артикул без разделителей не короче `min_length`. Так «W712/75»
+    и «0 986 452 041» — артикулы, а «фильтр 123» и «bosch 0986452041» — нет.
+
+    Args:
+        query (str): Запрос пользователя.
+        min_length (int): Минимальная длина артикула без разделителей.
+
+    Returns:
+        bool: True, если запрос похож на артикул.
+    """
+    chunks = query.split()
+    if not chunks or not all(PART_NUMBER_CHUNK_RE.fullmatch(chunk) and is_part_number(chunk) for chunk in chunks):
+        return False
+    return len(normalize_part_number(query)) >= min_length
+
+
+def parse_query(
+    query: str,
+    config: str = "simple",
+    prefix_match: bool = True,
+    prefix_min_length: int = 3,
+    max_terms: int = 8,
+) -> ParsedQuery:
+    """
+    Разбирает запрос пользователя в безопасный для `to_tsquery` вид.
+
+    Из запроса выделяются слова (знаки `&`, `|`, `!`, кавычки и скобки
+    отбрасываются), каждое слово передается в tsquery в кавычках, поэтому
+    ввод пользователя не может вызвать синтаксическую ошибку. PostgreSQL
+    разбирает слово в кавычках тем же парсером, что и документы, так что
+    артикулы с разделителями (`AB-123.4`) сопоставляются с вектором так же,
+    как были проиндексированы. Слова не короче `prefix_min_length` ищутся
+    по префиксу (`:*`), чтобы «колод» находило «колодки»; артикулы всегда
+    ищутся по префиксу.
+
+    Args:
+        query (str): Запрос пользователя.
+        config (str): Конфигурация полнотекстового поиска (`simple`, `russian`).
+        prefix_match (bool): Искать ли слова по префиксу.
+        prefix_min_length (int): Минимальная длина слова для поиска по префиксу.
+        max_terms (int): Максимальное количество слов, остальные отбрасываются.
+
+    Returns:
+        ParsedQuery: Разобранный запрос.
+    """
+    terms = [token.lower() for token in TOKEN_RE.findall(query)][:max_terms]
+    part_numbers = [term for term in terms if is_part_number(term)]
+
+    lexemes = []
+    for term in terms:
+        lexeme = f"'{term}'"
+        if prefix_match and (len(term) >= prefix_min_length or term in part_numbers):
+            lexeme += ":*"
+        lexemes.append(lexeme)
+
+    return ParsedQuery(terms=terms, part_numbers=part_numbers, tsquery=" & ".join(lexemes), config=config)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,10 +12,56 @@ class TelegramSettings(BaseSettings):
 
     Attributes:
         token (str): Токен Telegram бота.
+        dispatch_mode (Literal["sequential", "ordered"]): Режим обработки обновлений. `sequential` — все
+            обновления обрабатываются по очереди в потоке опроса, `ordered` — разные чаты обрабатываются
+            параллельно, сообщения одного чата — последовательно.
+        workers (int): Количество рабочих потоков в режиме `ordered`.
+        max_in_flight (int): Максимальное количество обновлений в обработке и в очереди в режиме `ordered`.
+        api_url (str | None): Шаблон адреса Bot API (например, локального сервера Bot API),
+            по умолчанию используется `https://api.telegram.org`.
+        send_rate (float): Общая частота исходящих сообщений бота в секунду (лимит Telegram — около 30).
+        chat_send_rate (float): Частота исходящих сообщений в один чат в секунду (лимит Telegram — около 1).
+        chat_send_burst (int): Сколько сообщений подряд можно отправить в один чат без ожидания.
+        send_workers (int): Количество потоков, выполняющих исходящие вызовы Bot API.
+        send_max_retries (int): Сколько раз повторять сообщение после ответа `429 Too Many Requests`.
     """
 
     model_config = SettingsConfigDict(env_prefix="TELEGRAM_", extra="ignore", env_file=".env")
     token: str
+    dispatch_mode: Literal["sequential", "ordered"] = "ordered"
+    workers: int = 4
+    max_in_flight: int = 64
+    api_url: str | None = None
+    send_rate: float = 30.0
+    chat_send_rate: float = 1.0
+    chat_send_burst: int = 3
+    send_workers: int = 8
+    send_max_retries: int = 3
+
+
+class WebhookSettings(BaseSettings):
+    """
+    Настройки приема обновлений Telegram через webhook.
+
+    Attributes:
+        url (str | None): Публичный адрес webhook, который регистрируется в Telegram.
+            Если не указан, webhook не регистрируется (например, при локальных замерах).
+        host (str): Адрес, на котором слушает HTTP-сервер.
+        port (int): Порт HTTP-сервера.
+        path (str): Путь, по которому принимаются обновления.
+        secret_token (SecretStr | None): Секрет из заголовка `X-Telegram-Bot-Api-Secret-Token`.
+        queue_size (int): Размер внутренней очереди необработанных обновлений.
+        max_connections (int): Максимальное количество одновременных соединений Telegram к webhook.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="WEBHOOK_", extra="ignore", env_file=".env")
+    url: str | None = None
+    host: str = "0.0.0.0"
+    port: int = 8080
+    path: str = "/telegram/webhook"
+    secret_token: SecretStr | None = None
+    queue_size: int = 1000
+    max_connections: int = 40
 
 
 class PostgresSettings(BaseSettings):
@@ -30,9 +78,25 @@ class PostgresSettings(BaseSettings):
         username (str): Имя пользователя для подключения к базе данных PostgreSQL.
         password (SecretStr): Пароль для подключения к базе данных PostgreSQL.
         db_name (str): Имя базы данных PostgreSQL.
+        pool_size (int): Количество постоянных соединений в пуле процесса.
+        max_overflow (int): Сколько соединений сверх `pool_size` разрешено открыть при пиковой нагрузке.
+        pool_timeout (float): Сколько секунд ждать свободное соединение, прежде чем вернуть ошибку.
+        pool_recycle (int): Через сколько секунд переоткрывать соединение (-1 — не переоткрывать).
+        pool_pre_ping (bool): Проверять ли соединение перед выдачей из пула.
+        statement_timeout (int): Ограничение времени выполнения запроса в миллисекундах (0 — без ограничения).
+        prepared_statements (bool): Выполнять ли частые запросы репозиториев как подготовленные
+            на сервере (`PREPARE`/`EXECUTE`); отключается при работе через PgBouncer в режиме транзакций.
+        replica_dsns (list[str]): Строки подключения к репликам для чтения (JSON-список); пустой
+            список — все запросы идут на основной сервер.
+        replica_check_interval (float): Как часто проверять состояние и отставание реплики в секундах.
+        replica_retry_interval (float): Сколько секунд не использовать недоступную или отстающую реплику.
+        replica_max_lag (float): Допустимое отставание реплики в секундах (0 — не проверять).
+        replica_pool_timeout (float): Сколько секунд ждать свободное соединение реплики, прежде чем
+            перейти к следующей реплике или основному серверу.
 
     Properties:
         dsn (str): Строка подключения к базе данных PostgreSQL.
+        async_dsn (str): Строка подключения для драйвера asyncpg.
     """
 
     model_config = SettingsConfigDict(env_prefix="POSTGRES_", extra="ignore", env_file=".env")
@@ -41,6 +105,18 @@ class PostgresSettings(BaseSettings):
     username: str
     password: SecretStr
     db_name: str
+    pool_size: int = 5
+    max_overflow: int = 5
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_timeout: int = 0
+    prepared_statements: bool = True
+    replica_dsns: list[str] = []
+    replica_check_interval: float = 10.0
+    replica_retry_interval: float = 30.0
+    replica_max_lag: float = 30.0
+    replica_pool_timeout: float = 1.0
 
     @property
     def dsn(self) -> str:
@@ -51,3 +127,92 @@ class PostgresSettings(BaseSettings):
           str: строка подключения к базе данных PostgreSQL
         """
         return f"postgresql://{self.username}:{self.password.get_secret_value()}@{self.host}:{self.port}/{self.db_name}"
+
+    @property
+    def async_dsn(self) -> str:
+        """
+        Генерирует строку подключения к базе данных PostgreSQL для драйвера asyncpg.
+
+        Returns:
+          str: строка подключения с драйвером `postgresql+asyncpg`
+        """
+        return self.dsn.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+class CacheSettings(BaseSettings):
+    """
+    Настройки кэшей в памяти процесса.
+
+    Attributes:
+        user_ttl (float): Время жизни записи кэша пользователей в секундах.
+        user_maxsize (int): Максимальное количество пользователей в кэше.
+        shared_url (str | None): Адрес общего для реплик хранилища кэша пользователей
+            (`redis://host:6379/0` или `memory://` для разработки); по умолчанию не используется.
+        user_shared_ttl (float): Время жизни записи пользователя в общем хранилище в секундах.
+        user_shared_local_ttl (float): Время жизни записи локального кэша пользователей в секундах, когда
+            задан `shared_url` (вместо `user_ttl`): источник истины — общее хранилище, а локальный кэш лишь
+            сглаживает повторные обращения; 0 отключает локальный кэш.
+        search_ttl (float): Время жизни закэшированной страницы поиска в секундах.
+        search_maxsize (int): Максимальное количество закэшированных страниц поиска.
+        replies_refresh_interval (float): Как часто в секундах проверять, не изменили ли контакты и категории
+            другие процессы, и пересобирать готовые ответы бота; 0 отключает проверку.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="CACHE_", extra="ignore", env_file=".env")
+    user_ttl: float = 300.0
+    user_maxsize: int = 10_000
+    shared_url: str | None = None
+    user_shared_ttl: float = 3600.0
+    user_shared_local_ttl: float = 1.0
+    search_ttl: float = 300.0
+    search_maxsize: int = 2048
+    replies_refresh_interval: float = 60.0
+
+
+class SearchSettings(BaseSettings):
+    """
+    Настройки поиска по каталогу.
+
+    Attributes:
+        page_size (int): Количество результатов на одной странице выдачи.
+        session_ttl (float): Сколько секунд доступна кнопка перехода на следующую страницу.
+        ts_config (str): Конфигурация полнотекстового поиска PostgreSQL для запросов
+            (`simple` — без стемминга, `russian` — со стеммингом русских слов).
+        prefix_match (bool): Искать ли слова запроса по префиксу (`:*`).
+        prefix_min_length (int): Минимальная длина слова, которое ищется по префиксу.
+        max_terms (int): Максимальное количество слов в запросе.
+        part_number_min_length (int): Минимальная длина артикула (без разделителей), при которой
+            запрос ищется по артикулу.
+        part_number_similarity (float): Порог сходства триграмм для нечеткого поиска по артикулу;
+            0 отключает нечеткий поиск.
+        vehicle_mode (Literal["off", "boost", "filter"]): Как учитывать автомобили пользователя:
+            `off` — не учитывать, `boost` — поднимать подходящие запчасти в выдаче,
+            `filter` — показывать только подходящие запчасти (товары показываются всегда).
+        vehicle_boost (float): Добавка к рангу запчасти, подходящей к автомобилю пользователя, в режиме `boost`.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="SEARCH_", extra="ignore", env_file=".env")
+    page_size: int = 5
+    session_ttl: float = 1800.0
+    ts_config: str = "simple"
+    prefix_match: bool = True
+    prefix_min_length: int = 3
+    max_terms: int = 8
+    part_number_min_length: int = 4
+    part_number_similarity: float = 0.5
+    vehicle_mode: Literal["off", "boost", "filter"] = "boost"
+    vehicle_boost: float = 1.0
+
+
+class CatalogSettings(BaseSettings):
+    """
+    Настройки просмотра каталога по категориям.
+
+    Attributes:
+        page_size (int): Количество запчастей или товаров на одной странице категории.
+        session_ttl (float): Сколько секунд доступна кнопка перехода на следующую страницу категории.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="CATALOG_", extra="ignore", env_file=".env")
+    page_size: int = 10
+    session_ttl: float = 1800.0
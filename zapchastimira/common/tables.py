@@ -18,6 +18,10 @@ class UserStateEnum(StrEnum):
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (
+        sa.Index("idx_user_tg_uid", "tg_uid", unique=True),
+        sa.Index("idx_user_phone", "phone", unique=True),
+    )
     user_id: Mapped[str] = mapped_column(primary_key=True)
     phone: Mapped[str | None]
     tg_uid: Mapped[str | None]
@@ -26,6 +30,7 @@ class User(Base):
 
 class UserCars(Base):
     __tablename__ = "user_cars"
+    __table_args__ = (sa.Index("idx_user_cars_user_id", "user_id"),)
 
     car_id: Mapped[str] = mapped_column(primary_key=True)
     user_id: Mapped[str] = mapped_column(sa.ForeignKey("user.user_id"))
@@ -44,6 +49,7 @@ class Category(Base):
 
 class ProductCategory(Base):
     __tablename__ = "product_category"
+    __table_args__ = (sa.Index("idx_product_category_base_categoty_id", "base_categoty_id"),)
     category_id: Mapped[str] = mapped_column(primary_key=True)
     name: Mapped[str]
     description: Mapped[str | None]
@@ -53,6 +59,11 @@ class ProductCategory(Base):
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        sa.Index("idx_products_search_vector", "search_vector", postgresql_using="gin"),
+        # Страницы категории: поиск по category_id и порядок по названию без сортировки.
+        sa.Index("idx_products_category_id_name", "category_id", "name", "product_id"),
+    )
     product_id: Mapped[str] = mapped_column(primary_key=True)
     name: Mapped[str]
     description: Mapped[str | None]
@@ -60,12 +71,15 @@ class Product(Base):
     stock_quantity: Mapped[int]
     page_url: Mapped[str]
     search_vector: Mapped[TSVECTOR] = mapped_column(TSVECTOR)
+    # Названия категории и базовой категории для поискового вектора; поддерживаются триггерами.
+    category_path: Mapped[str | None]
 
     category_id: Mapped[str] = mapped_column(sa.ForeignKey("product_category.category_id"))
 
 
 class PartCategory(Base):
     __tablename__ = "part_category"
+    __table_args__ = (sa.Index("idx_part_category_base_categoty_id", "base_categoty_id"),)
     category_id: Mapped[str] = mapped_column(primary_key=True)
     name: Mapped[str]
     description: Mapped[str | None]
@@ -75,8 +89,28 @@ class PartCategory(Base):
 
 class Part(Base):
     __tablename__ = "parts"
+    __table_args__ = (
+        sa.Index("idx_parts_search_vector", "search_vector", postgresql_using="gin"),
+        # Страницы категории: поиск по category_id и порядок по названию без сортировки.
+        sa.Index("idx_parts_category_id_name", "category_id", "name", "part_id"),
+        sa.Index(
+            "idx_parts_part_number_normalized",
+            "part_number_normalized",
+            postgresql_ops={"part_number_normalized": "text_pattern_ops"},
+        ),
+        sa.Index(
+            "idx_parts_part_number_normalized_trgm",
+            "part_number_normalized",
+            postgresql_using="gin",
+            postgresql_ops={"part_number_normalized": "gin_trgm_ops"},
+        ),
+    )
     part_id: Mapped[str] = mapped_column(primary_key=True)
     part_number: Mapped[str] = mapped_column(unique=True)
+    # Артикул без разделителей в верхнем регистре: «ab-00012.3» -> «AB000123».
+    part_number_normalized: Mapped[str] = mapped_column(
+        sa.Computed("upper(regexp_replace(part_number, '[^[:alnum:]]', '', 'g'))", persisted=True)
+    )
     name: Mapped[str]
     description: Mapped[str | None]
     brand: Mapped[str]
@@ -85,10 +119,28 @@ class Part(Base):
     stock_quantity: Mapped[int]
     image_url: Mapped[str | None]
     search_vector: Mapped[TSVECTOR] = mapped_column(TSVECTOR)
+    # Названия категории и базовой категории для поискового вектора; поддерживаются триггерами.
+    category_path: Mapped[str | None]
 
     category_id: Mapped[str] = mapped_column(sa.ForeignKey("part_category.category_id"))
 
 
+# Индекс совместимости: разобранная колонка `parts.compatibility` (см. `parse_compatibility`).
+class PartCompatibility(Base):
+    __tablename__ = "part_compatibility"
+    __table_args__ = (
+        sa.Index("idx_part_compatibility_part_id", "part_id"),
+        sa.Index("idx_part_compatibility_vehicle", "make", "model"),
+    )
+    compatibility_id: Mapped[int] = mapped_column(sa.BigInteger, sa.Identity(), primary_key=True)
+    part_id: Mapped[str] = mapped_column(sa.ForeignKey("parts.part_id", ondelete="CASCADE"))
+    make: Mapped[str]
+    # None — любая модель марки; None в годах — без ограничения.
+    model: Mapped[str | None]
+    year_from: Mapped[int | None]
+    year_to: Mapped[int | None]
+
+
 class Contact(Base):
     __tablename__ = "contacts"
     contact_id: Mapped[str] = mapped_column(primary_key=True)
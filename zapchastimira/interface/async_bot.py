@@ -0,0 +1,236 @@
+"""
+Асинхронная точка входа бота: `AsyncTeleBot` и репозитории на asyncpg.
+
+Обработчики выполняются задачами одного цикла событий, а запросы к базе —
+через асинхронный пул (`zapchastimira.repositories.aio`), поэтому один процесс
+обслуживает сотни одновременных поисков без потока на каждый запрос и с
+небольшим пулом соединений. Логика ответов общая с `zapchastimira.interface.telegram`:
+синхронные обработчики выполняются через `run_sync`, а исходящие сообщения
+отправляет тот же `OutboundScheduler`. Сообщения одного чата обрабатываются
+по порядку, разных чатов — одновременно, но не больше `TELEGRAM_MAX_IN_FLIGHT`.
+
+Как и синхронный модуль, импортируется без токена: бот создается при первом
+обращении (`get_async_bot`). Для запуска нужна дополнительная зависимость `async`:
+    python -m zapchastimira.interface.async_bot
+"""
+
+import asyncio
+import logging
+from functools import cache
+from typing import Any, Hashable
+
+from telebot import asyncio_helper
+from telebot.async_telebot import AsyncTeleBot
+from telebot.types import CallbackQuery, Message, Update
+
+from zapchastimira.common.db_utils import dispose_async_engines
+from zapchastimira.common.settings import TelegramSettings
+from zapchastimira.interface import telegram
+from zapchastimira.interface.dispatch import get_update_key
+from zapchastimira.interface.replies import (
+    CATALOG_CALLBACK,
+    CATEGORY_CALLBACK,
+    render_category_menu,
+    replies,
+)
+from zapchastimira.interface.telegram import (
+    app,
+    catalog_sessions,
+    edit_menu,
+    is_catalog_item_callback,
+    search_sessions,
+    show_category_items,
+    show_next_category_page,
+    show_next_search_page,
+)
+from zapchastimira.repositories.aio import run_sync
+from zapchastimira.repositories.category import BASE_CATEGORY
+from zapchastimira.services.category_tree import category_tree, list_category
+from zapchastimira.services.search_service import search_by_products
+
+logger = logging.getLogger(__name__)
+
+
+class OrderedAsyncTeleBot(AsyncTeleBot):
+    """
+    `AsyncTeleBot`, который сохраняет порядок обновлений внутри чата.
+
+    Каждое обновление обрабатывается отдельной задачей, которая ждет завершения
+    предыдущего обновления того же чата (см. `get_update_key`). Одновременно
+    выполняется не больше `max_in_flight` обработчиков, остальные ждут в очереди.
+    """
+
+    def __init__(self, token: str, max_in_flight: int, **kwargs: Any):
+        """
+        Инициализирует бота.
+
+        Args:
+            token (str): Токен Telegram бота.
+            max_in_flight (int): Максимальное количество одновременно выполняемых обработчиков.
+            **kwargs: Остальные аргументы `AsyncTeleBot`.
+        """
+        super().__init__(token, **kwargs)
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._tails: dict[Hashable, asyncio.Task] = {}
+
+    async def process_new_updates(self, updates: list[Update]) -> None:
+        # Задачи создаются без ожидания, поэтому очередь каждого чата повторяет порядок обновлений.
+        for update in updates:
+            key = get_update_key(update)
+            self._tails[key] = asyncio.create_task(self._process_in_order(key, self._tails.get(key), update))
+
+    async def _process_in_order(self, key: Hashable, previous: asyncio.Task | None, update: Update) -> None:
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            async with self._slots:
+                await super().process_new_updates([update])
+        except Exception:
+            logger.exception("Update handler failed for %s", key)
+        finally:
+            if self._tails.get(key) is asyncio.current_task():
+                del self._tails[key]
+
+
+def create_async_bot(settings: TelegramSettings) -> OrderedAsyncTeleBot:
+    """
+    Создает асинхронного бота из настроек и регистрирует обработчики.
+
+    Args:
+        settings (TelegramSettings): Настройки бота.
+
+    Returns:
+        OrderedAsyncTeleBot: Бот.
+    """
+    if settings.api_url:
+        asyncio_helper.API_URL = settings.api_url
+    bot = OrderedAsyncTeleBot(settings.token, max_in_flight=settings.max_in_flight)
+    register_handlers(bot)
+    return bot
+
+
+@cache
+def get_async_bot() -> OrderedAsyncTeleBot:
+    """
+    Возвращает асинхронного бота процесса, создавая его при первом вызове по настройкам `app`.
+
+    Returns:
+        OrderedAsyncTeleBot: Бот.
+    """
+    return create_async_bot(app.settings)
+
+
+# Команды и сообщения не отвечают Bot API напрямую: синхронные обработчики только обращаются
+# к базе и ставят ответы в очередь `outbound`, поэтому целиком выполняются через `run_sync`.
+async def send_welcome(message: Message) -> None:
+    await run_sync(telegram.send_welcome, message)
+
+
+async def start_search(message: Message) -> None:
+    await run_sync(telegram.start_search, message)
+
+
+async def get_contact(message: Message) -> None:
+    await run_sync(telegram.get_contact, message)
+
+
+async def show_catalog(message: Message) -> None:
+    await run_sync(telegram.show_catalog, message)
+
+
+async def back_to_catalog(call: CallbackQuery) -> None:
+    await get_async_bot().answer_callback_query(call.id)
+    edit_menu(call, await run_sync(replies.get, "catalog"))
+
+
+async def open_category(call: CallbackQuery) -> None:
+    node = await run_sync(category_tree.get, BASE_CATEGORY, call.data.removeprefix(CATEGORY_CALLBACK))
+    if node is None:
+        await get_async_bot().answer_callback_query(call.id, "Категория не найдена, откройте /catalog заново.")
+        return
+    await get_async_bot().answer_callback_query(call.id)
+    edit_menu(call, render_category_menu(node))
+
+
+async def open_category_items(call: CallbackQuery) -> None:
+    kind, _, category_id = call.data.partition(":")
+    node = await run_sync(category_tree.get, kind, category_id)
+    if node is None:
+        await get_async_bot().answer_callback_query(call.id, "Категория не найдена, откройте /catalog заново.")
+        return
+    page = await run_sync(list_category, node)
+    await get_async_bot().answer_callback_query(call.id)
+    show_category_items(call, node, page)
+
+
+async def next_category_page(call: CallbackQuery) -> None:
+    session = catalog_sessions.get(call.data.removeprefix("browse:"))
+    if session is None:
+        await get_async_bot().answer_callback_query(call.id, "Список устарел, откройте /catalog заново.")
+        return
+    kind, category_id, cursor = session
+    node = await run_sync(category_tree.get, kind, category_id)
+    if node is None:
+        await get_async_bot().answer_callback_query(call.id, "Список устарел, откройте /catalog заново.")
+        return
+
+    page = await run_sync(list_category, node, cursor)
+    await get_async_bot().answer_callback_query(call.id)
+    show_next_category_page(call, node, page)
+
+
+async def next_search_page(call: CallbackQuery) -> None:
+    session = search_sessions.get(call.data.removeprefix("search:"))
+    if session is None:
+        await get_async_bot().answer_callback_query(call.id, "Результаты устарели, повторите поиск.")
+        return
+
+    query, user_id, cursor = session
+    page = await run_sync(search_by_products, query, user_id, cursor=cursor)
+    await get_async_bot().answer_callback_query(call.id)
+    show_next_search_page(call, query, user_id, page)
+
+
+async def handle_message(message: Message) -> None:
+    await run_sync(telegram.handle_message, message)
+
+
+def register_handlers(bot: OrderedAsyncTeleBot) -> None:
+    """
+    Регистрирует обработчики в том же порядке, что и `telegram.register_handlers`.
+
+    Args:
+        bot (OrderedAsyncTeleBot): Бот.
+    """
+    bot.register_message_handler(send_welcome, commands=["start"])
+    bot.register_message_handler(start_search, commands=["search"])
+    bot.register_message_handler(get_contact, commands=["contact"])
+    bot.register_message_handler(show_catalog, commands=["catalog"])
+    bot.register_callback_query_handler(back_to_catalog, func=lambda call: call.data == CATALOG_CALLBACK)
+    bot.register_callback_query_handler(open_category, func=lambda call: call.data.startswith(CATEGORY_CALLBACK))
+    bot.register_callback_query_handler(open_category_items, func=is_catalog_item_callback)
+    bot.register_callback_query_handler(next_category_page, func=lambda call: call.data.startswith("browse:"))
+    bot.register_callback_query_handler(next_search_page, func=lambda call: call.data.startswith("search:"))
+    bot.register_message_handler(handle_message, func=lambda message: True)
+
+
+async def run() -> None:
+    bot = get_async_bot()
+    # Готовые ответы и дерево категорий собираются до приема обновлений: в цикле событий
+    # обработчик, который ждет первую сборку, остановил бы все остальные.
+    app.start(background=False)
+    category_tree.refresh()
+    try:
+        await bot.infinity_polling()
+    finally:
+        app.stop()
+        await bot.close_session()
+        await dispose_async_engines()
+
+
+def main() -> None:
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
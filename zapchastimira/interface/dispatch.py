@@ -0,0 +1,164 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+
+import telebot
+from telebot.types import Update
+
+logger = logging.getLogger(__name__)
+
+
+def get_update_key(update: Update) -> Hashable:
+    """
+    Определяет ключ очереди, в которой должно обрабатываться обновление.
+
+    Обновления одного чата получают одинаковый ключ и обрабатываются строго
+    последовательно. Обновления без чата (например, inline-запросы) группируются
+    по отправителю, а если и его нет — обрабатываются независимо.
+
+    Args:
+        update (Update): Обновление Telegram.
+
+    Returns:
+        Hashable: Ключ очереди обработки.
+    """
+    message = (
+        update.message
+        or update.edited_message
+        or update.channel_post
+        or update.edited_channel_post
+        or (update.callback_query.message if update.callback_query else None)
+    )
+    if message is not None and getattr(message, "chat", None) is not None:
+        return ("chat", message.chat.id)
+
+    for event in (update.callback_query, update.inline_query, update.chosen_inline_result):
+        if event is not None and event.from_user is not None:
+            return ("user", event.from_user.id)
+
+    return ("update", update.update_id)
+
+
+class ChatOrderedExecutor:
+    """
+    Пул потоков, сохраняющий порядок задач внутри одного ключа.
+
+    Задачи с одинаковым ключом выполняются по одной в порядке поступления,
+    задачи с разными ключами — параллельно. Количество принятых, но еще не
+    завершенных задач ограничено `max_in_flight`: при достижении лимита
+    `submit` блокирует вызывающий поток, что замедляет получение новых
+    обновлений и защищает базу данных от перегрузки.
+
+    Attributes:
+        workers (int): Количество рабочих потоков.
+        max_in_flight (int): Максимальное количество задач в обработке и в очереди.
+    """
+
+    def __init__(self, workers: int, max_in_flight: int):
+        """
+        Инициализирует пул.
+
+        Args:
+            workers (int): Количество рабочих потоков.
+            max_in_flight (int): Максимальное количество задач в обработке и в очереди.
+        """
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dispatch")
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._pending: dict[Hashable, deque[Callable[[], Any]]] = {}
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """
+        Ставит задачу в очередь ключа.
+
+        Args:
+            key (Hashable): Ключ упорядочивания (например, идентификатор чата).
+            fn (Callable[..., Any]): Функция для выполнения.
+            *args: Позиционные аргументы функции.
+            **kwargs: Именованные аргументы функции.
+        """
+        self._slots.acquire()
+        task = lambda: fn(*args, **kwargs)  # noqa: E731
+        with self._lock:
+            queue = self._pending.get(key)
+            if queue is not None:
+                queue.append(task)
+                return
+            self._pending[key] = deque((task,))
+        self._executor.submit(self._run_next, key)
+
+    def _run_next(self, key: Hashable) -> None:
+        with self._lock:
+            task = self._pending[key][0]
+        try:
+            task()
+        except Exception:
+            logger.exception("Update handler failed for %s", key)
+        finally:
+            self._slots.release()
+            with self._lock:
+                queue = self._pending[key]
+                queue.popleft()
+                has_next = bool(queue)
+                if not has_next:
+                    del self._pending[key]
+            # Следующая задача того же ключа снова встает в общую очередь пула,
+            # чтобы один активный чат не занимал поток целиком.
+            if has_next:
+                self._executor.submit(self._run_next, key)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Останавливает пул.
+
+        Args:
+            wait (bool): Дождаться ли завершения уже принятых задач.
+        """
+        if wait:
+            for _ in range(self.max_in_flight):
+                self._slots.acquire()
+            for _ in range(self.max_in_flight):
+                self._slots.release()
+        self._executor.shutdown(wait=wait)
+
+
+class OrderedTeleBot(telebot.TeleBot):
+    """
+    `TeleBot`, который обрабатывает обновления разных чатов параллельно.
+
+    Бот работает в режиме `threaded=False`, а распределение обновлений по
+    потокам выполняет `ChatOrderedExecutor`: сообщения одного пользователя
+    обрабатываются последовательно, разных пользователей — одновременно.
+    """
+
+    # Задается в `TeleBot.__init__` без аннотации.
+    last_update_id: int
+
+    def __init__(self, token: str, executor: ChatOrderedExecutor, **kwargs: Any):
+        """
+        Инициализирует бота.
+
+        Args:
+            token (str): Токен Telegram бота.
+            executor (ChatOrderedExecutor): Пул, в котором выполняются обработчики.
+            **kwargs: Остальные аргументы `telebot.TeleBot`.
+        """
+        kwargs["threaded"] = False
+        super().__init__(token, **kwargs)
+        self.executor = executor
+
+    def process_new_updates(self, updates: list[Update]) -> None:
+        for update in updates:
+            # Смещение нужно сдвинуть сразу: цикл опроса запрашивает следующую
+            # пачку до того, как рабочие потоки успеют обработать текущую.
+            if update.update_id > self.last_update_id:
+                self.last_update_id = update.update_id
+            self.executor.submit(get_update_key(update), super().process_new_updates, [update])
+
+    def stop_bot(self) -> None:
+        super().stop_bot()
+        self.executor.shutdown(wait=True)
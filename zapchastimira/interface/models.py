@@ -5,16 +5,16 @@ class OutputSearchDataProduct(BaseModel):
     name: str
     price: float
     stock_quantity: int
-    description: str
-    url: str
+    description: str | None = None
+    url: str | None = None
 
     def __str__(self):
         return f"""
 Название товара: {self.name}
 цена: {self.price}
 количество {self.stock_quantity}
-описание: {self.description}
-ссылка: {self.url}
+описание: {self.description or "Не указано"}
+ссылка: {self.url or "Не указана"}
 """
 
 
@@ -24,9 +24,9 @@ class OutputSearchDataPart(BaseModel):
     part_number: str
     price: float
     stock_quantity: int
-    description: str
-    url: str
-    compatibility: str
+    description: str | None = None
+    url: str | None = None
+    compatibility: str | None = None
 
     def __str__(self):
         return f"""
@@ -34,8 +34,8 @@ class OutputSearchDataPart(BaseModel):
 цена: {self.price}
 номер запчасти: {self.part_number}
 бренд: {self.brand}
-совместимость: {self.compatibility}
+совместимость: {self.compatibility or "Не указана"}
 количество {self.stock_quantity}
-описание: {self.description}
-ссылка: {self.url}
+описание: {self.description or "Не указано"}
+ссылка: {self.url or "Не указана"}
 """
@@ -0,0 +1,391 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import partial
+from typing import Any, Callable, Hashable, Iterable
+
+from telebot.apihelper import ApiTelegramException
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """
+    Приоритет исходящего сообщения: меньшее значение отправляется раньше.
+    """
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты «корзина токенов».
+
+    Корзина пополняется со скоростью `rate` токенов в секунду до `capacity`;
+    каждая отправка забирает один токен. Не потокобезопасна: используется под
+    блокировкой планировщика.
+
+    Attributes:
+        rate (float): Скорость пополнения в токенах в секунду.
+        capacity (float): Максимальное количество токенов (допустимый всплеск).
+    """
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        """
+        Инициализирует полную корзину.
+
+        Args:
+            rate (float): Скорость пополнения в токенах в секунду.
+            capacity (float): Максимальное количество токенов.
+            now (float): Текущее время.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = now
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, now: float) -> float:
+        """
+        Возвращает время до появления токена.
+
+        Args:
+            now (float): Текущее время.
+
+        Returns:
+            float: Секунды ожидания; 0, если токен есть.
+        """
+        self._refill(now)
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        """
+        Забирает один токен.
+
+        Args:
+            now (float): Текущее время.
+        """
+        self._refill(now)
+        self._tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        """
+        Проверяет, полна ли корзина (ограничение не действует).
+
+        Args:
+            now (float): Текущее время.
+
+        Returns:
+            bool: True, если корзина полна.
+        """
+        self._refill(now)
+        return self._tokens >= self.capacity
+
+
+@dataclass
+class OutboundStats:
+    """
+    Счетчики планировщика исходящих сообщений.
+
+    Attributes:
+        queued (int): Количество сообщений (пакетов), ожидающих отправки.
+        sent (int): Количество успешных вызовов Bot API.
+        retried (int): Количество повторов после ответа 429.
+        failed (int): Количество сообщений, отправка которых завершилась ошибкой.
+    """
+
+    queued: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+@dataclass
+class _Job:
+    calls: list[Callable[[], Any]]
+    priority: Priority
+    future: Future
+    batch: bool
+    results: list[Any] = field(default_factory=list)
+    retries: int = 0
+
+
+IDLE, READY, SLEEPING, BUSY = "idle", "ready", "sleeping", "busy"
+
+
+@dataclass
+class _Chat:
+    bucket: TokenBucket
+    jobs: deque[_Job] = field(default_factory=deque)
+    state: str = IDLE
+
+
+def retry_after(error: BaseException) -> float | None:
+    """
+    Извлекает время ожидания из ответа Bot API `429 Too Many Requests`.
+
+    Args:
+        error (BaseException): Ошибка вызова Bot API.
+
+    Returns:
+        float | None: Секунды до повтора или None, если ошибка не 429.
+    """
+    if isinstance(error, ApiTelegramException) and error.error_code == 429:
+        return float((error.result_json.get("parameters") or {}).get("retry_after", 1))
+    return None
+
+
+class OutboundScheduler:
+    """
+    Планировщик исходящих вызовов Bot API с ограничением частоты.
+
+    Обработчики не вызывают Bot API сами, а ставят вызовы в очередь и сразу
+    освобождают поток. Поток планировщика выбирает чат с самым приоритетным
+    сообщением и отправляет его в пуле потоков, если это разрешают общая корзина
+    токенов (ограничение Telegram ~30 сообщений в секунду на бота) и корзина чата
+    (~1 сообщение в секунду в чат, с небольшим всплеском). Сообщения одного чата
+    отправляются строго по очереди; части одного ответа (`submit_batch`) идут
+    подряд. Ответ `429` с `retry_after` откладывает только свой чат, не занимая
+    потоки, и сообщение повторяется до `max_retries` раз.
+
+    Attributes:
+        rate (float): Общая частота отправки в сообщениях в секунду.
+        chat_rate (float): Частота отправки в один чат в сообщениях в секунду.
+        chat_burst (int): Сколько сообщений подряд можно отправить в чат без ожидания.
+        max_retries (int): Сколько раз повторять сообщение после ответа 429.
+    """
+
+    def __init__(
+        self,
+        rate: float = 30.0,
+        chat_rate: float = 1.0,
+        chat_burst: int = 3,
+        workers: int = 8,
+        max_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Инициализирует планировщик. Поток планировщика запускается при первой отправке.
+
+        Args:
+            rate (float): Общая частота отправки в сообщениях в секунду.
+            chat_rate (float): Частота отправки в один чат в сообщениях в секунду.
+            chat_burst (int): Сколько сообщений подряд можно отправить в чат без ожидания.
+            workers (int): Количество потоков, выполняющих вызовы Bot API.
+            max_retries (int): Сколько раз повторять сообщение после ответа 429.
+            clock (Callable[[], float]): Источник времени, по умолчанию `time.monotonic`.
+        """
+        self.rate = rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._clock = clock
+        self._global = TokenBucket(rate, max(1.0, rate), clock())
+        self._chats: dict[Hashable, _Chat] = {}
+        self._ready: list[tuple[int, int, Hashable]] = []
+        self._sleeping: list[tuple[float, int, Hashable]] = []
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._stats = OutboundStats()
+        self._stopping = False
+        # Потоки пула создаются по мере необходимости при первых отправках.
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outbound")
+        self._thread: threading.Thread | None = None
+        self._pruned_at = clock()
+
+    def submit(
+        self, chat_id: Hashable, fn: Callable[..., Any], *args: Any, priority: Priority = Priority.NORMAL, **kwargs: Any
+    ) -> Future:
+        """
+        Ставит вызов Bot API в очередь чата.
+
+        Args:
+            chat_id (Hashable): Чат, в который отправляется сообщение.
+            fn (Callable[..., Any]): Метод бота (например, `bot.reply_to`).
+            *args: Позиционные аргументы метода.
+            priority (Priority): Приоритет сообщения.
+            **kwargs: Именованные аргументы метода.
+
+        Returns:
+            Future: Результат вызова (например, отправленное сообщение).
+        """
+        return self._enqueue(chat_id, [partial(fn, *args, **kwargs)], priority, batch=False)
+
+    def submit_batch(
+        self, chat_id: Hashable, calls: Iterable[Callable[[], Any]], priority: Priority = Priority.NORMAL
+    ) -> Future:
+        """
+        Ставит в очередь чата несколько вызовов, которые отправляются подряд (части одного ответа).
+
+        Каждая часть расходует токены как отдельное сообщение. Если часть не удалось
+        отправить, остальные части не отправляются.
+
+        Args:
+            chat_id (Hashable): Чат, в который отправляются сообщения.
+            calls (Iterable[Callable[[], Any]]): Вызовы Bot API без аргументов, например `functools.partial`.
+            priority (Priority): Приоритет ответа.
+
+        Returns:
+            Future: Список результатов вызовов.
+        """
+        return self._enqueue(chat_id, list(calls), priority, batch=True)
+
+    def stats(self) -> OutboundStats:
+        """
+        Возвращает счетчики планировщика.
+
+        Returns:
+            OutboundStats: Снимок счетчиков.
+        """
+        with self._condition:
+            return OutboundStats(
+                queued=self._stats.queued,
+                sent=self._stats.sent,
+                retried=self._stats.retried,
+                failed=self._stats.failed,
+            )
+
+    def stop(self, wait: bool = True) -> None:
+        """
+        Останавливает планировщик; новые сообщения не принимаются.
+
+        Args:
+            wait (bool): Дождаться ли отправки уже принятых сообщений.
+        """
+        with self._condition:
+            self._stopping = True
+            if not wait:
+                for chat in self._chats.values():
+                    if chat.state == BUSY:
+                        continue
+                    while chat.jobs:
+                        self._fail(chat.jobs.popleft(), RuntimeError("Outbound scheduler stopped"))
+                    chat.state = IDLE
+                self._ready.clear()
+                self._sleeping.clear()
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=wait)
+
+    def _enqueue(self, chat_id: Hashable, calls: list[Callable[[], Any]], priority: Priority, batch: bool) -> Future:
+        future: Future = Future()
+        job = _Job(calls=calls, priority=priority, future=future, batch=batch)
+        if not calls:
+            future.set_result([])
+            return future
+
+        with self._condition:
+            if self._stopping:
+                raise RuntimeError("Outbound scheduler is stopped")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="outbound-scheduler", daemon=True)
+                self._thread.start()
+            chat = self._chats.get(chat_id)
+            if chat is None:
+                chat = self._chats[chat_id] = _Chat(TokenBucket(self.chat_rate, self.chat_burst, self._clock()))
+            chat.jobs.append(job)
+            self._stats.queued += 1
+            if chat.state == IDLE:
+                self._make_ready(chat_id, chat)
+            self._condition.notify()
+        return future
+
+    def _make_ready(self, chat_id: Hashable, chat: _Chat) -> None:
+        chat.state = READY
+        heapq.heappush(self._ready, (chat.jobs[0].priority, next(self._seq), chat_id))
+
+    def _sleep(self, chat_id: Hashable, chat: _Chat, until: float) -> None:
+        chat.state = SLEEPING
+        heapq.heappush(self._sleeping, (until, next(self._seq), chat_id))
+
+    def _run(self) -> None:
+        with self._condition:
+            while True:
+                now = self._clock()
+                while self._sleeping and self._sleeping[0][0] <= now:
+                    _, _, chat_id = heapq.heappop(self._sleeping)
+                    self._make_ready(chat_id, self._chats[chat_id])
+                if now - self._pruned_at > 60:
+                    self._prune(now)
+
+                if not self._ready:
+                    if self._stopping and not self._stats.queued:
+                        return
+                    self._condition.wait(self._sleeping[0][0] - now if self._sleeping else None)
+                    continue
+                wait = self._global.delay(now)
+                if wait > 0:
+                    self._condition.wait(wait)
+                    continue
+
+                _, _, chat_id = heapq.heappop(self._ready)
+                chat = self._chats[chat_id]
+                wait = chat.bucket.delay(now)
+                if wait > 0:
+                    self._sleep(chat_id, chat, now + wait)
+                    continue
+                self._global.take(now)
+                chat.bucket.take(now)
+                chat.state = BUSY
+                self._executor.submit(self._send, chat_id, chat, chat.jobs[0])
+
+    def _send(self, chat_id: Hashable, chat: _Chat, job: _Job) -> None:
+        error: BaseException | None = None
+        try:
+            result = job.calls[len(job.results)]()
+        except Exception as exc:
+            error = exc
+
+        with self._condition:
+            if error is None:
+                self._stats.sent += 1
+                job.results.append(result)
+                if len(job.results) == len(job.calls):
+                    chat.jobs.popleft()
+                    self._finish(job)
+            else:
+                delay = retry_after(error)
+                if delay is not None and job.retries < self.max_retries:
+                    job.retries += 1
+                    self._stats.retried += 1
+                    logger.warning("Bot API rate limit for chat %s, retrying in %.1f s", chat_id, delay)
+                    self._sleep(chat_id, chat, self._clock() + delay)
+                    self._condition.notify()
+                    return
+                logger.error("Failed to send message to chat %s: %s", chat_id, error)
+                chat.jobs.popleft()
+                self._fail(job, error)
+
+            if chat.jobs:
+                self._make_ready(chat_id, chat)
+            else:
+                chat.state = IDLE
+            self._condition.notify()
+
+    def _finish(self, job: _Job) -> None:
+        self._stats.queued -= 1
+        job.future.set_result(job.results if job.batch else job.results[0])
+
+    def _fail(self, job: _Job, error: BaseException) -> None:
+        self._stats.queued -= 1
+        self._stats.failed += 1
+        job.future.set_exception(error)
+
+    def _prune(self, now: float) -> None:
+        # Корзины простаивающих чатов восстановились и больше не нужны.
+        idle = [chat_id for chat_id, chat in self._chats.items() if chat.state == IDLE and chat.bucket.is_full(now)]
+        for chat_id in idle:
+            del self._chats[chat_id]
+        self._pruned_at = now
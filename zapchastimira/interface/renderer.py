@@ -0,0 +1,163 @@
+from typing import Iterable, Iterator
+
+from zapchastimira.repositories.search import CatalogSearchRepository, SearchHit
+
+# Ограничение Telegram на длину текста одного сообщения.
+MESSAGE_LIMIT = 4096
+
+SEARCH_HEADER = "Результаты поиска:\n\n"
+SEARCH_FOOTER = "Чтобы выйти нажмите /start"
+CATEGORY_HEADER = "Категория «{title}»:\n\n"
+
+# Шаблоны разбираются один раз при импорте: `str.format` связан с готовой строкой.
+PART_TEMPLATE = """
+Название товара: {name}
+цена: {price}
+номер запчасти: {part_number}
+бренд: {brand}
+совместимость: {compatibility}
+количество {stock_quantity}
+описание: {description}
+ссылка: {url}
+
+
+""".format
+
+PRODUCT_TEMPLATE = """
+Название товара: {name}
+цена: {price}
+количество {stock_quantity}
+описание: {description}
+ссылка: {url}
+
+
+""".format
+
+
+def render_hit(hit: SearchHit) -> str:
+    """
+    Форматирует одну запчасть или товар из выдачи поиска.
+
+    Args:
+        hit (SearchHit): Строка выдачи.
+
+    Returns:
+        str: Текст карточки, заканчивающийся пустой строкой.
+    """
+    if hit.kind == CatalogSearchRepository.PART:
+        return PART_TEMPLATE(
+            name=hit.name,
+            price=float(hit.price),
+            part_number=hit.part_number,
+            brand=hit.brand,
+            compatibility=hit.compatibility or "Не указана",
+            stock_quantity=hit.stock_quantity,
+            description=hit.description or "Не указано",
+            url=hit.page_url or "Не указана",
+        )
+    return PRODUCT_TEMPLATE(
+        name=hit.name,
+        price=float(hit.price),
+        stock_quantity=hit.stock_quantity,
+        description=hit.description or "Не указано",
+        url=hit.page_url or "Не указана",
+    )
+
+
+def split_text(text: str, limit: int = MESSAGE_LIMIT) -> Iterator[str]:
+    """
+    Делит текст длиннее `limit` на части, стараясь резать по переводам строк.
+
+    Args:
+        text (str): Текст.
+        limit (int): Максимальная длина части.
+
+    Yields:
+        str: Части текста не длиннее `limit`.
+    """
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit) + 1 or limit
+        yield text[:cut]
+        text = text[cut:]
+    if text:
+        yield text
+
+
+def chunk_blocks(blocks: Iterable[str], limit: int = MESSAGE_LIMIT) -> Iterator[str]:
+    """
+    Собирает блоки текста в сообщения не длиннее `limit`, не разрывая блоки без необходимости.
+
+    Сообщение отдается, как только следующий блок в него не помещается, поэтому первое
+    сообщение доступно до того, как отформатированы остальные блоки.
+
+    Args:
+        blocks (Iterable[str]): Блоки текста (заголовок, карточки, подвал).
+        limit (int): Максимальная длина сообщения.
+
+    Yields:
+        str: Тексты сообщений.
+    """
+    parts: list[str] = []
+    size = 0
+    for block in blocks:
+        if size + len(block) > limit and parts:
+            yield "".join(parts)
+            parts, size = [], 0
+        if len(block) > limit:
+            *full, block = split_text(block, limit)
+            yield from full
+        parts.append(block)
+        size += len(block)
+    if parts:
+        yield "".join(parts)
+
+
+def render_hits(hits: Iterable[SearchHit], header: str, limit: int = MESSAGE_LIMIT) -> Iterator[str]:
+    """
+    Форматирует запчасти и товары в сообщения Telegram.
+
+    Args:
+        hits (Iterable[SearchHit]): Запчасти и товары в порядке показа.
+        header (str): Заголовок первого сообщения.
+        limit (int): Максимальная длина сообщения.
+
+    Yields:
+        str: Тексты сообщений; последнее заканчивается подсказкой /start.
+    """
+
+    def blocks() -> Iterator[str]:
+        yield header
+        for hit in hits:
+            yield render_hit(hit)
+        yield SEARCH_FOOTER
+
+    return chunk_blocks(blocks(), limit)
+
+
+def render_search_results(hits: Iterable[SearchHit], limit: int = MESSAGE_LIMIT) -> Iterator[str]:
+    """
+    Форматирует выдачу поиска в сообщения Telegram.
+
+    Args:
+        hits (Iterable[SearchHit]): Запчасти и товары в порядке выдачи.
+        limit (int): Максимальная длина сообщения.
+
+    Yields:
+        str: Тексты сообщений; первое начинается заголовком, последнее заканчивается подсказкой /start.
+    """
+    return render_hits(hits, SEARCH_HEADER, limit)
+
+
+def render_category_page(title: str, hits: Iterable[SearchHit], limit: int = MESSAGE_LIMIT) -> Iterator[str]:
+    """
+    Форматирует страницу категории каталога в сообщения Telegram.
+
+    Args:
+        title (str): Название категории.
+        hits (Iterable[SearchHit]): Запчасти или товары категории.
+        limit (int): Максимальная длина сообщения.
+
+    Yields:
+        str: Тексты сообщений; первое начинается названием категории.
+    """
+    return render_hits(hits, CATEGORY_HEADER.format(title=title), limit)
@@ -0,0 +1,271 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from zapchastimira.common.settings import CacheSettings
+from zapchastimira.repositories.contact import ContactDTO, contact_repository, contacts_version
+from zapchastimira.services.category_tree import CategoryNode, category_tree
+
+logger = logging.getLogger(__name__)
+
+WELCOME_TEXT = """
+Привет!
+Я бот для поиска запчастей и продуктов.
+Вы можете использовать команду /search для поиска, команду /catalog для просмотра каталога по категориям
+или команду /contact для получения контактов.
+"""
+
+# Данные кнопок каталога: `catalog` — список базовых категорий, `category:<id>` — базовая
+# категория, `<kind>:<id>` — первая страница категории запчастей или товаров.
+CATALOG_CALLBACK = "catalog"
+CATEGORY_CALLBACK = "category:"
+
+CONTACT_TEMPLATE = """
+Имя: {first_name} {last_name}
+Должность: {position}
+Телефон: {phone}
+Электронная почта: {email}
+Описание: {description}
+"""
+
+
+@dataclass(frozen=True)
+class Reply:
+    """
+    Готовый ответ бота.
+
+    Attributes:
+        text (str): Текст сообщения.
+        markup (InlineKeyboardMarkup | None): Клавиатура под сообщением.
+    """
+
+    text: str
+    markup: InlineKeyboardMarkup | None = None
+
+
+@dataclass
+class _Entry:
+    build: Callable[[], Reply]
+    version: Callable[[], Hashable]
+    built_version: Hashable = None
+    reply: Reply | None = None
+
+
+class ReplyCache:
+    """
+    Кэш ответов бота, которые почти не меняются (приветствие, контакты, меню каталога).
+
+    Каждый ответ собирается один раз функцией `build` и отдается без обращения к базе
+    данных, пока не изменится его версия (`version`, обычно `VersionCounter` репозитория).
+    Изменения, сделанные другими процессами, обнаруживают проверки (`add_check`), которые
+    периодически выполняет фоновый поток и которые увеличивают версию при расхождении.
+    Пока ответ пересобирается, другие читатели получают его предыдущую версию и не ждут.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, _Entry] = {}
+        self._checks: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, name: str, build: Callable[[], Reply], version: Callable[[], Hashable] = lambda: None) -> None:
+        """
+        Регистрирует ответ.
+
+        Args:
+            name (str): Имя ответа.
+            build (Callable[[], Reply]): Собирает ответ; может обращаться к базе данных.
+            version (Callable[[], Hashable]): Возвращает текущую версию данных ответа без обращения к базе.
+        """
+        self._entries[name] = _Entry(build=build, version=version)
+
+    def add_check(self, check: Callable[[], None]) -> None:
+        """
+        Добавляет периодическую проверку изменений, сделанных другими процессами.
+
+        Args:
+            check (Callable[[], None]): Сравнивает данные в базе с известными и при расхождении увеличивает версию.
+        """
+        self._checks.append(check)
+
+    def get(self, name: str) -> Reply:
+        """
+        Возвращает ответ; пересобирает его, только если версия изменилась.
+
+        Args:
+            name (str): Имя ответа.
+
+        Returns:
+            Reply: Готовый ответ.
+        """
+        entry = self._entries[name]
+        reply = entry.reply
+        if reply is not None and entry.built_version == entry.version():
+            return reply
+        # Сборка может обращаться к базе данных: с собранным ответом не ждем чужую сборку.
+        # В асинхронном боте ожидание блокировки остановило бы цикл событий.
+        if reply is None:
+            self._lock.acquire()
+        elif not self._lock.acquire(blocking=False):
+            return reply
+        try:
+            return self._build(entry)
+        finally:
+            self._lock.release()
+
+    def refresh(self) -> None:
+        """
+        Выполняет проверки изменений и пересобирает устаревшие ответы.
+        """
+        for check in self._checks:
+            check()
+        with self._lock:
+            for entry in self._entries.values():
+                self._build(entry)
+
+    def start(self, interval: float, background: bool = False) -> None:
+        """
+        Собирает все ответы и запускает фоновое обновление.
+
+        Args:
+            interval (float): Интервал проверки изменений в секундах; 0 — только начальная сборка.
+            background (bool): Выполнить начальную сборку в фоновом потоке, не задерживая запуск.
+                Ответ, который запрошен до сборки, собирается при первом запросе.
+        """
+        if self._thread is not None:
+            return
+        if not background:
+            self.refresh()
+            if interval <= 0:
+                return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval, background), name="reply-cache", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Останавливает фоновое обновление.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _build(self, entry: _Entry) -> Reply:
+        version = entry.version()
+        if entry.reply is None or entry.built_version != version:
+            entry.reply = entry.build()
+            entry.built_version = version
+        return entry.reply
+
+    def _run(self, interval: float, initial: bool) -> None:
+        if initial:
+            self._refresh()
+            if interval <= 0:
+                return
+        while not self._stopped.wait(interval):
+            self._refresh()
+
+    def _refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Failed to refresh cached replies, serving previous versions")
+
+
+def render_contacts(contacts: list[ContactDTO]) -> Reply:
+    """
+    Собирает ответ на /contact.
+
+    Args:
+        contacts (list[ContactDTO]): Контакты.
+
+    Returns:
+        Reply: Ответ со списком контактов.
+    """
+    if not contacts:
+        return Reply("Контакты не найдены.")
+    parts = ["Контакты:\n"]
+    for contact in contacts:
+        parts.append(
+            CONTACT_TEMPLATE.format(
+                first_name=contact.first_name,
+                last_name=contact.last_name,
+                position=contact.position,
+                phone=contact.phone,
+                email=contact.email or "Не указана",
+                description=contact.description or "Не указано",
+            )
+        )
+    return Reply("".join(parts))
+
+
+def render_catalog_menu(roots: tuple[CategoryNode, ...]) -> Reply:
+    """
+    Собирает ответ на /catalog: список базовых категорий.
+
+    Args:
+        roots (tuple[CategoryNode, ...]): Базовые категории.
+
+    Returns:
+        Reply: Ответ с кнопками категорий.
+    """
+    if not roots:
+        return Reply("Каталог пока пуст.")
+    markup = InlineKeyboardMarkup()
+    for root in roots:
+        markup.add(InlineKeyboardButton(root.name, callback_data=f"{CATEGORY_CALLBACK}{root.category_id}"))
+    return Reply("Выберите категорию:", markup)
+
+
+def render_category_menu(node: CategoryNode) -> Reply:
+    """
+    Собирает меню базовой категории: список вложенных категорий и кнопку возврата.
+
+    Args:
+        node (CategoryNode): Базовая категория.
+
+    Returns:
+        Reply: Ответ с кнопками вложенных категорий.
+    """
+    markup = InlineKeyboardMarkup()
+    for child in node.children:
+        markup.add(InlineKeyboardButton(child.name, callback_data=f"{child.kind}:{child.category_id}"))
+    markup.add(InlineKeyboardButton("« Все категории", callback_data=CATALOG_CALLBACK))
+    if not node.children:
+        return Reply(f"В категории «{node.name}» пока ничего нет.", markup)
+    return Reply(f"{node.name}: выберите раздел:", markup)
+
+
+class ContactsCheck:
+    """
+    Проверка изменений контактов другими процессами по отпечатку таблицы.
+    """
+
+    # Отпечаток еще не получен; None — отпечаток пустой таблицы контактов.
+    _UNSET = object()
+
+    def __init__(self) -> None:
+        self._fingerprint: Hashable = self._UNSET
+
+    def __call__(self) -> None:
+        fingerprint = contact_repository.get_fingerprint()
+        if self._fingerprint is not self._UNSET and fingerprint != self._fingerprint:
+            contacts_version.bump()
+        self._fingerprint = fingerprint
+
+
+cache_settings = CacheSettings()
+
+replies = ReplyCache()
+replies.register("welcome", lambda: Reply(WELCOME_TEXT))
+replies.register(
+    "contacts", lambda: render_contacts(contact_repository.get_all()[0]), version=lambda: contacts_version.value
+)
+replies.add_check(ContactsCheck())
+replies.register("catalog", lambda: render_catalog_menu(category_tree.roots()), version=lambda: category_tree.version)
+replies.add_check(category_tree.refresh)
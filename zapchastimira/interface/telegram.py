@@ -1,27 +1,161 @@
+"""
+Синхронная точка входа бота и обработчики обновлений.
+
+Модуль импортируется без токена и базы данных: бот, планировщик исходящих
+сообщений и подключения к базе создаются при первом обращении (`Application`,
+репозитории), а опрос Telegram запускает только `main()`:
+    python -m zapchastimira.interface.telegram
+"""
+
+import threading
+import uuid
 from enum import StrEnum
+from functools import partial
 
 import telebot
 from pydantic import BaseModel
-from telebot.types import Message
+from telebot import apihelper
+from telebot.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
-from zapchastimira.common.db_utils import get_sessionmaker
+from zapchastimira.common.cache import TTLCache
 from zapchastimira.common.settings import TelegramSettings
 from zapchastimira.common.tables import UserStateEnum
-from zapchastimira.interface.models import OutputSearchDataPart, OutputSearchDataProduct
-from zapchastimira.repositories.contact import ContactRepository
-from zapchastimira.repositories.part import PartDTO
+from zapchastimira.interface.dispatch import ChatOrderedExecutor, OrderedTeleBot
+from zapchastimira.interface.outbound import OutboundScheduler, Priority
+from zapchastimira.interface.renderer import render_category_page, render_search_results
+from zapchastimira.interface.replies import (
+    CATALOG_CALLBACK,
+    CATEGORY_CALLBACK,
+    Reply,
+    cache_settings,
+    render_category_menu,
+    replies,
+)
+from zapchastimira.repositories.category import BASE_CATEGORY
+from zapchastimira.repositories.search import CatalogCursor, CatalogSearchRepository, CategoryCursor
 from zapchastimira.repositories.user import UserDTO, user_repository
-from zapchastimira.services.search_service import search_by_products
+from zapchastimira.services.category_tree import (
+    CategoryNode,
+    CategoryPage,
+    catalog_settings,
+    category_tree,
+    list_category,
+)
+from zapchastimira.services.search_service import SearchPage, search_by_products, search_settings
+
+
+class Application:
+    """
+    Ресурсы процесса бота, которые создаются при первом обращении.
+
+    Обработчики обращаются к `app` этого модуля при вызове, поэтому тесты и
+    инструменты могут заменить его приложением со своими настройками.
+
+    Attributes:
+        settings (TelegramSettings): Настройки бота; по умолчанию загружаются из переменных окружения.
+        bot (telebot.TeleBot): Бот с зарегистрированными обработчиками; через него же отправляются ответы.
+        outbound (OutboundScheduler): Планировщик исходящих сообщений.
+    """
+
+    def __init__(self, settings: TelegramSettings | None = None):
+        """
+        Инициализирует приложение; ресурсы не создаются.
+
+        Args:
+            settings (TelegramSettings | None): Настройки бота. Если не указаны, загружаются
+                из переменных окружения при первом обращении.
+        """
+        self._settings = settings
+        self._bot: telebot.TeleBot | None = None
+        self._outbound: OutboundScheduler | None = None
+        # Первое обращение может прийти одновременно из нескольких потоков обработки.
+        self._lock = threading.RLock()
+
+    @property
+    def settings(self) -> TelegramSettings:
+        if self._settings is None:
+            with self._lock:
+                if self._settings is None:
+                    self._settings = TelegramSettings()  # type: ignore
+        return self._settings
+
+    @property
+    def bot(self) -> telebot.TeleBot:
+        if self._bot is None:
+            with self._lock:
+                if self._bot is None:
+                    self._bot = create_bot(self.settings)
+        return self._bot
+
+    @property
+    def outbound(self) -> OutboundScheduler:
+        if self._outbound is None:
+            with self._lock:
+                if self._outbound is None:
+                    # Обработчики не ждут ответа Bot API: сообщения отправляются планировщиком
+                    # с учетом лимитов Telegram.
+                    settings = self.settings
+                    self._outbound = OutboundScheduler(
+                        rate=settings.send_rate,
+                        chat_rate=settings.chat_send_rate,
+                        chat_burst=settings.chat_send_burst,
+                        workers=settings.send_workers,
+                        max_retries=settings.send_max_retries,
+                    )
+        return self._outbound
+
+    def start(self, background: bool = True) -> None:
+        """
+        Запускает сборку и обновление готовых ответов.
+
+        Args:
+            background (bool): Собрать готовые ответы (и дерево категорий) в фоновом потоке,
+                чтобы прием обновлений начался, не дожидаясь базы данных.
+        """
+        replies.start(cache_settings.replies_refresh_interval, background=background)
+
+    def stop(self) -> None:
+        """
+        Останавливает фоновые потоки, которые были запущены.
+        """
+        replies.stop()
+        if self._outbound is not None:
+            self._outbound.stop()
+
+
+def create_bot(settings: TelegramSettings) -> telebot.TeleBot:
+    """
+    Создает бота в режиме обработки из настроек и регистрирует обработчики.
+
+    Args:
+        settings (TelegramSettings): Настройки бота.
+
+    Returns:
+        telebot.TeleBot: Бот.
+    """
+    if settings.api_url:
+        apihelper.API_URL = settings.api_url
+
+    bot: telebot.TeleBot
+    if settings.dispatch_mode == "ordered":
+        bot = OrderedTeleBot(
+            settings.token,
+            executor=ChatOrderedExecutor(workers=settings.workers, max_in_flight=settings.max_in_flight),
+        )
+    else:
+        bot = telebot.TeleBot(settings.token, threaded=False)
+    register_handlers(bot)
+    return bot
+
 
-settings = TelegramSettings()
+app = Application()
 
-API_TOKEN = settings.token
 
-bot = telebot.TeleBot(API_TOKEN)
+def reply(message: Message, text: str, priority: Priority = Priority.HIGH, **kwargs) -> None:
+    app.outbound.submit(message.chat.id, app.bot.reply_to, message, text, priority=priority, **kwargs)
 
 
 # Handle '/start' and '/help'
-@bot.message_handler(commands=["start"])
 def send_welcome(message: Message):
     user_id = str(message.from_user.id)
     user_tmp = user_repository.get_user_by_telegram_id(user_id)
@@ -35,62 +169,173 @@ def send_welcome(message: Message):
         )
     else:
         user_repository.set_state(user_id=user_tmp.user_id, state=UserStateEnum.START)
-    bot.reply_to(
-        message,
-        """
-Привет!
-Я бот для поиска запчастей и продуктов.
-Вы можете использовать команду /search для поиска или команду /contact для получения контактов.
-""",
-    )
+    reply(message, replies.get("welcome").text)
 
 
-@bot.message_handler(commands=["search"])
 def start_search(message: Message):
     user_id = str(message.from_user.id)
     user_tmp = user_repository.get_user_by_telegram_id(user_id)
     if user_tmp is None:
-        bot.reply_to(
+        reply(
             message,
             """Чтобы зарегистрироваться нажмите команду /start.""",
         )
         return
 
     user_repository.set_state(user_id=user_tmp.user_id, state=UserStateEnum.SEARCH)
-    bot.reply_to(
+    reply(
         message,
         """Теперь вы можете ввести запрос для поиска запчастей или продуктов.""",
     )
 
 
-@bot.message_handler(commands=["contact"])
 def get_contact(message: Message):
-    contacts, _ = contact_repository.get_all()
-    if not contacts:
-        bot.reply_to(message, "Контакты не найдены.")
+    contacts = replies.get("contacts")
+    reply(message, contacts.text, reply_markup=contacts.markup)
+
+
+def show_catalog(message: Message):
+    menu = replies.get("catalog")
+    reply(message, menu.text, reply_markup=menu.markup)
+
+
+# Сессия поиска: запрос, ID пользователя (по его автомобилям уточняется выдача) и позиция следующей страницы.
+search_sessions: TTLCache[str, tuple[str, str, CatalogCursor]] = TTLCache(
+    maxsize=10_000, ttl=search_settings.session_ttl
+)
+catalog_sessions: TTLCache[str, tuple[str, str, CategoryCursor]] = TTLCache(
+    maxsize=10_000, ttl=catalog_settings.session_ttl
+)
+
+
+def next_page_markup(callback_prefix: str) -> tuple[str, InlineKeyboardMarkup]:
+    token = uuid.uuid4().hex[:16]
+    markup = InlineKeyboardMarkup()
+    markup.add(InlineKeyboardButton("Следующая страница", callback_data=f"{callback_prefix}{token}"))
+    return token, markup
+
+
+def send_chunks(message: Message, chunks: list[str], markup: InlineKeyboardMarkup | None) -> None:
+    # Части ответа уходят подряд одним пакетом; кнопка — под последней.
+    *chunks, last = chunks
+    calls = [partial(app.bot.reply_to, message, chunk) for chunk in chunks]
+    calls.append(partial(app.bot.reply_to, message, last, reply_markup=markup))
+    app.outbound.submit_batch(message.chat.id, calls)
+
+
+def send_search_page(message: Message, query: str, user_id: str, page: SearchPage) -> None:
+    markup = None
+    if page.next_cursor is not None:
+        token, markup = next_page_markup("search:")
+        search_sessions.set(token, (query, user_id, page.next_cursor))
+    send_chunks(message, list(render_search_results(page.items)), markup)
+
+
+def send_category_page(message: Message, node: CategoryNode, page: CategoryPage) -> None:
+    markup = None
+    if page.next_cursor is not None:
+        token, markup = next_page_markup("browse:")
+        catalog_sessions.set(token, (node.kind, node.category_id, page.next_cursor))
+    send_chunks(message, list(render_category_page(node.name, page.items)), markup)
+
+
+def show_category_items(call: CallbackQuery, node: CategoryNode, page: CategoryPage) -> None:
+    if not page.items:
+        chat_id = call.message.chat.id
+        app.outbound.submit(chat_id, app.bot.send_message, chat_id, "В этой категории пока ничего нет.")
         return
+    send_category_page(call.message, node, page)
 
-    contact_answer = "Контакты:\n"
-    for contact in contacts:
-        contact_answer += f"""
-Имя: {contact.first_name} {contact.last_name}
-Должность: {contact.position}
-Телефон: {contact.phone}
-Электронная почта: {contact.email or "Не указана"}
-Описание: {contact.description or "Не указано"}
-"""
-    bot.reply_to(message, contact_answer)
+
+def show_next_category_page(call: CallbackQuery, node: CategoryNode, page: CategoryPage) -> None:
+    chat_id = call.message.chat.id
+    app.outbound.submit(chat_id, app.bot.edit_message_reply_markup, chat_id, call.message.message_id, reply_markup=None)
+    if not page.items:
+        app.outbound.submit(chat_id, app.bot.send_message, chat_id, "Больше ничего нет.")
+        return
+    send_category_page(call.message, node, page)
 
 
-contact_repository = ContactRepository(sessionmaker=get_sessionmaker())
+def show_next_search_page(call: CallbackQuery, query: str, user_id: str, page: SearchPage) -> None:
+    chat_id = call.message.chat.id
+    app.outbound.submit(chat_id, app.bot.edit_message_reply_markup, chat_id, call.message.message_id, reply_markup=None)
+    if not page.items:
+        app.outbound.submit(chat_id, app.bot.send_message, chat_id, "Больше результатов нет.")
+        return
+    send_search_page(call.message, query, user_id, page)
+
+
+def edit_menu(call: CallbackQuery, menu: Reply) -> None:
+    chat_id = call.message.chat.id
+    app.outbound.submit(
+        chat_id,
+        app.bot.edit_message_text,
+        menu.text,
+        chat_id,
+        call.message.message_id,
+        reply_markup=menu.markup,
+        priority=Priority.HIGH,
+    )
+
+
+def back_to_catalog(call: CallbackQuery):
+    app.bot.answer_callback_query(call.id)
+    edit_menu(call, replies.get("catalog"))
+
+
+def open_category(call: CallbackQuery):
+    node = category_tree.get(BASE_CATEGORY, call.data.removeprefix(CATEGORY_CALLBACK))
+    if node is None:
+        app.bot.answer_callback_query(call.id, "Категория не найдена, откройте /catalog заново.")
+        return
+    app.bot.answer_callback_query(call.id)
+    edit_menu(call, render_category_menu(node))
+
+
+def open_category_items(call: CallbackQuery):
+    kind, _, category_id = call.data.partition(":")
+    node = category_tree.get(kind, category_id)
+    if node is None:
+        app.bot.answer_callback_query(call.id, "Категория не найдена, откройте /catalog заново.")
+        return
+    page = list_category(node)
+    app.bot.answer_callback_query(call.id)
+    show_category_items(call, node, page)
+
+
+def next_category_page(call: CallbackQuery):
+    session = catalog_sessions.get(call.data.removeprefix("browse:"))
+    if session is None:
+        app.bot.answer_callback_query(call.id, "Список устарел, откройте /catalog заново.")
+        return
+    kind, category_id, cursor = session
+    node = category_tree.get(kind, category_id)
+    if node is None:
+        app.bot.answer_callback_query(call.id, "Список устарел, откройте /catalog заново.")
+        return
+
+    page = list_category(node, cursor)
+    app.bot.answer_callback_query(call.id)
+    show_next_category_page(call, node, page)
+
+
+def next_search_page(call: CallbackQuery):
+    session = search_sessions.get(call.data.removeprefix("search:"))
+    if session is None:
+        app.bot.answer_callback_query(call.id, "Результаты устарели, повторите поиск.")
+        return
+
+    query, user_id, cursor = session
+    page = search_by_products(query, user_id, cursor=cursor)
+    app.bot.answer_callback_query(call.id)
+    show_next_search_page(call, query, user_id, page)
 
 
-@bot.message_handler(func=lambda message: True)
 def handle_message(message: Message):
     user_id = str(message.from_user.id)
     user_tmp = user_repository.get_user_by_telegram_id(user_id)
     if user_tmp is None:
-        bot.reply_to(
+        reply(
             message,
             """
     Чтобы зарегистрироваться нажмите команду /start.
@@ -99,38 +344,49 @@ def handle_message(message: Message):
         return
 
     if user_tmp.state == UserStateEnum.SEARCH:
-        result = search_by_products(message.text, user_id)
-        if not result:
-            bot.reply_to(message, "По вашему запросу ничего не найдено.")
+        page = search_by_products(message.text, user_tmp.user_id)
+        if not page.items:
+            reply(message, "По вашему запросу ничего не найдено.", Priority.NORMAL)
             return
 
-        result_answer = "Результаты поиска:\n\n"
-        for i in result:
-            if isinstance(i, PartDTO):
-                tmp = OutputSearchDataPart(
-                    name=i.name,
-                    brand=i.brand,
-                    part_number=i.part_number,
-                    price=i.price,
-                    stock_quantity=i.stock_quantity,
-                    description=i.description,
-                    url=i.page_url,
-                    compatibility=i.compatibility,
-                )
-            else:
-                tmp = OutputSearchDataProduct(
-                    name=i.name,
-                    price=i.price,
-                    stock_quantity=i.stock_quantity,
-                    description=i.description,
-                    url=i.page_url,
-                )
-            result_answer += str(tmp) + "\n\n"
-        result_answer += "Чтобы выйти нажмите /start"
-        bot.reply_to(message, result_answer)
+        send_search_page(message, message.text, user_tmp.user_id, page)
 
     else:
-        bot.reply_to(message, "Чтобы начать поиск, используйте команду /search.")
+        reply(message, "Чтобы начать поиск, используйте команду /search.")
+
+
+def is_catalog_item_callback(call: CallbackQuery) -> bool:
+    return call.data.startswith((f"{CatalogSearchRepository.PART}:", f"{CatalogSearchRepository.PRODUCT}:"))
+
+
+def register_handlers(bot: telebot.TeleBot) -> None:
+    """
+    Регистрирует обработчики команд, кнопок и сообщений.
+
+    Порядок регистрации важен: обновление обрабатывает первый подходящий обработчик.
+
+    Args:
+        bot (telebot.TeleBot): Бот.
+    """
+    bot.register_message_handler(send_welcome, commands=["start"])
+    bot.register_message_handler(start_search, commands=["search"])
+    bot.register_message_handler(get_contact, commands=["contact"])
+    bot.register_message_handler(show_catalog, commands=["catalog"])
+    bot.register_callback_query_handler(back_to_catalog, func=lambda call: call.data == CATALOG_CALLBACK)
+    bot.register_callback_query_handler(open_category, func=lambda call: call.data.startswith(CATEGORY_CALLBACK))
+    bot.register_callback_query_handler(open_category_items, func=is_catalog_item_callback)
+    bot.register_callback_query_handler(next_category_page, func=lambda call: call.data.startswith("browse:"))
+    bot.register_callback_query_handler(next_search_page, func=lambda call: call.data.startswith("search:"))
+    bot.register_message_handler(handle_message, func=lambda message: True)
+
+
+def main() -> None:
+    app.start()
+    try:
+        app.bot.infinity_polling()
+    finally:
+        app.stop()
 
 
-bot.infinity_polling()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import json
+import logging
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import telebot
+from telebot.types import Update
+
+from zapchastimira.common.settings import WebhookSettings
+from zapchastimira.interface.telegram import app
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class UpdateQueueConsumer(threading.Thread):
+    """
+    Поток, который забирает обновления из очереди webhook и передает их боту.
+
+    Обновления разбираются здесь, а не в HTTP-обработчике, чтобы Telegram
+    получал ответ сразу после помещения тела запроса в очередь. Поток один,
+    поэтому порядок обновлений сохраняется; параллельность обеспечивает
+    диспетчер бота (см. `OrderedTeleBot`).
+    """
+
+    def __init__(self, bot: telebot.TeleBot, updates: "queue.Queue[bytes | None]"):
+        """
+        Инициализирует поток.
+
+        Args:
+            bot (telebot.TeleBot): Бот с зарегистрированными обработчиками.
+            updates (queue.Queue[bytes | None]): Очередь тел запросов; `None` останавливает поток.
+        """
+        super().__init__(name="webhook-consumer", daemon=True)
+        self.bot = bot
+        self.updates = updates
+
+    def run(self) -> None:
+        while True:
+            body = self.updates.get()
+            try:
+                if body is None:
+                    return
+                update = Update.de_json(json.loads(body))
+                self.bot.process_new_updates([update])
+            except Exception:
+                logger.exception("Failed to process webhook update")
+            finally:
+                self.updates.task_done()
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """
+    HTTP-сервер, принимающий обновления Telegram.
+
+    Сервер проверяет путь и секретный токен, кладет тело запроса во внутреннюю
+    очередь и сразу отвечает `200`. Если очередь заполнена, возвращается `503`,
+    и Telegram повторит доставку позже.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, settings: WebhookSettings, updates: "queue.Queue[bytes | None]"):
+        """
+        Инициализирует сервер.
+
+        Args:
+            settings (WebhookSettings): Настройки webhook.
+            updates (queue.Queue[bytes | None]): Очередь, в которую складываются обновления.
+        """
+        self.settings = settings
+        self.updates = updates
+        self.secret_token = settings.secret_token.get_secret_value() if settings.secret_token else None
+        super().__init__((settings.host, settings.port), WebhookRequestHandler)
+
+
+class WebhookRequestHandler(BaseHTTPRequestHandler):
+    server: WebhookServer
+
+    def do_POST(self) -> None:
+        if self.path != self.server.settings.path:
+            self._respond(404)
+            return
+
+        secret_token = self.server.secret_token
+        if secret_token is not None and self.headers.get(SECRET_HEADER) != secret_token:
+            self._respond(403)
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        try:
+            self.server.updates.put_nowait(body)
+        except queue.Full:
+            logger.warning("Webhook queue is full, asking Telegram to retry")
+            self._respond(503)
+            return
+        self._respond(200)
+
+    def _respond(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:
+        logger.debug(format, *args)
+
+
+def run_webhook(settings: WebhookSettings | None = None) -> None:
+    """
+    Запускает прием обновлений через webhook.
+
+    Если в настройках указан публичный адрес, webhook регистрируется в Telegram.
+    Обработка идет в фоновом потоке, HTTP-сервер работает до прерывания процесса.
+
+    Args:
+        settings (WebhookSettings | None): Настройки webhook. Если не указаны,
+            загружаются из переменных окружения.
+    """
+    settings = settings or WebhookSettings()
+    updates: queue.Queue[bytes | None] = queue.Queue(maxsize=settings.queue_size)
+    bot = app.bot
+    app.start()
+    consumer = UpdateQueueConsumer(bot, updates)
+    consumer.start()
+
+    if settings.url:
+        bot.remove_webhook()
+        bot.set_webhook(
+            url=settings.url,
+            secret_token=settings.secret_token.get_secret_value() if settings.secret_token else None,
+            max_connections=settings.max_connections,
+        )
+
+    server = WebhookServer(settings, updates)
+    logger.info("Listening for webhook updates on %s:%s%s", settings.host, settings.port, settings.path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        updates.put(None)
+        consumer.join()
+        app.stop()
+        bot.stop_bot()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    run_webhook()
+
+
+if __name__ == "__main__":
+    main()
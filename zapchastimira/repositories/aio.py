@@ -0,0 +1,292 @@
+"""
+Асинхронный слой доступа к данным на `AsyncSession` и asyncpg.
+
+Репозитории не дублируют SQL синхронных: асинхронная единица работы открывает
+транзакцию `AsyncSession` и выполняет в ней синхронный код репозиториев через
+`AsyncSession.run_sync`. Синхронные репозитории берут сессию текущей единицы
+работы (`current_unit_of_work`), поэтому их запросы идут через соединение
+asyncpg, а ожидание ответа базы отдает управление циклу событий вместо того,
+чтобы занимать поток. Кэши, версии каталога и производные таблицы
+(`_on_write`, `_after_commit`) работают так же, как в синхронном коде.
+
+Для драйвера нужна дополнительная зависимость `async`.
+"""
+
+import datetime
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Generic, Iterable, Mapping, ParamSpec, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from zapchastimira.common.compatibility import Vehicle
+from zapchastimira.common.db_utils import get_async_sessionmaker
+from zapchastimira.common.search_query import ParsedQuery
+from zapchastimira.common.tables import UserStateEnum
+from zapchastimira.repositories.base import BaseRepository, RepositoryDTO, UnitOfWork, use_unit_of_work
+from zapchastimira.repositories.category import (
+    CategoryDTO,
+    CategoryRepository,
+    CategoryRow,
+    CategoryTreeState,
+    category_repository,
+)
+from zapchastimira.repositories.contact import ContactDTO, ContactRepository, contact_repository
+from zapchastimira.repositories.part import PartDTO, PartRepository, part_repository
+from zapchastimira.repositories.product import ProductDTO, ProductRepository, product_repository
+from zapchastimira.repositories.search import (
+    CatalogCursor,
+    CatalogSearchRepository,
+    CategoryCursor,
+    SearchHit,
+    catalog_search_repository,
+)
+from zapchastimira.repositories.user import UserDTO, UserRepository, user_repository
+from zapchastimira.repositories.user_cars import UserCarDTO, UserCarsRepository, user_cars_repository
+
+P = ParamSpec("P")
+R = TypeVar("R")
+Repo = TypeVar("Repo")
+T = TypeVar("T", bound=RepositoryDTO)
+
+
+class AsyncUnitOfWork:
+    """
+    Общая транзакция `AsyncSession` для синхронного кода репозиториев.
+
+    Attributes:
+        session (AsyncSession): Асинхронная сессия с открытой транзакцией.
+        unit (UnitOfWork): Синхронная единица работы поверх `session.sync_session`,
+            которую видят репозитории внутри `run`.
+    """
+
+    def __init__(self, session: AsyncSession):
+        """
+        Инициализирует единицу работы.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия с открытой транзакцией.
+        """
+        self.session = session
+        self.unit = UnitOfWork(session.sync_session)
+
+    async def run(self, fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """
+        Выполняет синхронный код репозиториев в транзакции этой единицы работы.
+
+        Args:
+            fn (Callable[P, R]): Функция или метод, обращающийся к репозиториям.
+            *args: Позиционные аргументы `fn`.
+            **kwargs: Именованные аргументы `fn`.
+
+        Returns:
+            R: Результат `fn`.
+        """
+        return await self.session.run_sync(self._call, fn, *args, **kwargs)
+
+    def _call(self, session: Session, fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        with use_unit_of_work(self.unit):
+            return fn(*args, **kwargs)
+
+
+_current_async_unit_of_work: ContextVar[AsyncUnitOfWork | None] = ContextVar("async_unit_of_work", default=None)
+
+
+@asynccontextmanager
+async def async_unit_of_work(
+    sessionmaker: async_sessionmaker[AsyncSession] | None = None,
+) -> AsyncIterator[AsyncUnitOfWork]:
+    """
+    Открывает транзакцию, общую для всех асинхронных вызовов репозиториев внутри блока `async with`.
+
+    Транзакция фиксируется при выходе из блока и откатывается при исключении;
+    действия после записи выполняются после фиксации. Вложенный вызов
+    переиспользует уже открытую единицу работы.
+
+    Args:
+        sessionmaker (async_sessionmaker[AsyncSession] | None): Фабрика сессий; по умолчанию общая.
+
+    Yields:
+        AsyncUnitOfWork: Текущая единица работы.
+    """
+    current = _current_async_unit_of_work.get()
+    if current is not None:
+        yield current
+        return
+
+    sessionmaker = sessionmaker or get_async_sessionmaker()
+    async with sessionmaker.begin() as session:
+        current = AsyncUnitOfWork(session)
+        token = _current_async_unit_of_work.set(current)
+        try:
+            yield current
+        finally:
+            _current_async_unit_of_work.reset(token)
+    current.unit.run_after_commit()
+
+
+async def run_sync(fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+    """
+    Выполняет синхронный код, обращающийся к репозиториям, на соединении asyncpg.
+
+    Удобно для сервисов (`search_by_products`, `list_category`): все их запросы
+    выполняются в одной транзакции и на одном соединении из асинхронного пула.
+
+    Args:
+        fn (Callable[P, R]): Функция, обращающаяся к репозиториям.
+        *args: Позиционные аргументы `fn`.
+        **kwargs: Именованные аргументы `fn`.
+
+    Returns:
+        R: Результат `fn`.
+    """
+    async with async_unit_of_work() as unit:
+        return await unit.run(fn, *args, **kwargs)
+
+
+class AsyncRepository(Generic[Repo]):
+    """
+    Асинхронный вариант репозитория: методы синхронного репозитория, выполняемые через `AsyncUnitOfWork`.
+
+    Attributes:
+        repository (Repo): Синхронный репозиторий; его кэши общие с синхронным кодом процесса.
+        sessionmaker (async_sessionmaker[AsyncSession] | None): Фабрика асинхронных сессий; None — общая,
+            которая создается при первом запросе.
+    """
+
+    def __init__(self, repository: Repo, sessionmaker: async_sessionmaker[AsyncSession] | None = None):
+        """
+        Инициализирует репозиторий.
+
+        Args:
+            repository (Repo): Синхронный репозиторий.
+            sessionmaker (async_sessionmaker[AsyncSession] | None): Фабрика асинхронных сессий; по умолчанию общая.
+        """
+        self.repository = repository
+        self.sessionmaker = sessionmaker
+
+    async def _run(self, fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        # Транзакция берет соединение из пула только при первом запросе, поэтому
+        # вызов, который обслужил кэш синхронного репозитория, не обращается к базе.
+        async with async_unit_of_work(self.sessionmaker) as unit:
+            return await unit.run(fn, *args, **kwargs)
+
+
+class AsyncBaseRepository(AsyncRepository[BaseRepository[T]]):
+    """
+    Асинхронный вариант `BaseRepository`.
+    """
+
+    async def get_by_id(self, item_id: str) -> T | None:
+        return await self._run(self.repository.get_by_id, item_id)
+
+    async def get_all(self, *args: Any, **kwargs: Any) -> tuple[list[T], int]:
+        return await self._run(self.repository.get_all, *args, **kwargs)
+
+    async def create(self, item: T) -> None:
+        await self._run(self.repository.create, item)
+
+    async def update(self, item_id: str, item: T) -> None:
+        await self._run(self.repository.update, item_id, item)
+
+    async def delete(self, item_id: str) -> None:
+        await self._run(self.repository.delete, item_id)
+
+    async def get_many(self, item_ids: Iterable[str]) -> list[T]:
+        return await self._run(self.repository.get_many, list(item_ids))
+
+    async def create_many(self, items: Iterable[T]) -> list[str]:
+        return await self._run(self.repository.create_many, list(items))
+
+    async def update_many(self, items: Mapping[str, T]) -> None:
+        await self._run(self.repository.update_many, items)
+
+    async def delete_many(self, item_ids: Iterable[str]) -> None:
+        await self._run(self.repository.delete_many, list(item_ids))
+
+    def generate_uuid(self) -> str:
+        return self.repository.generate_uuid()
+
+
+class AsyncPartRepository(AsyncBaseRepository[PartDTO]):
+    repository: PartRepository
+
+
+class AsyncProductRepository(AsyncBaseRepository[ProductDTO]):
+    repository: ProductRepository
+
+
+class AsyncCategoryRepository(AsyncBaseRepository[CategoryDTO]):
+    repository: CategoryRepository
+
+    async def get_tree_rows(self, since: datetime.datetime | None = None) -> list[CategoryRow]:
+        return await self._run(self.repository.get_tree_rows, since)
+
+    async def get_tree_state(self) -> CategoryTreeState:
+        return await self._run(self.repository.get_tree_state)
+
+
+class AsyncContactRepository(AsyncBaseRepository[ContactDTO]):
+    repository: ContactRepository
+
+    async def get_fingerprint(self) -> str | None:
+        return await self._run(self.repository.get_fingerprint)
+
+    async def get_contact_by_phone(self, phone: str) -> ContactDTO | None:
+        return await self._run(self.repository.get_contact_by_phone, phone)
+
+
+class AsyncUserRepository(AsyncBaseRepository[UserDTO]):
+    repository: UserRepository
+
+    async def get_user_by_telegram_id(self, tg_uid: str) -> UserDTO | None:
+        return await self._run(self.repository.get_user_by_telegram_id, tg_uid)
+
+    async def get_user_by_phone(self, phone: str) -> UserDTO | None:
+        return await self._run(self.repository.get_user_by_phone, phone)
+
+    async def set_state(self, user_id: str, state: UserStateEnum) -> None:
+        await self._run(self.repository.set_state, user_id, state)
+
+
+class AsyncUserCarsRepository(AsyncBaseRepository[UserCarDTO]):
+    repository: UserCarsRepository
+
+    async def get_vehicles(self, user_id: str) -> tuple[Vehicle, ...]:
+        return await self._run(self.repository.get_vehicles, user_id)
+
+
+class AsyncCatalogSearchRepository(AsyncRepository[CatalogSearchRepository]):
+    """
+    Асинхронный вариант `CatalogSearchRepository`.
+    """
+
+    async def search(
+        self,
+        query: ParsedQuery,
+        limit: int,
+        cursor: CatalogCursor | None = None,
+        vehicles: tuple[Vehicle, ...] = (),
+        vehicle_boost: float | None = None,
+    ) -> list[SearchHit]:
+        return await self._run(self.repository.search, query, limit, cursor, vehicles, vehicle_boost)
+
+    async def find_by_part_number(
+        self, part_number: str, limit: int, min_similarity: float | None = None
+    ) -> list[SearchHit]:
+        return await self._run(self.repository.find_by_part_number, part_number, limit, min_similarity)
+
+    async def list_category(
+        self, kind: str, category_id: str, limit: int, cursor: CategoryCursor | None = None
+    ) -> list[SearchHit]:
+        return await self._run(self.repository.list_category, kind, category_id, limit, cursor)
+
+
+async_part_repository = AsyncPartRepository(part_repository)
+async_product_repository = AsyncProductRepository(product_repository)
+async_category_repository = AsyncCategoryRepository(category_repository)
+async_contact_repository = AsyncContactRepository(contact_repository)
+async_user_repository = AsyncUserRepository(user_repository)
+async_user_cars_repository = AsyncUserCarsRepository(user_cars_repository)
+async_catalog_search_repository = AsyncCatalogSearchRepository(catalog_search_repository)
@@ -1,18 +1,25 @@
 import uuid
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import asdict, dataclass
-from typing import Any, Generic, TypeVar
+from typing import Any, Callable, ClassVar, Generic, Iterable, Iterator, Mapping, TypeVar
 
+import sqlalchemy as sa
 from sqlalchemy.orm import Session, sessionmaker
 
+from zapchastimira.common.db_utils import ReplicaRouter, get_replica_router, get_sessionmaker
 
-@dataclass
+
+@dataclass(slots=True)
 class RepositoryDTO:
     """
     Представляет объект передачи данных (DTO).
 
     Этот класс служит базовым DTO для обмена данными между слоями приложения.
     Он содержит метод `to_dict()`, который преобразует объект в словарь, используя функцию `asdict`.
+    DTO объявляются с `slots=True`: у экземпляров нет `__dict__`, поэтому списки
+    из тысяч DTO занимают заметно меньше памяти.
     """
 
     def to_dict(self) -> dict[str, Any]:
@@ -28,6 +35,107 @@ class RepositoryDTO:
 T = TypeVar("T", bound=RepositoryDTO)
 
 
+class UnitOfWork:
+    """
+    Общая транзакция нескольких вызовов репозиториев.
+
+    Пока открыт `unit_of_work()`, все репозитории используют его сессию и соединение
+    вместо собственных, а действия после записи (сброс кэшей, `catalog_version.bump()`)
+    откладываются до успешной фиксации транзакции.
+
+    Attributes:
+        session (Session): Сессия с открытой транзакцией.
+    """
+
+    def __init__(self, session: Session):
+        """
+        Инициализирует единицу работы.
+
+        Args:
+            session (Session): Сессия с открытой транзакцией.
+        """
+        self.session = session
+        self._after_commit: list[Callable[[], object]] = []
+
+    def after_commit(self, callback: Callable[[], object]) -> None:
+        """
+        Откладывает вызов до фиксации транзакции; при откате вызов отменяется.
+
+        Args:
+            callback (Callable[[], object]): Действие после фиксации.
+        """
+        self._after_commit.append(callback)
+
+    def run_after_commit(self) -> None:
+        """
+        Выполняет отложенные действия; вызывается после фиксации транзакции.
+        """
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+
+_current_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar("unit_of_work", default=None)
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    """
+    Возвращает открытую в текущем контексте единицу работы.
+
+    Returns:
+        UnitOfWork | None: Текущая единица работы или None, если ее нет.
+    """
+    return _current_unit_of_work.get()
+
+
+@contextmanager
+def use_unit_of_work(current: UnitOfWork) -> Iterator[UnitOfWork]:
+    """
+    Делает единицу работы текущей на время блока `with`, не управляя ее транзакцией.
+
+    Нужен коду, который сам открывает и фиксирует транзакцию, например асинхронной
+    единице работы (`zapchastimira.repositories.aio`).
+
+    Args:
+        current (UnitOfWork): Единица работы.
+
+    Yields:
+        UnitOfWork: Та же единица работы.
+    """
+    token = _current_unit_of_work.set(current)
+    try:
+        yield current
+    finally:
+        _current_unit_of_work.reset(token)
+
+
+@contextmanager
+def unit_of_work(sessionmaker: sessionmaker[Session] | None = None) -> Iterator[UnitOfWork]:
+    """
+    Открывает транзакцию, общую для всех вызовов репозиториев внутри блока `with`.
+
+    Транзакция фиксируется при выходе из блока и откатывается при исключении.
+    Вложенный вызов переиспользует уже открытую единицу работы.
+
+    Args:
+        sessionmaker (sessionmaker[Session] | None): Фабрика сессий; по умолчанию общая.
+
+    Yields:
+        UnitOfWork: Текущая единица работы.
+    """
+    current = _current_unit_of_work.get()
+    if current is not None:
+        yield current
+        return
+
+    sessionmaker = sessionmaker or get_sessionmaker()
+    with sessionmaker.begin() as session:
+        current = UnitOfWork(session)
+        with use_unit_of_work(current):
+            yield current
+    current.run_after_commit()
+
+
 class BaseRepository(Generic[T], ABC):
     """
     Абстрактный базовый класс для репозиториев.
@@ -35,26 +143,341 @@ class BaseRepository(Generic[T], ABC):
     Этот класс определяет интерфейс для всех репозиториев, которые работают с моделями базы данных.
     Он обеспечивает базовые методы для получения, создания, обновления и удаления элементов.
 
+    Репозиторий без явной фабрики сессий работает с общими движком и репликами из
+    переменных окружения (`get_sessionmaker`, `get_replica_router`). Они создаются при
+    первом запросе, а не при создании репозитория, поэтому модули с репозиториями
+    импортируются без настроек подключения.
+
     Attributes:
         sessionmaker (sessionmaker[Session]): Фабрика сессий SQLAlchemy.
+        replicas (ReplicaRouter | None): Реплики для запросов только на чтение, которые их допускают
+            (`_read_session(replica=True)`); без них все запросы идут на `sessionmaker`.
+        model (type[Any]): ORM-модель таблицы репозитория.
+        dto_class (type[T]): Класс DTO репозитория.
+        columns (tuple[sa.ColumnElement[Any], ...]): Колонки, которые выбираются для DTO; метки колонок
+            совпадают с полями DTO. Тяжелые колонки, которых нет в DTO (например, `search_vector`),
+            не выбираются.
 
     Methods:
         get_by_id(item_id: str) -> T | None: Получает элемент по его ID.
         get_all(query: str) -> tuple[list[T], int]: Получает все элементы по запросу.
+        _get_page(...) -> tuple[list[T], int]: Получает страницу элементов и их общее количество.
         create(item: T) -> None: Создает новый элемент.
         update(item_id: str, item: T) -> None: Обновляет существующий элемент.
         delete(item_id: str) -> None: Удаляет элемент по его ID.
+        get_many(item_ids: Iterable[str]) -> list[T]: Получает элементы по списку ID одним запросом.
+        create_many(items: Iterable[T]) -> list[str]: Создает элементы одним запросом.
+        update_many(items: Mapping[str, T]) -> None: Обновляет элементы одним `executemany`.
+        delete_many(item_ids: Iterable[str]) -> None: Удаляет элементы по списку ID одним запросом.
         generate_uuid() -> str: Генерирует новый UUID.
     """
 
-    def __init__(self, sessionmaker: sessionmaker[Session]):
+    model: ClassVar[type[Any]]
+    dto_class: ClassVar[type[RepositoryDTO]]
+    columns: ClassVar[tuple[sa.ColumnElement[Any], ...]]
+
+    def __init__(self, sessionmaker: sessionmaker[Session] | None = None, replicas: ReplicaRouter | None = None):
         """
         Инициализирует репозиторий.
 
         Args:
-            sessionmaker (sessionmaker[Session]): Фабрика сессий SQLAlchemy.
+            sessionmaker (sessionmaker[Session] | None): Фабрика сессий SQLAlchemy; по умолчанию общая.
+            replicas (ReplicaRouter | None): Реплики для запросов только на чтение; по умолчанию общие,
+                если не передана `sessionmaker`.
         """
-        self.sessionmaker = sessionmaker
+        self._sessionmaker = sessionmaker
+        self._replicas = replicas
+        self._shared = sessionmaker is None
+
+    @property
+    def sessionmaker(self) -> sessionmaker[Session]:
+        if self._sessionmaker is None:
+            self._sessionmaker = get_sessionmaker()
+        return self._sessionmaker
+
+    @property
+    def replicas(self) -> ReplicaRouter | None:
+        if self._replicas is None and self._shared:
+            self._replicas = get_replica_router()
+        return self._replicas
+
+    def _select(self) -> sa.Select:
+        """
+        Возвращает запрос, выбирающий только колонки DTO.
+
+        Returns:
+            sa.Select: `SELECT` по `columns`.
+        """
+        return sa.select(*self.columns)
+
+    def _to_dto(self, row: sa.Row[Any]) -> T:
+        """
+        Строит DTO из строки результата `_select()` без загрузки ORM-объекта.
+
+        Args:
+            row (sa.Row[Any]): Строка результата.
+
+        Returns:
+            T: DTO.
+        """
+        return self.dto_class(**row._mapping)
+
+    @property
+    def _primary_key(self) -> sa.Column[str]:
+        return sa.inspect(self.model).primary_key[0]
+
+    @contextmanager
+    def _read_session(self, replica: bool = False) -> Iterator[Session]:
+        """
+        Возвращает сессию для чтения: сессию текущей единицы работы или новую.
+
+        Внутри единицы работы чтение всегда идет в ее транзакции на основном сервере,
+        чтобы видеть собственные записи.
+
+        Args:
+            replica (bool): Новую сессию можно открыть на реплике, если они настроены.
+
+        Yields:
+            Session: Сессия SQLAlchemy.
+        """
+        current = _current_unit_of_work.get()
+        if current is not None:
+            yield current.session
+            return
+        if replica and self.replicas is not None:
+            with self.replicas.session() as session:
+                yield session
+            return
+        with self.sessionmaker() as session:
+            yield session
+
+    @contextmanager
+    def _write_session(self) -> Iterator[Session]:
+        """
+        Возвращает сессию для записи: сессию текущей единицы работы или новую транзакцию.
+
+        Yields:
+            Session: Сессия SQLAlchemy с открытой транзакцией.
+        """
+        current = _current_unit_of_work.get()
+        if current is not None:
+            yield current.session
+            return
+        with self.sessionmaker.begin() as session:
+            yield session
+
+    @staticmethod
+    def _after_commit(callback: Callable[[], object]) -> None:
+        """
+        Вызывает действие после фиксации записи: сразу или по завершении текущей единицы работы.
+
+        Args:
+            callback (Callable[[], object]): Действие после фиксации.
+        """
+        current = _current_unit_of_work.get()
+        if current is None:
+            callback()
+        else:
+            current.after_commit(callback)
+
+    def _get_page(
+        self,
+        limit: int | None = None,
+        offset: int = 0,
+        after: str | None = None,
+        estimate_total: bool = False,
+        replica: bool = False,
+    ) -> tuple[list[T], int]:
+        """
+        Получает страницу элементов, упорядоченных по первичному ключу, и их общее количество.
+
+        Страница выбирается отдельно от подсчета, поэтому читаются только ее строки. Точное
+        количество считается `count(*)` по первичному ключу с тем же условием `after`
+        (обычно index-only scan), а при `estimate_total` берется из статистики планировщика
+        (`pg_class.reltuples`), и таблица не читается вовсе.
+
+        Args:
+            limit (int | None): Размер страницы; None — все элементы.
+            offset (int): Количество пропускаемых элементов.
+            after (str | None): Ключ последнего элемента предыдущей страницы (keyset-пагинация).
+            estimate_total (bool): Вернуть оценку количества строк всей таблицы вместо точного значения.
+                Оценка не учитывает `after` и `offset`.
+            replica (bool): Читать с реплики, если они настроены (см. `_read_session`).
+
+        Returns:
+            tuple[list[T], int]: Элементы страницы и общее количество элементов: точное — с учетом `after`
+                (количество элементов после этого ключа), оценка — всей таблицы.
+        """
+        key = self._primary_key
+        stmt = self._select().order_by(key)
+        if after is not None:
+            stmt = stmt.where(key > after)
+        page = stmt.offset(offset or None).limit(limit)
+
+        with self._read_session(replica) as session:
+            items = [self._to_dto(row) for row in session.execute(page)]
+            if estimate_total:
+                total = self._estimate_total(session)
+            elif (limit is None or len(items) < limit) and (items or not offset):
+                # Последняя страница: количество известно без подсчета.
+                total = offset + len(items)
+            else:
+                total = session.execute(
+                    sa.select(sa.func.count()).select_from(stmt.with_only_columns(key).order_by(None).subquery())
+                ).scalar_one()
+        return items, total
+
+    def _estimate_total(self, session: Session) -> int:
+        """
+        Оценивает количество строк таблицы по статистике планировщика.
+
+        Как и планировщик, масштабирует `reltuples` на текущий размер таблицы в страницах,
+        поэтому оценка остается близкой к реальной между запусками `ANALYZE`. Если таблица
+        еще не анализировалась, выполняет точный `count(*)`.
+
+        Args:
+            session (Session): Сессия SQLAlchemy.
+
+        Returns:
+            int: Оценка количества строк.
+        """
+        table = self.model.__table__
+        oid = sa.func.to_regclass(session.get_bind().dialect.identifier_preparer.format_table(table))
+        pg_class = sa.table("pg_class", sa.column("oid"), sa.column("reltuples"), sa.column("relpages"))
+        pages = sa.func.pg_relation_size(oid) / sa.cast(sa.func.current_setting("block_size"), sa.Integer)
+        stmt = sa.select(pg_class.c.reltuples / pg_class.c.relpages * pages).where(
+            pg_class.c.oid == oid, pg_class.c.reltuples >= 0, pg_class.c.relpages > 0
+        )
+        estimate = session.execute(stmt).scalar_one_or_none()
+        if estimate is None:
+            return session.execute(sa.select(sa.func.count()).select_from(table)).scalar_one()
+        return int(estimate)
+
+    @abstractmethod
+    def _values(self, item: T) -> dict[str, Any]:
+        """
+        Преобразует DTO в значения колонок для вставки, включая первичный ключ.
+
+        Args:
+            item (T): Объект DTO.
+
+        Returns:
+            dict[str, Any]: Значения по именам атрибутов модели.
+        """
+        ...
+
+    def _update_values(self, item: T) -> dict[str, Any]:
+        """
+        Преобразует DTO в значения колонок для обновления.
+
+        Args:
+            item (T): Объект DTO.
+
+        Returns:
+            dict[str, Any]: Значения по именам атрибутов модели без первичного ключа.
+        """
+        values = self._values(item)
+        values.pop(self._primary_key.key, None)
+        return values
+
+    def _on_write(self, session: Session, rows: Mapping[str, dict[str, Any]]) -> None:
+        """
+        Вызывается в транзакции записи, например для обновления производных таблиц.
+
+        Args:
+            session (Session): Сессия, в которой записаны элементы.
+            rows (Mapping[str, dict[str, Any]]): Записанные значения колонок по ID элементов;
+                при обновлении — только обновленные колонки.
+        """
+
+    def _on_change(self, item_ids: list[str]) -> None:
+        """
+        Вызывается после фиксации пакетной записи, например для сброса кэшей.
+
+        Args:
+            item_ids (list[str]): ID измененных элементов.
+        """
+
+    def get_many(self, item_ids: Iterable[str]) -> list[T]:
+        """
+        Получает элементы по списку ID одним запросом `IN`.
+
+        Args:
+            item_ids (Iterable[str]): ID элементов.
+
+        Returns:
+            list[T]: Найденные элементы в произвольном порядке.
+        """
+        item_ids = list(dict.fromkeys(item_ids))
+        if not item_ids:
+            return []
+        stmt = self._select().where(self._primary_key.in_(item_ids))
+
+        with self._read_session() as session:
+            return [self._to_dto(row) for row in session.execute(stmt)]
+
+    def create_many(self, items: Iterable[T]) -> list[str]:
+        """
+        Создает элементы одним многострочным `INSERT`.
+
+        Args:
+            items (Iterable[T]): Объекты DTO для создания.
+
+        Returns:
+            list[str]: ID созданных элементов в порядке `items`.
+        """
+        rows = [self._values(item) for item in items]
+        if not rows:
+            return []
+        item_ids = [row[self._primary_key.key] for row in rows]
+
+        with self._write_session() as session:
+            session.execute(sa.insert(self.model), rows)
+            self._on_write(session, dict(zip(item_ids, rows, strict=True)))
+        self._after_commit(lambda: self._on_change(item_ids))
+        return item_ids
+
+    def update_many(self, items: Mapping[str, T]) -> None:
+        """
+        Обновляет элементы одним `UPDATE ... WHERE id = ...`, выполненным через `executemany`.
+
+        Несуществующие ID пропускаются.
+
+        Args:
+            items (Mapping[str, T]): Объекты DTO с новыми данными по ID элементов.
+        """
+        if not items:
+            return
+        # Параметр ключа не может называться как колонка: одноименные параметры задают SET.
+        # Строки с разным набором колонок выполняются отдельными executemany.
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for item_id, item in items.items():
+            row = {"_item_id": item_id, **self._update_values(item)}
+            groups.setdefault(tuple(row), []).append(row)
+        item_ids = list(items)
+        stmt = sa.update(self.model.__table__).where(self._primary_key == sa.bindparam("_item_id"))
+
+        with self._write_session() as session:
+            for rows in groups.values():
+                session.execute(stmt, rows)
+            self._on_write(session, {row.pop("_item_id"): row for rows in groups.values() for row in rows})
+        self._after_commit(lambda: self._on_change(item_ids))
+
+    def delete_many(self, item_ids: Iterable[str]) -> None:
+        """
+        Удаляет элементы по списку ID одним запросом `IN`.
+
+        Args:
+            item_ids (Iterable[str]): ID элементов.
+        """
+        item_ids = list(dict.fromkeys(item_ids))
+        if not item_ids:
+            return
+        stmt = sa.delete(self.model).where(self._primary_key.in_(item_ids))
+
+        with self._write_session() as session:
+            session.execute(stmt)
+        self._after_commit(lambda: self._on_change(item_ids))
 
     @abstractmethod
     def get_by_id(self, item_id: str) -> T | None:
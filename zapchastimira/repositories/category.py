@@ -1,68 +1,175 @@
+import datetime
 from dataclasses import dataclass
+from typing import Any, NamedTuple
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 from zapchastimira.common import tables
+from zapchastimira.common.cache import VersionCounter
 from zapchastimira.repositories.base import BaseRepository, RepositoryDTO
+from zapchastimira.repositories.search import CatalogSearchRepository
 
+# Версия дерева категорий в этом процессе: репозиторий увеличивает ее после каждой записи,
+# что заставляет дерево категорий в памяти перечитать изменения.
+categories_version = VersionCounter()
 
-@dataclass
+# Тип узла дерева для базовых категорий; вложенные категории имеют тип запчастей или товаров.
+BASE_CATEGORY = "category"
+
+
+@dataclass(kw_only=True, slots=True)
 class CategoryDTO(RepositoryDTO):
     category_id: str | None = None
     name: str
     description: str | None = None
 
 
+class CategoryRow(NamedTuple):
+    """
+    Строка дерева категорий: базовая категория или вложенная категория запчастей или товаров.
+
+    `kind` равен `BASE_CATEGORY`, `CatalogSearchRepository.PART` или `CatalogSearchRepository.PRODUCT`;
+    `parent_id` у базовой категории равен None.
+    """
+
+    kind: str
+    category_id: str
+    parent_id: str | None
+    name: str
+    updated_at: datetime.datetime
+
+
+class CategoryTreeState(NamedTuple):
+    """
+    Сводка всех трех таблиц категорий для обнаружения изменений.
+
+    Attributes:
+        count (int): Общее количество категорий.
+        updated_at (datetime.datetime | None): Время последнего изменения категории.
+        fingerprint (str | None): MD5 типов, идентификаторов, родителей и названий всех категорий.
+    """
+
+    count: int
+    updated_at: datetime.datetime | None
+    fingerprint: str | None
+
+
 class CategoryRepository(BaseRepository):
+    model = tables.Category
+    dto_class = CategoryDTO
+    columns = (tables.Category.category_id, tables.Category.name, tables.Category.description)
+
     def get_by_id(self, item_id: str) -> CategoryDTO | None:
-        stmt = sa.select(tables.Category).where(tables.Category.category_id == item_id)
-
-        with self.sessionmaker() as session:
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return None
-            return CategoryDTO(
-                category_id=result.category_id,
-                name=result.name,
-                description=result.description,
+        stmt = self._select().where(tables.Category.category_id == item_id)
+
+        with self._read_session() as session:
+            result = session.execute(stmt).one_or_none()
+            return None if result is None else self._to_dto(result)
+
+    def get_all(
+        self,
+        limit: int | None = None,
+        offset: int = 0,
+        after: str | None = None,
+        estimate_total: bool = False,
+    ) -> tuple[list[CategoryDTO], int]:
+        return self._get_page(limit=limit, offset=offset, after=after, estimate_total=estimate_total)
+
+    @staticmethod
+    def _tree_rows(since: datetime.datetime | None = None) -> sa.CompoundSelect:
+        selects = [
+            sa.select(
+                sa.literal(BASE_CATEGORY, sa.String).label("kind"),
+                tables.Category.category_id,
+                sa.null().cast(sa.String).label("parent_id"),
+                tables.Category.name,
+                tables.Category.updated_at,
             )
-
-    def get_all(self) -> tuple[list[CategoryDTO], int]:
-        stmt = sa.select(tables.Category)
-        total_stmt = sa.select(sa.func.count("*")).select_from(stmt.subquery())
-
-        with self.sessionmaker() as session:
-            results = session.execute(stmt).scalars().all()
-            total = session.execute(total_stmt).scalar_one()
-            return [
-                CategoryDTO(
-                    category_id=result.category_id,
-                    name=result.name,
-                    description=result.description,
+        ]
+        for kind, table in (
+            (CatalogSearchRepository.PART, tables.PartCategory),
+            (CatalogSearchRepository.PRODUCT, tables.ProductCategory),
+        ):
+            selects.append(
+                sa.select(
+                    sa.literal(kind, sa.String).label("kind"),
+                    table.category_id,
+                    table.base_categoty_id.label("parent_id"),
+                    table.name,
+                    table.updated_at,
                 )
-                for result in results
-            ], total
+            )
+        if since is not None:
+            selects = [select.where(select.selected_columns.updated_at > since) for select in selects]
+        return sa.union_all(*selects)
+
+    def get_tree_rows(self, since: datetime.datetime | None = None) -> list[CategoryRow]:
+        """
+        Возвращает базовые категории и категории запчастей и товаров одним запросом.
+
+        Args:
+            since (datetime.datetime | None): Вернуть только категории, измененные после этого времени.
+
+        Returns:
+            list[CategoryRow]: Строки дерева категорий.
+        """
+        with self._read_session() as session:
+            return [CategoryRow(*row) for row in session.execute(self._tree_rows(since))]
+
+    def get_tree_state(self) -> CategoryTreeState:
+        """
+        Возвращает сводку таблиц категорий одним запросом.
+
+        Изменения, сделанные в обход `updated_at` (например, SQL-скриптом), видны по отпечатку:
+        MD5 строк `kind|category_id|parent_id|name`, упорядоченных побайтно и разделенных переводом строки.
+
+        Returns:
+            CategoryTreeState: Количество категорий, время последнего изменения и отпечаток содержимого.
+        """
+        rows = self._tree_rows().subquery("tree")
+        row = sa.func.concat_ws("|", rows.c.kind, rows.c.category_id, rows.c.parent_id, rows.c.name)
+        stmt = sa.select(
+            sa.func.count(),
+            sa.func.max(rows.c.updated_at),
+            sa.func.md5(sa.func.string_agg(row, aggregate_order_by(sa.literal("\n"), row.collate("C")))),
+        )
+
+        with self._read_session() as session:
+            return CategoryTreeState(*session.execute(stmt).one())
+
+    def _values(self, item: CategoryDTO) -> dict[str, Any]:
+        return {
+            "category_id": item.category_id or self.generate_uuid(),
+            "name": item.name,
+            "description": item.description,
+        }
+
+    def _on_change(self, item_ids: list[str]) -> None:
+        categories_version.bump()
 
     def create(self, category_dto: CategoryDTO) -> None:
-        new_category = tables.Category(name=category_dto.name, description=category_dto.description)
-
-        with self.sessionmaker.begin() as session:
-            session.add(new_category)
-            return None
+        with self._write_session() as session:
+            session.execute(sa.insert(tables.Category).values(self._values(category_dto)))
+        self._after_commit(categories_version.bump)
 
     def update(self, item_id: str, category_dto: CategoryDTO) -> None:
-        stmt = sa.select(tables.Category).where(tables.Category.category_id == item_id)
+        stmt = (
+            sa.update(tables.Category)
+            .where(tables.Category.category_id == item_id)
+            .values(self._update_values(category_dto))
+        )
 
-        with self.sessionmaker() as session:
-            category = session.execute(stmt).scalar_one_or_none()
-            if category is None:
-                return None
-
-            category.name = category_dto.name
-            category.description = category_dto.description
+        with self._write_session() as session:
+            session.execute(stmt)
+        self._after_commit(categories_version.bump)
 
     def delete(self, item_id: str) -> None:
         stmt = sa.delete(tables.Category).where(tables.Category.category_id == item_id)
 
-        with self.sessionmaker.begin() as session:
+        with self._write_session() as session:
             session.execute(stmt)
+        self._after_commit(categories_version.bump)
+
+
+category_repository = CategoryRepository()
@@ -0,0 +1,134 @@
+from typing import Any, Iterable, Mapping, NamedTuple
+
+import sqlalchemy as sa
+from sqlalchemy.orm import QueryableAttribute, Session
+
+from zapchastimira.common import tables
+from zapchastimira.common.compatibility import Vehicle, parse_compatibility
+
+
+class VehicleParams(NamedTuple):
+    """
+    Автомобиль в виде параметров запроса: условие `fits_vehicles` строится один раз
+    и подготавливается на сервере, а конкретные автомобили передаются при выполнении.
+
+    Attributes:
+        make (sa.BindParameter[str]): Параметр марки `make_{index}`.
+        model (sa.BindParameter[str]): Параметр модели `model_{index}`.
+        year (sa.BindParameter[int]): Параметр года выпуска `year_{index}`.
+    """
+
+    make: sa.BindParameter[str]
+    model: sa.BindParameter[str]
+    year: sa.BindParameter[int]
+
+    @classmethod
+    def bind(cls, index: int) -> "VehicleParams":
+        """
+        Создает параметры автомобиля с номером `index`.
+
+        Args:
+            index (int): Номер автомобиля среди автомобилей пользователя.
+
+        Returns:
+            VehicleParams: Параметры запроса.
+        """
+        return cls(
+            make=sa.bindparam(f"make_{index}", type_=sa.String),
+            model=sa.bindparam(f"model_{index}", type_=sa.String),
+            year=sa.bindparam(f"year_{index}", type_=sa.Integer),
+        )
+
+    @staticmethod
+    def values(index: int, vehicle: Vehicle) -> dict[str, Any]:
+        """
+        Возвращает значения параметров, созданных `bind(index)`, для автомобиля.
+
+        Args:
+            index (int): Номер автомобиля среди автомобилей пользователя.
+            vehicle (Vehicle): Автомобиль.
+
+        Returns:
+            dict[str, Any]: Значения параметров по имени.
+        """
+        return {f"make_{index}": vehicle.make, f"model_{index}": vehicle.model, f"year_{index}": vehicle.year}
+
+
+def compatibility_rows(parts: Mapping[str, str | None]) -> list[dict[str, Any]]:
+    """
+    Разбирает совместимость запчастей в строки таблицы `part_compatibility`.
+
+    Args:
+        parts (Mapping[str, str | None]): Текст совместимости по ID запчасти.
+
+    Returns:
+        list[dict[str, Any]]: Значения колонок для вставки.
+    """
+    return [
+        {"part_id": part_id, **fitment._asdict()}
+        for part_id, text in parts.items()
+        for fitment in parse_compatibility(text)
+    ]
+
+
+def replace_compatibility(session: Session, parts: Mapping[str, str | None]) -> int:
+    """
+    Заменяет записи индекса совместимости запчастей в текущей транзакции.
+
+    Записи вставляются одним `INSERT ... SELECT` из `VALUES`, соединенного с `parts`,
+    поэтому ID несуществующих запчастей (например, пропущенных `update_many`) отбрасываются.
+
+    Args:
+        session (Session): Сессия с открытой транзакцией, в которой записаны сами запчасти.
+        parts (Mapping[str, str | None]): Текст совместимости по ID запчасти.
+
+    Returns:
+        int: Количество добавленных записей индекса.
+    """
+    if not parts:
+        return 0
+    table = tables.PartCompatibility.__table__
+    session.execute(sa.delete(table).where(table.c.part_id == sa.any_(sa.literal(list(parts), sa.ARRAY(sa.String)))))
+    rows = compatibility_rows(parts)
+    if not rows:
+        return 0
+    names = ("part_id", "make", "model", "year_from", "year_to")
+    values = sa.values(*(sa.column(name, table.c[name].type) for name in names), name="fitments").data(
+        [tuple(row[name] for name in names) for row in rows]
+    )
+    select = sa.select(*(sa.cast(values.c[name], table.c[name].type) for name in names)).join(
+        tables.Part.__table__, tables.Part.__table__.c.part_id == values.c.part_id
+    )
+    return session.execute(sa.insert(table).from_select(names, select)).rowcount
+
+
+def fits_vehicles(
+    part_id: sa.ColumnElement[str] | QueryableAttribute[str], vehicles: Iterable[Vehicle | VehicleParams]
+) -> sa.ColumnElement[bool]:
+    """
+    Строит условие «запчасть подходит хотя бы к одному из автомобилей».
+
+    Условие — коррелированный `EXISTS` по индексу `idx_part_compatibility_part_id`,
+    поэтому проверяются только уже найденные запчасти.
+
+    Args:
+        part_id (sa.ColumnElement[str] | QueryableAttribute[str]): Колонка ID запчасти внешнего запроса.
+        vehicles (Iterable[Vehicle | VehicleParams]): Автомобили пользователя или параметры
+            подготовленного запроса (`VehicleParams.bind`).
+
+    Returns:
+        sa.ColumnElement[bool]: Условие для `WHERE` или `CASE`.
+    """
+    index = tables.PartCompatibility
+    matches = [
+        sa.and_(
+            index.make == vehicle.make,
+            sa.or_(index.model.is_(None), index.model == vehicle.model),
+            sa.or_(index.year_from.is_(None), index.year_from <= vehicle.year),
+            sa.or_(index.year_to.is_(None), index.year_to >= vehicle.year),
+        )
+        for vehicle in vehicles
+    ]
+    if not matches:
+        return sa.false()
+    return sa.exists().where(index.part_id == part_id, sa.or_(*matches))
@@ -1,16 +1,22 @@
 import datetime
 from dataclasses import dataclass
+from typing import Any
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 from zapchastimira.common import tables
-from zapchastimira.common.db_utils import get_sessionmaker
+from zapchastimira.common.cache import VersionCounter
 from zapchastimira.repositories.base import BaseRepository, RepositoryDTO
 
+# Версия контактов в этом процессе: репозиторий увеличивает ее после каждой записи,
+# что делает недействительным готовый ответ на /contact.
+contacts_version = VersionCounter()
 
-@dataclass
+
+@dataclass(kw_only=True, slots=True)
 class ContactDTO(RepositoryDTO):
-    contact_id: str
+    contact_id: str | None = None
     first_name: str
     last_name: str
     position: str
@@ -22,98 +28,98 @@ class ContactDTO(RepositoryDTO):
 
 
 class ContactRepository(BaseRepository):
+    model = tables.Contact
+    dto_class = ContactDTO
+    columns = (
+        tables.Contact.contact_id,
+        tables.Contact.first_name,
+        tables.Contact.last_name,
+        tables.Contact.position,
+        tables.Contact.phone,
+        tables.Contact.email,
+        tables.Contact.description,
+        tables.Contact.created_at,
+        tables.Contact.updated_at,
+    )
+
     def get_by_id(self, item_id: str) -> ContactDTO | None:
-        stmt = sa.select(tables.Contact).where(tables.Contact.contact_id == item_id)
-
-        with self.sessionmaker() as session:
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return None
-            return ContactDTO(
-                contact_id=result.contact_id,
-                first_name=result.first_name,
-                last_name=result.last_name,
-                position=result.position,
-                phone=result.phone,
-                email=result.email,
-                description=result.description,
-                created_at=result.created_at,
-                updated_at=result.updated_at,
-            )
-
-    def get_all(self) -> tuple[list[ContactDTO], int]:
-        stmt = sa.select(tables.Contact)
-        total_stmt = sa.select(sa.func.count("*")).select_from(stmt.subquery())
-
-        with self.sessionmaker() as session:
-            res = session.execute(stmt).scalars().all()
-            total = session.execute(total_stmt).scalar_one()
-            return [
-                ContactDTO(
-                    contact_id=i.contact_id,
-                    first_name=i.first_name,
-                    last_name=i.last_name,
-                    position=i.position,
-                    phone=i.phone,
-                    email=i.email,
-                    description=i.description,
-                    created_at=i.created_at,
-                    updated_at=i.updated_at,
-                )
-                for i in res
-            ], total
+        stmt = self._select().where(tables.Contact.contact_id == item_id)
+
+        with self._read_session() as session:
+            result = session.execute(stmt).one_or_none()
+            return None if result is None else self._to_dto(result)
+
+    def get_all(
+        self,
+        limit: int | None = None,
+        offset: int = 0,
+        after: str | None = None,
+        estimate_total: bool = False,
+    ) -> tuple[list[ContactDTO], int]:
+        return self._get_page(limit=limit, offset=offset, after=after, estimate_total=estimate_total)
+
+    def _values(self, item: ContactDTO) -> dict[str, Any]:
+        return {
+            "contact_id": item.contact_id or self.generate_uuid(),
+            "first_name": item.first_name,
+            "last_name": item.last_name,
+            "position": item.position,
+            "phone": item.phone,
+            "email": item.email,
+            "description": item.description,
+        }
+
+    def _on_change(self, item_ids: list[str]) -> None:
+        contacts_version.bump()
 
     def create(self, item: ContactDTO) -> None:
-        tmp = tables.Contact(
-            contact_id=item.contact_id or self.generate_uuid(),
-            first_name=item.first_name,
-            last_name=item.last_name,
-            position=item.position,
-            phone=item.phone,
-            email=item.email,
-            description=item.description,
-        )
-
-        with self.sessionmaker.begin() as session:
-            session.add(tmp)
+        with self._write_session() as session:
+            session.execute(sa.insert(tables.Contact).values(self._values(item)))
+        self._after_commit(contacts_version.bump)
 
     def update(self, item_id: str, item: ContactDTO) -> None:
-        stmt = sa.select(tables.Contact).where(tables.Contact.contact_id == item_id)
-
-        with self.sessionmaker.begin() as session:
-            contact = session.execute(stmt).scalar_one_or_none()
-            if contact is None:
-                return None
-            contact.first_name = item.first_name
-            contact.last_name = item.last_name
-            contact.position = item.position
-            contact.phone = item.phone
-            contact.email = item.email
-            contact.description = item.description
+        stmt = sa.update(tables.Contact).where(tables.Contact.contact_id == item_id).values(self._update_values(item))
+
+        with self._write_session() as session:
+            session.execute(stmt)
+        self._after_commit(contacts_version.bump)
 
     def delete(self, item_id: str) -> None:
         stmt = sa.delete(tables.Contact).where(tables.Contact.contact_id == item_id)
-        with self.sessionmaker.begin() as session:
+        with self._write_session() as session:
             session.execute(stmt)
+        self._after_commit(contacts_version.bump)
+
+    def get_fingerprint(self) -> str | None:
+        """
+        Возвращает отпечаток содержимого таблицы контактов для обнаружения изменений другими процессами.
+
+        Returns:
+            str | None: MD5 всех выводимых полей контактов или None, если контактов нет.
+        """
+        row = sa.func.concat_ws(
+            "|",
+            tables.Contact.contact_id,
+            tables.Contact.first_name,
+            tables.Contact.last_name,
+            tables.Contact.position,
+            tables.Contact.phone,
+            tables.Contact.email,
+            tables.Contact.description,
+        )
+        stmt = sa.select(
+            sa.func.md5(sa.func.string_agg(row, aggregate_order_by(sa.literal("\n"), tables.Contact.contact_id)))
+        )
+
+        with self._read_session() as session:
+            return session.execute(stmt).scalar_one()
 
     def get_contact_by_phone(self, phone: str) -> ContactDTO | None:
-        stmt = sa.select(tables.Contact).where(tables.Contact.phone == phone)
-
-        with self.sessionmaker() as session:
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return None
-            return ContactDTO(
-                contact_id=result.contact_id,
-                first_name=result.first_name,
-                last_name=result.last_name,
-                position=result.position,
-                phone=result.phone,
-                email=result.email,
-                description=result.description,
-                created_at=result.created_at,
-                updated_at=result.updated_at,
-            )
-
-
-contact_repository = ContactRepository(sessionmaker=get_sessionmaker())
+        stmt = self._select().where(tables.Contact.phone == phone)
+
+        with self._read_session() as session:
+            result = session.execute(stmt).one_or_none()
+            return None if result is None else self._to_dto(result)
+
+
+contact_repository = ContactRepository()
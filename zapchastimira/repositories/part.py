@@ -2,22 +2,24 @@ import datetime
 from dataclasses import (
     dataclass,
 )
+from typing import Any, Mapping
 
 import sqlalchemy as sa
+from sqlalchemy.orm import Session
 
 from zapchastimira.common import tables
-from zapchastimira.common.db_utils import (
-    get_sessionmaker,
-)
+from zapchastimira.common.search_query import parse_query
 from zapchastimira.repositories.base import (
     BaseRepository,
     RepositoryDTO,
 )
+from zapchastimira.repositories.compatibility import replace_compatibility
+from zapchastimira.repositories.search import catalog_version
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class PartDTO(RepositoryDTO):
-    part_id: str
+    part_id: str | None = None
     part_number: str
     name: str
     description: str | None = None
@@ -25,92 +27,95 @@ class PartDTO(RepositoryDTO):
     compatibility: str | None = None
     price: float
     stock_quantity: int
-    page_url: str
+    category_id: str | None = None
+    page_url: str | None = None
     created_at: datetime.datetime | None = None
     updated_at: datetime.datetime | None = None
 
 
 class PartRepository(BaseRepository):
+    model = tables.Part
+    dto_class = PartDTO
+    columns = (
+        tables.Part.part_id,
+        tables.Part.part_number,
+        tables.Part.name,
+        tables.Part.description,
+        tables.Part.brand,
+        tables.Part.compatibility,
+        tables.Part.price,
+        tables.Part.stock_quantity,
+        tables.Part.category_id,
+        tables.Part.image_url.label("page_url"),
+        tables.Part.created_at,
+        tables.Part.updated_at,
+    )
+
     def get_by_id(self, item_id: str) -> PartDTO | None:
-        stmt = sa.select(tables.Part).where(tables.Part.part_id == item_id)
-
-        with self.sessionmaker() as session:
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return None
-            return PartDTO(
-                part_id=result.part_id,
-                part_number=result.part_number,
-                name=result.name,
-                description=result.description,
-                brand=result.brand,
-                compatibility=result.compatibility,
-                price=result.price,
-                stock_quantity=result.stock_quantity,
-                created_at=result.created_at,
-                updated_at=result.updated_at,
-                page_url=result.image_url,
-            )
+        stmt = self._select().where(tables.Part.part_id == item_id)
+
+        with self._read_session() as session:
+            result = session.execute(stmt).one_or_none()
+            return None if result is None else self._to_dto(result)
 
     def get_all(self, query: str) -> tuple[list[PartDTO], int]:
-        tsquery = " & ".join(query.split())
-        stmt = sa.select(tables.Part).where(tables.Part.search_vector.op("@@")(sa.func.to_tsquery("simple", tsquery)))
-        with self.sessionmaker() as session:
-            results = session.execute(stmt).scalars().all()
-            return [
-                PartDTO(
-                    part_id=result.part_id,
-                    part_number=result.part_number,
-                    name=result.name,
-                    description=result.description,
-                    brand=result.brand,
-                    compatibility=result.compatibility,
-                    price=result.price,
-                    stock_quantity=result.stock_quantity,
-                    created_at=result.created_at,
-                    updated_at=result.updated_at,
-                    page_url=result.image_url,
-                )
-                for result in results
-            ], len(results)
+        parsed = parse_query(query)
+        if parsed.is_empty:
+            return [], 0
+        stmt = self._select().where(
+            tables.Part.search_vector.op("@@")(sa.func.to_tsquery(parsed.config, parsed.tsquery))
+        )
+        with self._read_session(replica=True) as session:
+            results = [self._to_dto(row) for row in session.execute(stmt)]
+            return results, len(results)
+
+    def _values(self, item: PartDTO) -> dict[str, Any]:
+        values = {
+            "part_id": item.part_id or self.generate_uuid(),
+            "part_number": item.part_number,
+            "name": item.name,
+            "description": item.description,
+            "brand": item.brand,
+            "compatibility": item.compatibility,
+            "price": item.price,
+            "stock_quantity": item.stock_quantity,
+            "image_url": item.page_url,
+        }
+        if item.category_id is not None:
+            values["category_id"] = item.category_id
+        return values
+
+    def _on_write(self, session: Session, rows: Mapping[str, dict[str, Any]]) -> None:
+        # Индекс совместимости обновляется в той же транзакции, что и сама запчасть.
+        replace_compatibility(
+            session, {part_id: row["compatibility"] for part_id, row in rows.items() if "compatibility" in row}
+        )
+
+    def _on_change(self, item_ids: list[str]) -> None:
+        catalog_version.bump()
 
     def create(self, item: PartDTO) -> None:
-        tmp = tables.Part(
-            part_id=item.part_id or self.generate_uuid(),
-            part_number=item.part_number,
-            name=item.name,
-            description=item.description,
-            brand=item.brand,
-            compatibility=item.compatibility,
-            price=item.price,
-            stock_quantity=item.stock_quantity,
-            image_url=item.page_url,
-        )
+        values = self._values(item)
 
-        with self.sessionmaker.begin() as session:
-            session.add(tmp)
+        with self._write_session() as session:
+            session.execute(sa.insert(tables.Part).values(values))
+            self._on_write(session, {values["part_id"]: values})
+        self._after_commit(catalog_version.bump)
 
     def update(self, item_id: str, item: PartDTO) -> None:
-        stmt = sa.select(tables.Part).where(tables.Part.part_id == item_id)
-
-        with self.sessionmaker.begin() as session:
-            part = session.execute(stmt).scalar_one_or_none()
-            if part is None:
-                return None
-
-            part.part_number = item.part_number
-            part.name = item.name
-            part.description = item.description
-            part.brand = item.brand
-            part.compatibility = item.compatibility
-            part.price = item.price
-            part.stock_quantity = item.stock_quantity
-            part.image_url = item.page_url
+        values = self._update_values(item)
+        stmt = sa.update(tables.Part).where(tables.Part.part_id == item_id).values(values)
+
+        with self._write_session() as session:
+            if session.execute(stmt).rowcount:
+                self._on_write(session, {item_id: values})
+        self._after_commit(catalog_version.bump)
 
     def delete(self, item_id: str) -> None:
         stmt = sa.delete(tables.Part).where(tables.Part.part_id == item_id)
-        with self.sessionmaker.begin() as session:
+        with self._write_session() as session:
             session.execute(stmt)
+        self._after_commit(catalog_version.bump)
 
 
-part_repository = PartRepository(sessionmaker=get_sessionmaker())
+part_repository = PartRepository()
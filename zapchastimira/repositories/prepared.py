@@ -0,0 +1,121 @@
+import hashlib
+import re
+import threading
+from typing import Any, Mapping, NamedTuple, cast
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Dialect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.compiler import SQLCompiler
+
+from zapchastimira.common.db_utils import PREPARED_STATEMENTS_OPTION
+
+# Параметры в SQL, скомпилированном для psycopg2 (paramstyle `pyformat`).
+PLACEHOLDER_RE = re.compile(r"%\((\w+)\)s")
+
+
+class _Compiled(NamedTuple):
+    name: str
+    prepare: str
+    execute: sa.TextualSelect | sa.TextClause
+    names: list[str]
+    defaults: dict[str, Any]
+
+
+class PreparedStatement:
+    """
+    Частый запрос, построенный один раз и выполняемый как подготовленный на сервере.
+
+    Запрос задается с именованными параметрами (`sa.bindparam`), поэтому при вызове
+    не строится заново. На соединении psycopg2 он при первом выполнении
+    подготавливается командой `PREPARE`, а дальше выполняется `EXECUTE` с
+    параметрами: PostgreSQL не разбирает запрос заново и может переиспользовать
+    его план. Подготовленные запросы живут до закрытия соединения, а список уже
+    подготовленных хранится в `info` соединения пула. asyncpg сам подготавливает
+    и кэширует каждый запрос, поэтому на нем запрос выполняется как обычно.
+
+    Подготовка отключается настройкой `POSTGRES_PREPARED_STATEMENTS`.
+
+    Attributes:
+        name (str): Префикс имени подготовленного запроса; к нему добавляется хэш SQL.
+        statement (sa.Executable): Запрос с именованными параметрами.
+    """
+
+    def __init__(self, name: str, statement: sa.Executable):
+        """
+        Инициализирует запрос.
+
+        Args:
+            name (str): Префикс имени подготовленного запроса (латиница, цифры и `_`).
+            statement (sa.Executable): Запрос с именованными параметрами; параметры-списки
+                (`IN` с `expanding`) не поддерживаются.
+        """
+        self.name = name
+        self.statement = statement
+        self._compiled: _Compiled | None = None
+        self._lock = threading.Lock()
+
+    def _compile(self, dialect: Dialect) -> _Compiled:
+        statement = self.statement
+        if not isinstance(statement, sa.ClauseElement):
+            raise TypeError(f"cannot prepare {type(statement).__name__}")
+        compiled = cast(SQLCompiler, statement.compile(dialect=dialect))
+        binds = {name: bind for bind, name in compiled.bind_names.items()}
+        # Константы (`sa.literal`) подставляются в текст, как их подставил бы psycopg2: в `PREPARE`
+        # параметр без контекста получил бы тип text. Параметрами остаются только `sa.bindparam`.
+        literals = {}
+        for key, bind in binds.items():
+            processor = None if bind.required else bind.type.literal_processor(dialect)
+            if processor is not None:
+                literals[key] = processor(bind.effective_value)
+        names = [key for key in dict.fromkeys(PLACEHOLDER_RE.findall(compiled.string)) if key not in literals]
+        positions = {key: position for position, key in enumerate(names, 1)}
+        sql = PLACEHOLDER_RE.sub(lambda match: literals.get(match[1]) or f"${positions[match[1]]}", compiled.string)
+        # Хэш SQL в имени отличает запросы с одинаковым префиксом и разным текстом.
+        name = f"{self.name}_{hashlib.sha1(sql.encode()).hexdigest()[:12]}"
+
+        # Параметры EXECUTE называются по позиции: имена анонимных параметров (`param_1`)
+        # нельзя переиспользовать в текстовом запросе.
+        arguments = ", ".join(f":p{position}" for position in positions.values())
+        text = sa.text(f"EXECUTE {name}({arguments})" if arguments else f"EXECUTE {name}")
+        text = text.bindparams(*(sa.bindparam(f"p{positions[key]}", type_=binds[key].type) for key in names))
+        execute: sa.TextualSelect | sa.TextClause = text
+        if isinstance(statement, sa.Select):
+            execute = text.columns(*(sa.column(column.name, column.type) for column in statement.selected_columns))
+        defaults = {key: binds[key].effective_value for key in names if not binds[key].required}
+        return _Compiled(name=name, prepare=f"PREPARE {name} AS {sql}", execute=execute, names=names, defaults=defaults)
+
+    def execute(self, session: Session, params: Mapping[str, Any] | None = None) -> sa.Result[Any]:
+        """
+        Выполняет запрос в сессии.
+
+        Args:
+            session (Session): Сессия SQLAlchemy.
+            params (Mapping[str, Any] | None): Значения именованных параметров.
+
+        Returns:
+            sa.Result[Any]: Результат запроса с теми же колонками, что и у `statement`.
+        """
+        params = params or {}
+        connection = session.connection()
+        if connection.dialect.driver != "psycopg2" or not connection.get_execution_options().get(
+            PREPARED_STATEMENTS_OPTION
+        ):
+            return session.execute(self.statement, params)
+
+        if self._compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    self._compiled = self._compile(connection.dialect)
+        compiled = self._compiled
+
+        prepared: set[str] = connection.info.setdefault("prepared_statements", set())
+        if compiled.name not in prepared:
+            # PREPARE не откатывается вместе с транзакцией, поэтому запрос остается
+            # подготовленным на соединении до его закрытия.
+            connection.exec_driver_sql(compiled.prepare)
+            prepared.add(compiled.name)
+        values = {**compiled.defaults, **params}
+        return session.execute(
+            compiled.execute, {f"p{position}": values[key] for position, key in enumerate(compiled.names, 1)}
+        )
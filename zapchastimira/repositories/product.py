@@ -1,13 +1,15 @@
 from dataclasses import dataclass
+from typing import Any
 
 import sqlalchemy as sa
 
 from zapchastimira.common import tables
-from zapchastimira.common.db_utils import get_sessionmaker
+from zapchastimira.common.search_query import parse_query
 from zapchastimira.repositories.base import BaseRepository, RepositoryDTO
+from zapchastimira.repositories.search import catalog_version
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class ProductDTO(RepositoryDTO):
     product_id: str | None = None
     name: str
@@ -19,79 +21,73 @@ class ProductDTO(RepositoryDTO):
 
 
 class ProductRepository(BaseRepository):
+    model = tables.Product
+    dto_class = ProductDTO
+    columns = (
+        tables.Product.product_id,
+        tables.Product.name,
+        tables.Product.price,
+        tables.Product.stock_quantity,
+        tables.Product.category_id,
+        tables.Product.description,
+        tables.Product.page_url,
+    )
+
     def get_by_id(self, item_id: str) -> ProductDTO | None:
-        stmt = sa.select(tables.Product).where(tables.Product.product_id == item_id)
-
-        with self.sessionmaker() as session:
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return None
-            return ProductDTO(
-                product_id=result.product_id,
-                name=result.name,
-                description=result.description,
-                price=result.price,
-                stock_quantity=result.stock_quantity,
-                category_id=result.category_id,
-                page_url=result.page_url,
-            )
+        stmt = self._select().where(tables.Product.product_id == item_id)
+
+        with self._read_session() as session:
+            result = session.execute(stmt).one_or_none()
+            return None if result is None else self._to_dto(result)
 
     def get_all(self, query: str) -> tuple[list[ProductDTO], int]:
-        tsquery = " & ".join(query.split())
-        stmt = sa.select(tables.Product).where(
-            tables.Product.search_vector.op("@@")(sa.func.to_tsquery("simple", tsquery))
+        parsed = parse_query(query)
+        if parsed.is_empty:
+            return [], 0
+        stmt = self._select().where(
+            tables.Product.search_vector.op("@@")(sa.func.to_tsquery(parsed.config, parsed.tsquery))
         )
 
-        with self.sessionmaker() as session:
-            results = session.execute(stmt).scalars().all()
-
-            return [
-                ProductDTO(
-                    product_id=result.product_id,
-                    name=result.name,
-                    description=result.description,
-                    price=result.price,
-                    stock_quantity=result.stock_quantity,
-                    category_id=result.category_id,
-                    page_url=result.page_url,
-                )
-                for result in results
-            ], len(results)
+        with self._read_session(replica=True) as session:
+            results = [self._to_dto(row) for row in session.execute(stmt)]
+            return results, len(results)
 
-    def create(self, product_dto: ProductDTO) -> None:
-        new_product = tables.Product(
-            name=product_dto.name,
-            description=product_dto.description,
-            price=product_dto.price,
-            stock_quantity=product_dto.stock_quantity,
-            category_id=product_dto.category_id,
-            page_url=product_dto.page_url,
-        )
+    def _values(self, item: ProductDTO) -> dict[str, Any]:
+        return {
+            "product_id": item.product_id or self.generate_uuid(),
+            "name": item.name,
+            "description": item.description,
+            "price": item.price,
+            "stock_quantity": item.stock_quantity,
+            "category_id": item.category_id,
+            "page_url": item.page_url,
+        }
 
-        with self.sessionmaker.begin() as session:
-            session.add(new_product)
-            return None
+    def _on_change(self, item_ids: list[str]) -> None:
+        catalog_version.bump()
 
-    def update(self, item_id: str, product_dto: ProductDTO) -> None:
-        stmt = sa.select(tables.Product).where(tables.Product.product_id == item_id)
+    def create(self, product_dto: ProductDTO) -> None:
+        with self._write_session() as session:
+            session.execute(sa.insert(tables.Product).values(self._values(product_dto)))
+        self._after_commit(catalog_version.bump)
 
-        with self.sessionmaker() as session:
-            product = session.execute(stmt).scalar_one_or_none()
-            if product is None:
-                return None
+    def update(self, item_id: str, product_dto: ProductDTO) -> None:
+        stmt = (
+            sa.update(tables.Product)
+            .where(tables.Product.product_id == item_id)
+            .values(self._update_values(product_dto))
+        )
 
-            product.name = product_dto.name
-            product.description = product_dto.description
-            product.price = product_dto.price
-            product.stock_quantity = product_dto.stock_quantity
-            product.category_id = product_dto.category_id
-            product.page_url = product_dto.page_url
+        with self._write_session() as session:
+            session.execute(stmt)
+        self._after_commit(catalog_version.bump)
 
     def delete(self, item_id: str) -> None:
         stmt = sa.delete(tables.Product).where(tables.Product.product_id == item_id)
 
-        with self.sessionmaker.begin() as session:
+        with self._write_session() as session:
             session.execute(stmt)
+        self._after_commit(catalog_version.bump)
 
 
-product_repository = ProductRepository(sessionmaker=get_sessionmaker())
+product_repository = ProductRepository()
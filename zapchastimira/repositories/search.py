@@ -0,0 +1,371 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, NamedTuple
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session, sessionmaker
+
+from zapchastimira.common import tables
+from zapchastimira.common.cache import VersionCounter
+from zapchastimira.common.compatibility import Vehicle
+from zapchastimira.common.db_utils import ReplicaRouter, get_replica_router, get_sessionmaker
+from zapchastimira.common.search_query import ParsedQuery
+from zapchastimira.repositories.base import current_unit_of_work
+from zapchastimira.repositories.compatibility import VehicleParams, fits_vehicles
+from zapchastimira.repositories.prepared import PreparedStatement
+
+# Версия данных каталога в этом процессе: репозитории запчастей и товаров
+# увеличивают ее после каждой записи, что делает недействительным кэш поиска.
+catalog_version = VersionCounter()
+
+
+class SearchHit(NamedTuple):
+    """
+    Строка объединенной выдачи поиска по запчастям и товарам.
+
+    Поля, которых нет у товаров (`part_number`, `brand`, `compatibility`), равны None.
+    """
+
+    kind: str
+    item_id: str
+    name: str
+    description: str | None
+    price: float
+    stock_quantity: int
+    page_url: str | None
+    part_number: str | None
+    brand: str | None
+    compatibility: str | None
+    rank: float
+
+
+@dataclass(frozen=True)
+class CatalogCursor:
+    """
+    Позиция в объединенной выдаче, упорядоченной по `rank DESC, kind, item_id`.
+
+    Attributes:
+        rank (float): Ранг последнего показанного элемента.
+        kind (str): Тип последнего показанного элемента (`part` или `product`).
+        item_id (str): Идентификатор последнего показанного элемента.
+    """
+
+    rank: float
+    kind: str
+    item_id: str
+
+
+@dataclass(frozen=True)
+class CategoryCursor:
+    """
+    Позиция в списке категории, упорядоченном по `name, item_id`.
+
+    Attributes:
+        name (str): Название последнего показанного элемента.
+        item_id (str): Идентификатор последнего показанного элемента.
+    """
+
+    name: str
+    item_id: str
+
+
+class CatalogSearchRepository:
+    """
+    Полнотекстовый поиск сразу по запчастям и товарам одним запросом.
+
+    Обе ветки `UNION ALL` ранжируются `ts_rank_cd` и ограничиваются размером
+    страницы еще до объединения, поэтому база сортирует не больше `2 * limit`
+    строк на внешнем уровне. Запросы поиска строятся один раз для каждого вида
+    (первая страница или курсор, количество автомобилей) и выполняются как
+    подготовленные (`PreparedStatement`) с разными параметрами. Все запросы
+    только читают, поэтому вне единицы работы выполняются на репликах, если они настроены.
+
+    Attributes:
+        sessionmaker (sessionmaker[Session]): Фабрика сессий SQLAlchemy; по умолчанию общая,
+            создается при первом запросе.
+        replicas (ReplicaRouter | None): Реплики для чтения; без них запросы идут на `sessionmaker`.
+    """
+
+    PART = "part"
+    PRODUCT = "product"
+
+    def __init__(self, sessionmaker: sessionmaker[Session] | None = None, replicas: ReplicaRouter | None = None):
+        """
+        Инициализирует репозиторий.
+
+        Args:
+            sessionmaker (sessionmaker[Session] | None): Фабрика сессий SQLAlchemy; по умолчанию общая.
+            replicas (ReplicaRouter | None): Реплики для чтения; по умолчанию общие, если не передана
+                `sessionmaker`.
+        """
+        self._sessionmaker = sessionmaker
+        self._replicas = replicas
+        self._shared = sessionmaker is None
+        self._search_statements: dict[tuple[str | None, int, bool], PreparedStatement] = {}
+
+        column = tables.Part.part_number_normalized
+        part_number = sa.bindparam("part_number", type_=sa.String)
+        limit = sa.bindparam("limit", type_=sa.Integer)
+        similarity = sa.func.similarity(column, part_number)
+        self._part_number_steps = (
+            PreparedStatement(
+                "part_number_exact",
+                self._select_parts(sa.literal(1.0, sa.REAL))
+                .where(column == part_number)
+                .order_by(tables.Part.part_id)
+                .limit(limit),
+            ),
+            PreparedStatement(
+                "part_number_prefix",
+                self._select_parts(sa.literal(0.5, sa.REAL))
+                .where(column.like(sa.bindparam("prefix", type_=sa.String)))
+                .order_by(sa.func.length(column), tables.Part.part_id)
+                .limit(limit),
+            ),
+            PreparedStatement(
+                "part_number_similar",
+                self._select_parts(similarity)
+                # Оператор % использует триграммный индекс, порог уточняется сравнением со сходством.
+                .where(column.op("%")(part_number), similarity >= sa.bindparam("min_similarity", type_=sa.Float))
+                .order_by(similarity.desc(), tables.Part.part_id)
+                .limit(limit),
+            ),
+        )
+
+    @property
+    def sessionmaker(self) -> sessionmaker[Session]:
+        if self._sessionmaker is None:
+            self._sessionmaker = get_sessionmaker()
+        return self._sessionmaker
+
+    @property
+    def replicas(self) -> ReplicaRouter | None:
+        if self._replicas is None and self._shared:
+            self._replicas = get_replica_router()
+        return self._replicas
+
+    @contextmanager
+    def _read_session(self) -> Iterator[Session]:
+        """
+        Возвращает сессию для чтения: сессию текущей единицы работы или новую, на реплике, если они настроены.
+
+        Yields:
+            Session: Сессия SQLAlchemy.
+        """
+        current = current_unit_of_work()
+        if current is not None:
+            yield current.session
+            return
+        with self.sessionmaker() if self.replicas is None else self.replicas.session() as session:
+            yield session
+
+    @staticmethod
+    def _after_cursor(
+        rank: sa.ColumnElement[float], kind: str, item_id: sa.ColumnElement[str], cursor_kind: str
+    ) -> sa.ColumnElement[bool]:
+        # ts_rank_cd возвращает real: ранг курсора приводится к real, иначе равенство во float8 не выполняется.
+        cursor_rank = sa.cast(sa.bindparam("cursor_rank", type_=sa.Float), sa.REAL)
+        if kind > cursor_kind:
+            return rank <= cursor_rank
+        if kind < cursor_kind:
+            return rank < cursor_rank
+        return sa.or_(
+            rank < cursor_rank, sa.and_(rank == cursor_rank, item_id > sa.bindparam("cursor_item_id", type_=sa.String))
+        )
+
+    def _select_parts(self, rank: sa.ColumnElement[float]) -> sa.Select:
+        return sa.select(
+            sa.literal(self.PART, sa.String).label("kind"),
+            tables.Part.part_id.label("item_id"),
+            tables.Part.name,
+            tables.Part.description,
+            tables.Part.price,
+            tables.Part.stock_quantity,
+            tables.Part.image_url.label("page_url"),
+            tables.Part.part_number,
+            tables.Part.brand,
+            tables.Part.compatibility,
+            rank.label("rank"),
+        )
+
+    def _select_products(self, rank: sa.ColumnElement[float]) -> sa.Select:
+        return sa.select(
+            sa.literal(self.PRODUCT, sa.String).label("kind"),
+            tables.Product.product_id.label("item_id"),
+            tables.Product.name,
+            tables.Product.description,
+            tables.Product.price,
+            tables.Product.stock_quantity,
+            tables.Product.page_url,
+            sa.null().cast(sa.String).label("part_number"),
+            sa.null().cast(sa.String).label("brand"),
+            sa.null().cast(sa.String).label("compatibility"),
+            rank.label("rank"),
+        )
+
+    def list_category(
+        self, kind: str, category_id: str, limit: int, cursor: CategoryCursor | None = None
+    ) -> list[SearchHit]:
+        """
+        Возвращает страницу запчастей или товаров одной категории.
+
+        Выборка идет по индексу `(category_id, name, id)`: страница читается
+        одним проходом по индексу с позиции курсора, без сортировки и `OFFSET`.
+
+        Args:
+            kind (str): `PART` или `PRODUCT`.
+            category_id (str): Идентификатор категории запчастей или товаров.
+            limit (int): Максимальное количество результатов.
+            cursor (CategoryCursor | None): Последний показанный элемент; None — первая страница.
+
+        Returns:
+            list[SearchHit]: Элементы категории в порядке названий; ранг равен 0.
+        """
+        if kind == self.PART:
+            table, item_id = tables.Part, tables.Part.part_id
+            stmt = self._select_parts(sa.literal(0.0, sa.REAL))
+        else:
+            table, item_id = tables.Product, tables.Product.product_id
+            stmt = self._select_products(sa.literal(0.0, sa.REAL))
+        stmt = stmt.where(table.category_id == category_id)
+        if cursor is not None:
+            stmt = stmt.where(sa.tuple_(table.name, item_id) > sa.tuple_(cursor.name, cursor.item_id))
+        stmt = stmt.order_by(table.name, item_id).limit(limit)
+
+        with self._read_session() as session:
+            return [SearchHit(*row) for row in session.execute(stmt).all()]
+
+    def find_by_part_number(self, part_number: str, limit: int, min_similarity: float | None = None) -> list[SearchHit]:
+        """
+        Ищет запчасти по нормализованному артикулу.
+
+        Сначала выполняется точное сравнение, затем поиск по префиксу (оба по
+        индексу `idx_parts_part_number_normalized`), затем, если задан
+        `min_similarity`, нечеткий поиск по триграммам. Следующий шаг выполняется,
+        только если предыдущий ничего не нашел, поэтому точное совпадение
+        обходится одним запросом по индексу.
+
+        Args:
+            part_number (str): Артикул без разделителей в верхнем регистре (см. `normalize_part_number`).
+            limit (int): Максимальное количество результатов.
+            min_similarity (float | None): Порог сходства триграмм от 0 до 1; None отключает нечеткий поиск.
+
+        Returns:
+            list[SearchHit]: Найденные запчасти; ранг 1 у точного совпадения,
+            0.5 у совпадения по префиксу и сходство триграмм у нечеткого.
+        """
+        params = {
+            "part_number": part_number,
+            "prefix": f"{part_number}%",
+            "limit": limit,
+            "min_similarity": min_similarity,
+        }
+        steps = self._part_number_steps if min_similarity is not None else self._part_number_steps[:2]
+
+        with self._read_session() as session:
+            for statement in steps:
+                rows = statement.execute(session, params).all()
+                if rows:
+                    return [SearchHit(*row) for row in rows]
+        return []
+
+    def search(
+        self,
+        query: ParsedQuery,
+        limit: int,
+        cursor: CatalogCursor | None = None,
+        vehicles: tuple[Vehicle, ...] = (),
+        vehicle_boost: float | None = None,
+    ) -> list[SearchHit]:
+        """
+        Ищет запчасти и товары по разобранному запросу.
+
+        Если переданы автомобили пользователя, запчасти проверяются по индексу
+        совместимости (`fits_vehicles`): с `vehicle_boost` подходящие запчасти
+        получают добавку к рангу, без него остаются только подходящие. Проверка
+        выполняется только для строк, уже найденных полнотекстовым поиском.
+
+        Args:
+            query (ParsedQuery): Разобранный запрос (см. `parse_query`).
+            limit (int): Максимальное количество результатов.
+            cursor (CatalogCursor | None): Последний показанный элемент; None — первая страница.
+            vehicles (tuple[Vehicle, ...]): Автомобили пользователя; пустой кортеж отключает учет совместимости.
+            vehicle_boost (float | None): Добавка к рангу подходящей запчасти; None — фильтровать запчасти.
+
+        Returns:
+            list[SearchHit]: Результаты в порядке `rank DESC, kind, item_id`.
+        """
+        if query.is_empty:
+            return []
+        boost = bool(vehicles) and vehicle_boost is not None
+        statement = self._search_statement(None if cursor is None else cursor.kind, len(vehicles), boost)
+
+        params = {"config": query.config, "tsquery": query.tsquery, "limit": limit}
+        if cursor is not None:
+            params.update(cursor_rank=cursor.rank, cursor_item_id=cursor.item_id)
+        for index, vehicle in enumerate(vehicles):
+            params.update(VehicleParams.values(index, vehicle))
+        if boost:
+            params["vehicle_boost"] = vehicle_boost
+
+        with self._read_session() as session:
+            return [SearchHit(*row) for row in statement.execute(session, params).all()]
+
+    def _search_statement(self, cursor_kind: str | None, vehicle_count: int, boost: bool) -> PreparedStatement:
+        """
+        Возвращает запрос поиска для вида страницы, построенный при первом обращении.
+
+        Args:
+            cursor_kind (str | None): Тип элемента курсора; None — первая страница.
+            vehicle_count (int): Количество автомобилей пользователя.
+            boost (bool): Поднимать подходящие запчасти в выдаче (True) или фильтровать их (False).
+
+        Returns:
+            PreparedStatement: Запрос с параметрами `config`, `tsquery`, `limit`,
+            `cursor_rank`, `cursor_item_id`, `make_N`, `model_N`, `year_N` и `vehicle_boost`.
+        """
+        key = (cursor_kind, vehicle_count, boost)
+        statement = self._search_statements.get(key)
+        if statement is not None:
+            return statement
+
+        # to_tsquery с параметрами не сворачивается в константу в общем плане подготовленного запроса
+        # и вычислялся бы для каждой найденной строки; подзапрос вычисляется один раз (InitPlan).
+        tsquery = sa.select(
+            sa.func.to_tsquery(sa.bindparam("config", type_=REGCONFIG), sa.bindparam("tsquery", type_=sa.String))
+        ).scalar_subquery()
+        limit = sa.bindparam("limit", type_=sa.Integer)
+
+        part_rank: sa.ColumnElement[float] = sa.func.ts_rank_cd(tables.Part.search_vector, tsquery)
+        part_filter: sa.ColumnElement[bool] = tables.Part.search_vector.op("@@")(tsquery)
+        if vehicle_count:
+            fits = fits_vehicles(tables.Part.part_id, [VehicleParams.bind(index) for index in range(vehicle_count)])
+            if not boost:
+                part_filter = sa.and_(part_filter, fits)
+            else:
+                # Ранг приводится к real, как у ts_rank_cd, чтобы курсор сравнивался так же.
+                vehicle_boost = sa.cast(sa.bindparam("vehicle_boost", type_=sa.Float), sa.REAL)
+                part_rank = sa.cast(part_rank + sa.case((fits, vehicle_boost), else_=sa.cast(0, sa.REAL)), sa.REAL)
+        parts = self._select_parts(part_rank).where(part_filter)
+
+        product_rank = sa.func.ts_rank_cd(tables.Product.search_vector, tsquery)
+        products = self._select_products(product_rank).where(tables.Product.search_vector.op("@@")(tsquery))
+
+        if cursor_kind is not None:
+            parts = parts.where(self._after_cursor(part_rank, self.PART, tables.Part.part_id, cursor_kind))
+            products = products.where(
+                self._after_cursor(product_rank, self.PRODUCT, tables.Product.product_id, cursor_kind)
+            )
+
+        parts = parts.order_by(part_rank.desc(), tables.Part.part_id).limit(limit)
+        products = products.order_by(product_rank.desc(), tables.Product.product_id).limit(limit)
+
+        hits = sa.union_all(parts, products).subquery("hits")
+        stmt = sa.select(hits).order_by(hits.c.rank.desc(), hits.c.kind, hits.c.item_id).limit(limit)
+
+        name = f"catalog_search_{cursor_kind or 'first'}_{vehicle_count}_{'boost' if boost else 'filter'}"
+        return self._search_statements.setdefault(key, PreparedStatement(name, stmt))
+
+
+catalog_search_repository = CatalogSearchRepository()
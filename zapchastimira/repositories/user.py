@@ -1,14 +1,18 @@
 import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from typing import Any
 
 import sqlalchemy as sa
+from sqlalchemy.orm import Session, sessionmaker
 
 from zapchastimira.common import tables
-from zapchastimira.common.db_utils import get_sessionmaker
+from zapchastimira.common.cache import CacheBackend, TTLCache, get_shared_cache_backend
+from zapchastimira.common.settings import CacheSettings
 from zapchastimira.repositories.base import BaseRepository, RepositoryDTO
+from zapchastimira.repositories.prepared import PreparedStatement
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class UserDTO(RepositoryDTO):
     phone: str | None = None
     user_id: str | None = None
@@ -18,105 +22,283 @@ class UserDTO(RepositoryDTO):
     state: tables.UserStateEnum
 
 
+class UserCache:
+    """
+    Кэш пользователей по Telegram ID со сквозной записью.
+
+    Значения хранятся в локальном LRU-кэше процесса и, если указано, в общем
+    хранилище `CacheBackend`, чтобы несколько реплик бота видели одно и то же
+    состояние пользователя. При наличии общего хранилища источником истины служит
+    оно, а локальный кэш должен быть коротким (или отключенным), так как изменения
+    других реплик попадают в него только после истечения `local_ttl`.
+
+    Attributes:
+        local (TTLCache[str, UserDTO] | None): Локальный кэш по Telegram ID.
+        shared (CacheBackend | None): Общее для реплик хранилище.
+        shared_ttl (float): Время жизни записи в общем хранилище в секундах.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        local_ttl: float,
+        shared: CacheBackend | None = None,
+        shared_ttl: float = 3600.0,
+    ):
+        """
+        Инициализирует кэш.
+
+        Args:
+            maxsize (int): Максимальное количество пользователей в локальном кэше.
+            local_ttl (float): Время жизни записи локального кэша в секундах; 0 отключает локальный кэш.
+            shared (CacheBackend | None): Общее для реплик хранилище.
+            shared_ttl (float): Время жизни записи в общем хранилище в секундах.
+        """
+        self.local: TTLCache[str, UserDTO] | None = TTLCache(maxsize, local_ttl) if local_ttl > 0 else None
+        self._tg_uid_by_user_id: TTLCache[str, str] = TTLCache(maxsize, max(local_ttl, shared_ttl))
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+
+    def get(self, tg_uid: str) -> UserDTO | None:
+        """
+        Возвращает пользователя по Telegram ID.
+
+        Args:
+            tg_uid (str): Telegram ID пользователя.
+
+        Returns:
+            UserDTO | None: Пользователь или None, если его нет в кэше.
+        """
+        if self.local is not None:
+            user = self.local.get(tg_uid)
+            if user is not None:
+                return user
+
+        if self.shared is None:
+            return None
+        data = self.shared.get(f"user:tg:{tg_uid}")
+        if data is None:
+            return None
+        user = UserDTO(**data)
+        if self.local is not None:
+            self.local.set(tg_uid, user)
+        return user
+
+    def get_by_user_id(self, user_id: str) -> UserDTO | None:
+        """
+        Возвращает пользователя по внутреннему ID.
+
+        Args:
+            user_id (str): ID пользователя.
+
+        Returns:
+            UserDTO | None: Пользователь или None, если его нет в кэше.
+        """
+        tg_uid = self._tg_uid_by_user_id.get(user_id)
+        if tg_uid is None and self.shared is not None:
+            tg_uid = self.shared.get(f"user:id:{user_id}")
+        if tg_uid is None:
+            return None
+        return self.get(tg_uid)
+
+    def get_shared_by_user_id(self, user_id: str) -> UserDTO | None:
+        """
+        Возвращает пользователя по внутреннему ID только из общего хранилища, минуя локальный кэш.
+
+        Args:
+            user_id (str): ID пользователя.
+
+        Returns:
+            UserDTO | None: Пользователь или None, если общего хранилища нет или пользователя в нем нет.
+        """
+        if self.shared is None:
+            return None
+        tg_uid = self.shared.get(f"user:id:{user_id}")
+        if tg_uid is None:
+            return None
+        data = self.shared.get(f"user:tg:{tg_uid}")
+        return None if data is None else UserDTO(**data)
+
+    def put(self, user: UserDTO) -> None:
+        """
+        Сохраняет пользователя в кэш. Пользователи без Telegram ID не кэшируются.
+
+        Args:
+            user (UserDTO): Пользователь.
+        """
+        if user.tg_uid is None or user.user_id is None:
+            return
+        if self.local is not None:
+            self.local.set(user.tg_uid, user)
+        self._tg_uid_by_user_id.set(user.user_id, user.tg_uid)
+        if self.shared is not None:
+            data = user.to_dict()
+            data["created_at"] = data["updated_at"] = None
+            self.shared.set(f"user:tg:{user.tg_uid}", data, ttl=self.shared_ttl)
+            self.shared.set(f"user:id:{user.user_id}", user.tg_uid, ttl=self.shared_ttl)
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Удаляет пользователя из кэша.
+
+        Args:
+            user_id (str): ID пользователя.
+        """
+        tg_uid = self._tg_uid_by_user_id.get(user_id)
+        if tg_uid is None and self.shared is not None:
+            tg_uid = self.shared.get(f"user:id:{user_id}")
+        self._tg_uid_by_user_id.delete(user_id)
+        if tg_uid is None:
+            return
+        if self.local is not None:
+            self.local.delete(tg_uid)
+        if self.shared is not None:
+            self.shared.delete(f"user:tg:{tg_uid}")
+            self.shared.delete(f"user:id:{user_id}")
+
+
 class UserRepository(BaseRepository):
+    model = tables.User
+    dto_class = UserDTO
+    columns = (
+        tables.User.phone,
+        tables.User.user_id,
+        tables.User.tg_uid,
+        tables.User.created_at,
+        tables.User.updated_at,
+        tables.User.state,
+    )
+    # Запросы обработки каждого сообщения строятся один раз и подготавливаются на сервере.
+    _by_user_id = PreparedStatement(
+        "user_by_id", sa.select(*columns).where(tables.User.user_id == sa.bindparam("user_id"))
+    )
+    _by_telegram_id = PreparedStatement(
+        "user_by_tg_uid", sa.select(*columns).where(tables.User.tg_uid == sa.bindparam("tg_uid"))
+    )
+    _set_state = PreparedStatement(
+        "user_set_state",
+        sa.update(tables.User)
+        .where(tables.User.user_id == sa.bindparam("item_id"))
+        .values(state=sa.bindparam("state")),
+    )
+
+    def __init__(self, sessionmaker: sessionmaker[Session] | None = None, cache: UserCache | None = None):
+        """
+        Инициализирует репозиторий.
+
+        Args:
+            sessionmaker (sessionmaker[Session] | None): Фабрика сессий SQLAlchemy; по умолчанию общая.
+            cache (UserCache | None): Кэш пользователей; без него каждый вызов обращается к базе данных.
+        """
+        super().__init__(sessionmaker)
+        self.cache = cache
+
     def get_by_id(self, item_id: str) -> UserDTO | None:
-        stmt = sa.select(tables.User).where(tables.User.user_id == item_id)
-
-        with self.sessionmaker() as session:
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return None
-            return UserDTO(
-                phone=result.phone,
-                user_id=result.user_id,
-                tg_uid=result.tg_uid,
-                created_at=result.created_at,
-                updated_at=result.updated_at,
-                state=result.state,
-            )
-
-    def get_all(self) -> tuple[list[UserDTO], int]:
-        stmt = sa.select(tables.User)
-        total_stmt = sa.select(sa.func.count("*")).select_from(stmt.subquery())
-
-        with self.sessionmaker() as session:
-            res = session.execute(stmt).scalars().all()
-            total = session.execute(total_stmt).scalar_one()
-            return [
-                UserDTO(
-                    phone=i.phone,
-                    user_id=i.user_id,
-                    tg_uid=i.tg_uid,
-                    created_at=i.created_at,
-                    updated_at=i.updated_at,
-                    state=i.state,
-                )
-                for i in res
-            ], total
+        if self.cache is not None:
+            cached = self.cache.get_by_user_id(item_id)
+            if cached is not None:
+                return cached
+
+        with self._read_session() as session:
+            result = self._by_user_id.execute(session, {"user_id": item_id}).one_or_none()
+            return None if result is None else self._to_dto(result)
+
+    def get_all(
+        self,
+        limit: int | None = None,
+        offset: int = 0,
+        after: str | None = None,
+        estimate_total: bool = False,
+    ) -> tuple[list[UserDTO], int]:
+        return self._get_page(limit=limit, offset=offset, after=after, estimate_total=estimate_total)
+
+    def _values(self, item: UserDTO) -> dict[str, Any]:
+        return {
+            "user_id": item.user_id or self.generate_uuid(),
+            "phone": item.phone,
+            "tg_uid": item.tg_uid,
+            "state": item.state,
+        }
+
+    def _update_values(self, item: UserDTO) -> dict[str, Any]:
+        return {"phone": item.phone, "tg_uid": item.tg_uid}
+
+    def _on_change(self, item_ids: list[str]) -> None:
+        if self.cache is not None:
+            for item_id in item_ids:
+                self.cache.invalidate(item_id)
 
     def create(self, item: UserDTO) -> None:
-        tmp = tables.User(
-            user_id=item.user_id or self.generate_uuid(),
-            phone=item.phone,
-            tg_uid=item.tg_uid,
-            state=item.state,
-        )
+        values = self._values(item)
+
+        with self._write_session() as session:
+            session.execute(sa.insert(tables.User).values(values))
 
-        with self.sessionmaker.begin() as session:
-            session.add(tmp)
+        if self.cache is not None:
+            user = replace(item, user_id=values["user_id"])
+            self._after_commit(lambda: self.cache.put(user))
 
     def update(self, item_id: str, item: UserDTO) -> None:
-        stmt = sa.select(tables.User).where(tables.User.user_id == item_id)
+        stmt = sa.update(tables.User).where(tables.User.user_id == item_id).values(self._update_values(item))
 
-        with self.sessionmaker.begin() as session:
-            user = session.execute(stmt).scalar_one_or_none()
-            if user is None:
-                return None
-            user.phone = item.phone
-            user.tg_uid = item.tg_uid
+        with self._write_session() as session:
+            session.execute(stmt)
+        self._after_commit(lambda: self._on_change([item_id]))
 
     def set_state(self, user_id: str, state: tables.UserStateEnum) -> None:
-        stmt = sa.update(tables.User).where(tables.User.user_id == user_id).values(state=state)
+        # Локальный кэш не видит записей других реплик, поэтому UPDATE пропускается,
+        # только если то же состояние подтверждает общее хранилище.
+        if self.cache is not None and self.cache.shared is not None:
+            shared = self.cache.get_shared_by_user_id(user_id)
+            if shared is not None and shared.state == state:
+                return
 
-        with self.sessionmaker.begin() as session:
-            session.execute(stmt)
+        cached = self.cache.get_by_user_id(user_id) if self.cache is not None else None
+
+        with self._write_session() as session:
+            self._set_state.execute(session, {"item_id": user_id, "state": state})
+
+        if self.cache is not None and cached is not None:
+            self._after_commit(lambda: self.cache.put(replace(cached, state=state)))
 
     def delete(self, item_id: str) -> None:
         stmt = sa.delete(tables.User).where(tables.User.user_id == item_id)
-        with self.sessionmaker.begin() as session:
+        with self._write_session() as session:
             session.execute(stmt)
+        self._after_commit(lambda: self._on_change([item_id]))
 
     def get_user_by_phone(self, phone: str) -> UserDTO | None:
-        stmt = sa.select(tables.User).where(tables.User.phone == phone)
-
-        with self.sessionmaker() as session:
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return None
-        return UserDTO(
-            phone=result.phone,
-            user_id=result.user_id,
-            tg_uid=result.tg_uid,
-            created_at=result.created_at,
-            updated_at=result.updated_at,
-            state=result.state,
-        )
+        stmt = self._select().where(tables.User.phone == phone)
+
+        with self._read_session() as session:
+            result = session.execute(stmt).one_or_none()
+        return None if result is None else self._to_dto(result)
 
     def get_user_by_telegram_id(self, tg_uid: str) -> UserDTO | None:
-        stmt = sa.select(tables.User).where(tables.User.tg_uid == tg_uid)
-
-        with self.sessionmaker() as session:
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return None
-        return UserDTO(
-            phone=result.phone,
-            user_id=result.user_id,
-            tg_uid=result.tg_uid,
-            created_at=result.created_at,
-            updated_at=result.updated_at,
-            state=result.state,
-        )
-
-
-user_repository = UserRepository(sessionmaker=get_sessionmaker())
+        if self.cache is not None:
+            cached = self.cache.get(tg_uid)
+            if cached is not None:
+                return cached
+
+        with self._read_session() as session:
+            result = self._by_telegram_id.execute(session, {"tg_uid": tg_uid}).one_or_none()
+        if result is None:
+            return None
+        user = self._to_dto(result)
+        if self.cache is not None:
+            self.cache.put(user)
+        return user
+
+
+cache_settings = CacheSettings()
+shared_cache = get_shared_cache_backend(cache_settings.shared_url)
+
+user_repository = UserRepository(
+    cache=UserCache(
+        maxsize=cache_settings.user_maxsize,
+        # С общим хранилищем локальная запись живет недолго, иначе реплика видела бы устаревшее состояние.
+        local_ttl=cache_settings.user_ttl if shared_cache is None else cache_settings.user_shared_local_ttl,
+        shared=shared_cache,
+        shared_ttl=cache_settings.user_shared_ttl,
+    ),
+)
@@ -1,16 +1,21 @@
 from dataclasses import dataclass
+from typing import Any
 
 import sqlalchemy as sa
+from sqlalchemy.orm import Session, sessionmaker
 
 from zapchastimira.common import tables
-from zapchastimira.common.db_utils import get_sessionmaker
+from zapchastimira.common.cache import TTLCache
+from zapchastimira.common.compatibility import Vehicle, normalize_make, normalize_model
+from zapchastimira.common.settings import CacheSettings
 from zapchastimira.repositories.base import (
     BaseRepository,
     RepositoryDTO,
 )
+from zapchastimira.repositories.prepared import PreparedStatement
 
 
-@dataclass
+@dataclass(kw_only=True, slots=True)
 class UserCarDTO(RepositoryDTO):
     car_id: str | None = None
     user_id: str
@@ -21,73 +26,132 @@ class UserCarDTO(RepositoryDTO):
 
 
 class UserCarsRepository(BaseRepository):
-    def get_by_id(self, item_id: str) -> UserCarDTO | None:
-        stmt = sa.select(tables.UserCars).where(tables.UserCars.car_id == item_id)
-
-        with self.sessionmaker() as session:
-            result = session.execute(stmt).scalar_one_or_none()
-            if result is None:
-                return None
-            return UserCarDTO(
-                car_id=result.car_id,
-                user_id=result.user_id,
-                make=result.make,
-                model=result.model,
-                year=result.year,
-                color=result.color,
-            )
+    model = tables.UserCars
+    dto_class = UserCarDTO
+    columns = (
+        tables.UserCars.car_id,
+        tables.UserCars.user_id,
+        tables.UserCars.make,
+        tables.UserCars.model,
+        tables.UserCars.year,
+        tables.UserCars.color,
+    )
+    _vehicles = PreparedStatement(
+        "user_vehicles",
+        sa.select(tables.UserCars.make, tables.UserCars.model, tables.UserCars.year).where(
+            tables.UserCars.user_id == sa.bindparam("user_id")
+        ),
+    )
+
+    def __init__(
+        self,
+        sessionmaker: sessionmaker[Session] | None = None,
+        cache: TTLCache[str, tuple[Vehicle, ...]] | None = None,
+    ):
+        """
+        Инициализирует репозиторий.
+
+        Args:
+            sessionmaker (sessionmaker[Session] | None): Фабрика сессий SQLAlchemy; по умолчанию общая.
+            cache (TTLCache[str, tuple[Vehicle, ...]] | None): Кэш автомобилей по ID пользователя
+                для `get_vehicles`; без него каждый вызов обращается к базе данных.
+        """
+        super().__init__(sessionmaker)
+        self.cache = cache
 
-    def get_all(self) -> tuple[list[UserCarDTO], int]:
-        stmt = sa.select(tables.UserCars)
-        total_stmt = sa.select(sa.func.count("*")).select_from(stmt.subquery())
-
-        with self.sessionmaker() as session:
-            results = session.execute(stmt).scalars().all()
-            total = session.execute(total_stmt).scalar_one()
-            return [
-                UserCarDTO(
-                    car_id=result.car_id,
-                    user_id=result.user_id,
-                    make=result.make,
-                    model=result.model,
-                    year=result.year,
-                    color=result.color,
-                )
-                for result in results
-            ], total
+    def get_by_id(self, item_id: str) -> UserCarDTO | None:
+        stmt = self._select().where(tables.UserCars.car_id == item_id)
+
+        with self._read_session() as session:
+            result = session.execute(stmt).one_or_none()
+            return None if result is None else self._to_dto(result)
+
+    def get_all(
+        self,
+        limit: int | None = None,
+        offset: int = 0,
+        after: str | None = None,
+        estimate_total: bool = False,
+    ) -> tuple[list[UserCarDTO], int]:
+        return self._get_page(limit=limit, offset=offset, after=after, estimate_total=estimate_total)
+
+    def _values(self, item: UserCarDTO) -> dict[str, Any]:
+        return {
+            "car_id": item.car_id or self.generate_uuid(),
+            "user_id": item.user_id,
+            "make": item.make,
+            "model": item.model,
+            "year": item.year,
+            "color": item.color,
+        }
+
+    def _on_change(self, item_ids: list[str]) -> None:
+        # Пакетная запись знает только ID автомобилей, поэтому кэш сбрасывается целиком.
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _invalidate(self, user_ids: list[str]) -> None:
+        if self.cache is not None:
+            for user_id in user_ids:
+                self.cache.delete(user_id)
 
     def create(self, user_car_dto: UserCarDTO) -> None:
-        new_user_car = tables.UserCars(
-            car_id=user_car_dto.car_id or self.generate_uuid(),
-            user_id=user_car_dto.user_id,
-            make=user_car_dto.make,
-            model=user_car_dto.model,
-            year=user_car_dto.year,
-            color=user_car_dto.color,
-        )
-
-        with self.sessionmaker.begin() as session:
-            session.add(new_user_car)
+        with self._write_session() as session:
+            session.execute(sa.insert(tables.UserCars).values(self._values(user_car_dto)))
+        self._after_commit(lambda: self._invalidate([user_car_dto.user_id]))
 
     def update(self, item_id: str, user_car_dto: UserCarDTO) -> None:
-        stmt = sa.select(tables.UserCars).where(tables.UserCars.car_id == item_id)
-
-        with self.sessionmaker() as session:
-            user_car = session.execute(stmt).scalar_one_or_none()
-            if user_car is None:
-                return
+        stmt = (
+            sa.update(tables.UserCars)
+            .where(tables.UserCars.car_id == item_id)
+            .values(self._update_values(user_car_dto))
+            .returning(tables.UserCars.user_id)
+        )
 
-            user_car.user_id = user_car_dto.user_id
-            user_car.make = user_car_dto.make
-            user_car.model = user_car_dto.model
-            user_car.year = user_car_dto.year
-            user_car.color = user_car_dto.color
+        with self._write_session() as session:
+            user_ids = list(session.scalars(stmt))
+        # Автомобиль мог перейти к другому пользователю: сбрасываются оба.
+        self._after_commit(lambda: self._invalidate([*user_ids, user_car_dto.user_id]))
 
     def delete(self, item_id: str) -> None:
-        stmt = sa.delete(tables.UserCars).where(tables.UserCars.car_id == item_id)
+        stmt = sa.delete(tables.UserCars).where(tables.UserCars.car_id == item_id).returning(tables.UserCars.user_id)
+
+        with self._write_session() as session:
+            user_ids = list(session.scalars(stmt))
+        self._after_commit(lambda: self._invalidate(user_ids))
+
+    def get_vehicles(self, user_id: str) -> tuple[Vehicle, ...]:
+        """
+        Возвращает автомобили пользователя в виде, пригодном для поиска по совместимости.
+
+        Результат кэшируется, включая пустой: у большинства пользователей автомобилей
+        нет, и поиск не должен каждый раз обращаться за ними к базе данных.
+
+        Args:
+            user_id (str): ID пользователя.
+
+        Returns:
+            tuple[Vehicle, ...]: Автомобили с нормализованными маркой и моделью, без повторов.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(user_id)
+            if cached is not None:
+                return cached
+
+        with self._read_session() as session:
+            rows = self._vehicles.execute(session, {"user_id": user_id}).all()
+        vehicles = tuple(
+            dict.fromkeys(
+                Vehicle(make=normalize_make(row.make), model=normalize_model(row.model), year=row.year) for row in rows
+            )
+        )
+        if self.cache is not None:
+            self.cache.set(user_id, vehicles)
+        return vehicles
 
-        with self.sessionmaker.begin() as session:
-            session.execute(stmt)
 
+cache_settings = CacheSettings()
 
-user_cars_repository = UserCarsRepository(sessionmaker=get_sessionmaker())
+user_cars_repository = UserCarsRepository(
+    cache=TTLCache(cache_settings.user_maxsize, cache_settings.user_ttl) if cache_settings.user_ttl > 0 else None,
+)
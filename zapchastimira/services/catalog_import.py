@@ -0,0 +1,494 @@
+import csv
+import dataclasses
+import io
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Sequence, TypeVar, cast
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import ReturningInsert
+
+from zapchastimira.common import tables
+from zapchastimira.common.db_utils import get_sessionmaker
+from zapchastimira.repositories.base import BaseRepository, RepositoryDTO
+from zapchastimira.repositories.compatibility import replace_compatibility
+from zapchastimira.repositories.part import PartDTO
+from zapchastimira.repositories.product import ProductDTO
+from zapchastimira.services.search_vector import (
+    category_path,
+    part_search_vector,
+    product_search_vector,
+    skip_search_vector_triggers,
+)
+
+FORMATS = ("csv", "jsonl", "xlsx")
+
+
+class CatalogImportError(Exception):
+    """Ошибка, из-за которой импорт не может быть выполнен (неизвестный формат, нет зависимости)."""
+
+
+@dataclass
+class RowError:
+    """
+    Строка файла, не прошедшая проверку.
+
+    Attributes:
+        line (int): Номер строки в файле (для CSV и XLSX с учетом заголовка).
+        message (str): Описание ошибки.
+    """
+
+    line: int
+    message: str
+
+
+@dataclass
+class ImportReport:
+    """
+    Итог импорта каталога.
+
+    Attributes:
+        rows_read (int): Количество прочитанных строк.
+        rows_imported (int): Количество добавленных или обновленных строк.
+        batches (int): Количество выполненных пакетов.
+        elapsed (float): Длительность импорта в секундах.
+        errors (list[RowError]): Строки, пропущенные из-за ошибок.
+    """
+
+    rows_read: int = 0
+    rows_imported: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    errors: list[RowError] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        Скорость импорта.
+
+        Returns:
+            float: Количество прочитанных строк в секунду.
+        """
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+
+def detect_format(path: str | Path) -> str:
+    """
+    Определяет формат файла по расширению.
+
+    Args:
+        path (str | Path): Путь к файлу.
+
+    Returns:
+        str: Один из `FORMATS`.
+    """
+    suffix = Path(path).suffix.lower().lstrip(".")
+    if suffix == "json":
+        suffix = "jsonl"
+    if suffix not in FORMATS:
+        raise CatalogImportError(f"Unsupported file format: {path}")
+    return suffix
+
+
+def _read_csv(path: Path, delimiter: str | None) -> Iterator[tuple[int, dict[str, Any]]]:
+    with path.open(encoding="utf-8-sig", newline="") as file:
+        if delimiter is None:
+            try:
+                delimiter = csv.Sniffer().sniff(file.read(64 * 1024), delimiters=",;\t").delimiter
+            except csv.Error as exc:
+                raise CatalogImportError(f"Could not detect the CSV delimiter of {path}, pass --delimiter") from exc
+            file.seek(0)
+        reader = csv.DictReader(file, delimiter=delimiter)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def _read_jsonl(path: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    with path.open(encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if line.strip():
+                yield line_number, json.loads(line)
+
+
+def _read_xlsx(path: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    try:
+        import openpyxl
+    except ImportError as exc:
+        raise CatalogImportError("Reading XLSX files requires openpyxl: pip install openpyxl") from exc
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else "" for name in next(rows, ())]
+        for line_number, values in enumerate(rows, start=2):
+            yield line_number, dict(zip(header, values, strict=False))
+    finally:
+        workbook.close()
+
+
+def read_rows(
+    path: str | Path, file_format: str | None = None, delimiter: str | None = None
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Построчно читает файл каталога, не загружая его в память целиком.
+
+    Args:
+        path (str | Path): Путь к файлу CSV, JSONL или XLSX.
+        file_format (str | None): Формат файла; по умолчанию определяется по расширению.
+        delimiter (str | None): Разделитель CSV; по умолчанию определяется автоматически.
+
+    Returns:
+        Iterator[tuple[int, dict[str, Any]]]: Номера строк и значения по названиям колонок.
+    """
+    path = Path(path)
+    file_format = file_format or detect_format(path)
+    if file_format == "csv":
+        return _read_csv(path, delimiter)
+    if file_format == "jsonl":
+        return _read_jsonl(path)
+    if file_format == "xlsx":
+        return _read_xlsx(path)
+    raise CatalogImportError(f"Unsupported file format: {file_format}")
+
+
+def _clean(value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def parse_price(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        price = float(value)
+    else:
+        price = float(str(value).replace(" ", "").replace("\xa0", "").replace(",", "."))
+    if price < 0:
+        raise ValueError("price must not be negative")
+    return price
+
+
+def parse_quantity(value: Any) -> int:
+    quantity = float(value) if isinstance(value, (int, float)) else float(str(value).replace(" ", ""))
+    if not quantity.is_integer() or quantity < 0:
+        raise ValueError("stock_quantity must be a non-negative integer")
+    return int(quantity)
+
+
+T = TypeVar("T", bound=RepositoryDTO)
+
+PARSERS: dict[str, Callable[[Any], Any]] = {"price": parse_price, "stock_quantity": parse_quantity}
+
+
+def validate_row(dto_class: type[T], row: dict[str, Any], fields: Iterable[str], required: Iterable[str] = ()) -> T:
+    """
+    Проверяет строку файла и преобразует ее в DTO.
+
+    Учитываются только колонки из `fields`; пустые строки считаются
+    отсутствующими значениями.
+
+    Args:
+        dto_class (type[T]): Класс DTO (`PartDTO` или `ProductDTO`).
+        row (dict[str, Any]): Значения по названиям колонок.
+        fields (Iterable[str]): Поля DTO, которые заполняются из файла.
+        required (Iterable[str]): Поля, обязательные для импорта помимо обязательных полей DTO.
+
+    Returns:
+        T: Заполненный DTO.
+
+    Raises:
+        ValueError: Если обязательное поле не заполнено или значение некорректно.
+    """
+    values: dict[str, Any] = {}
+    for name in fields:
+        value = _clean(row.get(name))
+        if value is None:
+            continue
+        parser = PARSERS.get(name, str)
+        try:
+            values[name] = parser(value)
+        except ValueError as exc:
+            raise ValueError(f"{name}: {exc}") from exc
+
+    missing = [
+        dto_field.name
+        for dto_field in dataclasses.fields(dto_class)
+        if dto_field.name not in values
+        and (dto_field.name in required or dto_field.default is dataclasses.MISSING and dto_field.init)
+    ]
+    if missing:
+        raise ValueError(f"missing required fields: {', '.join(missing)}")
+    return dto_class(**values)
+
+
+@dataclass(frozen=True)
+class CatalogImportSpec:
+    """
+    Описание таблицы, в которую импортируется каталог.
+
+    Attributes:
+        dto_class (type[PartDTO] | type[ProductDTO]): DTO строки файла.
+        table (type[tables.Part] | type[tables.Product]): ORM-модель таблицы.
+        category_table (type[tables.PartCategory] | type[tables.ProductCategory]): Таблица категорий строк.
+        key (str): Колонка, по которой существующие строки обновляются, а не добавляются.
+        id_column (str): Первичный ключ; если он не указан в файле, генерируется UUID. Если первичный ключ
+            совпадает с `key`, он должен быть в `required`, иначе повторный импорт добавит строки заново.
+        columns (dict[str, str]): Соответствие колонок таблицы полям DTO.
+        required (tuple[str, ...]): Поля, обязательные для импорта.
+        search_vector (Callable[..., sa.ColumnElement]): Построитель выражения поискового вектора.
+        vector_columns (tuple[str, ...]): Колонки, которые передаются в `search_vector` перед `category_path`.
+        returning (tuple[str, ...]): Колонки записанных строк, которые передаются в `on_write`.
+        on_write (Callable[[Session, Sequence[sa.Row]], None] | None): Вызывается в транзакции пакета
+            с записанными строками, например для обновления производных таблиц.
+    """
+
+    dto_class: type[PartDTO] | type[ProductDTO]
+    table: type[tables.Part] | type[tables.Product]
+    category_table: type[tables.PartCategory] | type[tables.ProductCategory]
+    key: str
+    id_column: str
+    columns: dict[str, str]
+    required: tuple[str, ...]
+    search_vector: Callable[..., sa.ColumnElement]
+    vector_columns: tuple[str, ...]
+    returning: tuple[str, ...] = ()
+    on_write: Callable[[Session, Sequence[sa.Row]], None] | None = None
+
+
+def _index_compatibility(session: Session, rows: Sequence[sa.Row]) -> None:
+    # Строки с существующим артикулом сохраняют прежний part_id, поэтому ID берутся из RETURNING.
+    replace_compatibility(session, {row.part_id: row.compatibility for row in rows})
+
+
+PARTS = CatalogImportSpec(
+    dto_class=PartDTO,
+    table=tables.Part,
+    category_table=tables.PartCategory,
+    key="part_number",
+    id_column="part_id",
+    columns={
+        "part_id": "part_id",
+        "part_number": "part_number",
+        "name": "name",
+        "description": "description",
+        "brand": "brand",
+        "compatibility": "compatibility",
+        "price": "price",
+        "stock_quantity": "stock_quantity",
+        "category_id": "category_id",
+        "image_url": "page_url",
+    },
+    required=("category_id",),
+    search_vector=part_search_vector,
+    vector_columns=("part_number", "name", "brand", "compatibility", "description"),
+    returning=("part_id", "compatibility"),
+    on_write=_index_compatibility,
+)
+
+PRODUCTS = CatalogImportSpec(
+    dto_class=ProductDTO,
+    table=tables.Product,
+    category_table=tables.ProductCategory,
+    key="product_id",
+    id_column="product_id",
+    columns={
+        "product_id": "product_id",
+        "name": "name",
+        "description": "description",
+        "price": "price",
+        "stock_quantity": "stock_quantity",
+        "category_id": "category_id",
+        "page_url": "page_url",
+    },
+    # У товаров нет естественного ключа: без product_id повторный импорт создавал бы дубликаты.
+    required=("product_id", "category_id"),
+    search_vector=product_search_vector,
+    vector_columns=("name", "description"),
+)
+
+
+class CatalogImporter:
+    """
+    Потоковый импорт запчастей или товаров из файла.
+
+    Строки проверяются и превращаются в DTO, затем пакетами по `batch_size`
+    загружаются через `COPY` во временную таблицу и переносятся в каталог одним
+    `INSERT ... SELECT ... ON CONFLICT DO UPDATE`. Поисковый вектор вычисляется
+    в том же запросе для всего пакета (с соединением с таблицами категорий),
+    а построчные триггеры на время транзакции отключаются (см.
+    `skip_search_vector_triggers`). Каждый пакет — отдельная транзакция,
+    поэтому ошибка в одном пакете не откатывает уже загруженные.
+
+    Attributes:
+        spec (CatalogImportSpec): Описание целевой таблицы.
+        sessionmaker (sessionmaker[Session]): Фабрика сессий SQLAlchemy.
+        batch_size (int): Количество строк в одном пакете.
+    """
+
+    def __init__(self, spec: CatalogImportSpec, sessionmaker: sessionmaker[Session], batch_size: int = 5000):
+        """
+        Инициализирует импорт.
+
+        Args:
+            spec (CatalogImportSpec): Описание целевой таблицы (`PARTS` или `PRODUCTS`).
+            sessionmaker (sessionmaker[Session]): Фабрика сессий SQLAlchemy.
+            batch_size (int): Количество строк в одном пакете.
+        """
+        self.spec = spec
+        self.sessionmaker = sessionmaker
+        self.batch_size = batch_size
+        self._categories: set[str] | None = None
+        self._staging, self._upsert = self._build_statements()
+
+    def _known_categories(self) -> set[str]:
+        if self._categories is None:
+            with self.sessionmaker() as session:
+                self._categories = set(session.scalars(sa.select(self.spec.category_table.category_id)))
+        return self._categories
+
+    def _validate(
+        self, rows: Iterable[tuple[int, dict[str, Any]]], report: ImportReport
+    ) -> Iterator[PartDTO | ProductDTO]:
+        categories = self._known_categories()
+        for line, row in rows:
+            report.rows_read += 1
+            try:
+                item = validate_row(self.spec.dto_class, row, self.spec.columns.values(), self.spec.required)
+            except ValueError as exc:
+                report.errors.append(RowError(line=line, message=str(exc)))
+                continue
+            if item.category_id not in categories:
+                report.errors.append(RowError(line=line, message=f"unknown category_id: {item.category_id}"))
+                continue
+            if getattr(item, self.spec.columns[self.spec.id_column]) is None:
+                setattr(item, self.spec.columns[self.spec.id_column], BaseRepository.generate_uuid())
+            yield item
+
+    def _build_statements(self) -> tuple[sa.Table, sa.Insert | ReturningInsert]:
+        spec = self.spec
+        table = cast(sa.Table, spec.table.__table__)
+        columns = list(spec.columns)
+
+        staging = sa.Table(
+            f"import_{table.name}",
+            sa.MetaData(),
+            *(sa.Column(name, table.c[name].type) for name in columns),
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DROP",
+        )
+        category = cast(sa.Table, spec.category_table.__table__)
+        base_category = cast(sa.Table, tables.Category.__table__)
+        path = category_path(category.c.name, base_category.c.name)
+        select = sa.select(
+            *(staging.c[name] for name in columns),
+            path,
+            spec.search_vector(*(staging.c[name] for name in spec.vector_columns), path),
+        ).select_from(
+            staging.outerjoin(category, category.c.category_id == staging.c.category_id).outerjoin(
+                base_category, base_category.c.category_id == category.c.base_categoty_id
+            )
+        )
+
+        stmt = insert(spec.table).from_select([*columns, "category_path", "search_vector"], select)
+        updated = [name for name in columns if name not in (spec.key, spec.id_column)]
+        upsert = stmt.on_conflict_do_update(
+            index_elements=[spec.key],
+            set_={
+                **{name: stmt.excluded[name] for name in updated},
+                "category_path": stmt.excluded.category_path,
+                "search_vector": stmt.excluded.search_vector,
+                "updated_at": sa.func.now(),
+            },
+        )
+        if spec.returning:
+            return staging, upsert.returning(*(table.c[name] for name in spec.returning))
+        return staging, upsert
+
+    def _copy(self, session: Session, items: Iterable[RepositoryDTO]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        fields = list(self.spec.columns.values())
+        for item in items:
+            writer.writerow([getattr(item, name) for name in fields])
+        buffer.seek(0)
+
+        columns = ", ".join(self._staging.c.keys())
+        cursor = session.connection().connection.cursor()
+        try:
+            # В формате CSV пустое значение без кавычек — NULL; пустые строки validate_row уже заменил на None.
+            cursor.copy_expert(f"COPY {self._staging.name} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+    def _write_batch(self, items: list[PartDTO | ProductDTO]) -> int:
+        # В одном INSERT ... ON CONFLICT строка не может обновляться дважды: оставляем последнее значение ключа.
+        unique = {getattr(item, self.spec.columns[self.spec.key]): item for item in items}.values()
+        with self.sessionmaker.begin() as session:
+            skip_search_vector_triggers(session)
+            self._staging.create(session.connection())
+            self._copy(session, unique)
+            result = cast(sa.CursorResult, session.execute(self._upsert))
+            if self.spec.on_write is None:
+                return result.rowcount
+            rows = result.all()
+            self.spec.on_write(session, rows)
+            return len(rows)
+
+    def run(
+        self,
+        rows: Iterable[tuple[int, dict[str, Any]]],
+        progress: Callable[[ImportReport], None] | None = None,
+    ) -> ImportReport:
+        """
+        Импортирует строки.
+
+        Args:
+            rows (Iterable[tuple[int, dict[str, Any]]]): Номера и значения строк (см. `read_rows`).
+            progress (Callable[[ImportReport], None] | None): Вызывается после каждого пакета.
+
+        Returns:
+            ImportReport: Итог импорта.
+        """
+        report = ImportReport()
+        started = time.perf_counter()
+        items = self._validate(rows, report)
+        while batch := list(itertools.islice(items, self.batch_size)):
+            report.rows_imported += self._write_batch(batch)
+            report.batches += 1
+            report.elapsed = time.perf_counter() - started
+            if progress is not None:
+                progress(report)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+
+def import_catalog(
+    path: str | Path,
+    kind: str,
+    batch_size: int = 5000,
+    file_format: str | None = None,
+    delimiter: str | None = None,
+    progress: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    """
+    Импортирует запчасти или товары из файла CSV, JSONL или XLSX.
+
+    Args:
+        path (str | Path): Путь к файлу.
+        kind (str): `parts` или `products`.
+        batch_size (int): Количество строк в одном пакете.
+        file_format (str | None): Формат файла; по умолчанию определяется по расширению.
+        delimiter (str | None): Разделитель CSV; по умолчанию определяется автоматически.
+        progress (Callable[[ImportReport], None] | None): Вызывается после каждого пакета.
+
+    Returns:
+        ImportReport: Итог импорта.
+    """
+    spec = {"parts": PARTS, "products": PRODUCTS}[kind]
+    importer = CatalogImporter(spec, sessionmaker=get_sessionmaker(), batch_size=batch_size)
+    return importer.run(read_rows(path, file_format, delimiter), progress=progress)
@@ -0,0 +1,232 @@
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Collection
+
+from zapchastimira.common.cache import VersionCounter
+from zapchastimira.common.settings import CatalogSettings
+from zapchastimira.repositories.category import (
+    BASE_CATEGORY,
+    CategoryRepository,
+    CategoryRow,
+    CategoryTreeState,
+    categories_version,
+    category_repository,
+)
+from zapchastimira.repositories.search import CategoryCursor, SearchHit, catalog_search_repository
+
+logger = logging.getLogger(__name__)
+
+catalog_settings = CatalogSettings()
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryNode:
+    """
+    Узел дерева категорий.
+
+    Attributes:
+        kind (str): `BASE_CATEGORY` у базовой категории, тип запчастей или товаров у вложенной.
+        category_id (str): Идентификатор категории.
+        name (str): Название категории.
+        parent_id (str | None): Базовая категория вложенной категории.
+        children (tuple[CategoryNode, ...]): Вложенные категории в порядке названий.
+    """
+
+    kind: str
+    category_id: str
+    name: str
+    parent_id: str | None = None
+    children: tuple["CategoryNode", ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class _Snapshot:
+    roots: tuple[CategoryNode, ...] = ()
+    nodes: dict[tuple[str, str], CategoryNode] = field(default_factory=dict)
+
+
+@dataclass
+class CategoryPage:
+    """
+    Одна страница запчастей или товаров категории.
+
+    Attributes:
+        items (list[SearchHit]): Элементы категории в порядке названий.
+        next_cursor (CategoryCursor | None): Позиция следующей страницы или None, если страниц больше нет.
+    """
+
+    items: list[SearchHit]
+    next_cursor: CategoryCursor | None = None
+
+
+class CategoryTree:
+    """
+    Дерево категорий каталога в памяти процесса.
+
+    Дерево загружается из базы один раз, после чего навигация по нему не обращается
+    к базе данных. `refresh` одним запросом сверяет сводку таблиц категорий
+    (`CategoryRepository.get_tree_state`) с известной и, если что-то изменилось,
+    дочитывает только строки с `updated_at` новее последней известной; полная
+    перезагрузка нужна, только если категории удалялись или менялись в обход
+    `updated_at`. Запись через `CategoryRepository` в этом процессе обновляет
+    дерево при следующем обращении.
+
+    Потокобезопасно: читатели получают неизменяемый снимок, который заменяется целиком;
+    пока другой поток обновляет уже загруженное дерево, читатели получают прежний снимок.
+    """
+
+    def __init__(self, repository: CategoryRepository):
+        """
+        Инициализирует пустое дерево. Загрузка выполняется при первом обращении.
+
+        Args:
+            repository (CategoryRepository): Репозиторий категорий.
+        """
+        self._repository = repository
+        self._rows: dict[tuple[str, str], CategoryRow] = {}
+        self._state: CategoryTreeState | None = None
+        self._seen_version: int | None = None
+        self._snapshot = _Snapshot()
+        self._version = VersionCounter()
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """
+        Версия дерева: увеличивается при каждом изменении набора или названий категорий.
+
+        Returns:
+            int: Значение счетчика.
+        """
+        self._current()
+        return self._version.value
+
+    def roots(self) -> tuple[CategoryNode, ...]:
+        """
+        Возвращает базовые категории.
+
+        Returns:
+            tuple[CategoryNode, ...]: Базовые категории в порядке названий.
+        """
+        return self._current().roots
+
+    def get(self, kind: str, category_id: str) -> CategoryNode | None:
+        """
+        Находит категорию.
+
+        Args:
+            kind (str): Тип узла (`BASE_CATEGORY`, тип запчастей или товаров).
+            category_id (str): Идентификатор категории.
+
+        Returns:
+            CategoryNode | None: Категория или None, если ее нет.
+        """
+        return self._current().nodes.get((kind, category_id))
+
+    def refresh(self) -> None:
+        """
+        Сверяет дерево с базой данных и применяет изменения.
+        """
+        with self._lock:
+            self._refresh()
+
+    def _current(self) -> _Snapshot:
+        if self._seen_version != categories_version.value:
+            # Обновление обращается к базе данных: ждем его, только пока дерево не загружено.
+            if self._lock.acquire(blocking=self._state is None):
+                try:
+                    self._refresh()
+                finally:
+                    self._lock.release()
+        return self._snapshot
+
+    def _refresh(self) -> None:
+        seen_version = categories_version.value
+        state = self._repository.get_tree_state()
+        known = self._state
+        if known is not None and state.fingerprint == known.fingerprint:
+            self._seen_version = seen_version
+            return
+
+        rows = None
+        if known is not None and state.count >= known.count:
+            rows = dict(self._rows)
+            for row in self._repository.get_tree_rows(since=known.updated_at):
+                rows[(row.kind, row.category_id)] = row
+            if self._fingerprint(rows.values()) != state.fingerprint:
+                # Категории удалены или изменены без обновления updated_at.
+                logger.info("Category tree changed outside of updated_at, reloading")
+                rows = None
+        if rows is None:
+            rows = {(row.kind, row.category_id): row for row in self._repository.get_tree_rows()}
+
+        self._rows = rows
+        self._state = CategoryTreeState(
+            count=len(rows),
+            updated_at=max((row.updated_at for row in rows.values()), default=None),
+            fingerprint=self._fingerprint(rows.values()),
+        )
+        self._snapshot = self._build(rows.values())
+        self._seen_version = seen_version
+        self._version.bump()
+
+    @staticmethod
+    def _fingerprint(rows: Collection[CategoryRow]) -> str | None:
+        # Повторяет отпечаток `CategoryRepository.get_tree_state`: concat_ws пропускает NULL,
+        # строки упорядочены побайтно (COLLATE "C").
+        if not rows:
+            return None
+        lines = sorted(
+            "|".join(value for value in (row.kind, row.category_id, row.parent_id, row.name) if value is not None)
+            for row in rows
+        )
+        return hashlib.md5("\n".join(lines).encode()).hexdigest()
+
+    @staticmethod
+    def _build(rows: Collection[CategoryRow]) -> _Snapshot:
+        children: dict[str, list[CategoryNode]] = {}
+        for row in rows:
+            if row.kind != BASE_CATEGORY:
+                node = CategoryNode(kind=row.kind, category_id=row.category_id, name=row.name, parent_id=row.parent_id)
+                children.setdefault(row.parent_id, []).append(node)
+
+        nodes: dict[tuple[str, str], CategoryNode] = {}
+        roots = []
+        for row in rows:
+            if row.kind == BASE_CATEGORY:
+                node = CategoryNode(
+                    kind=row.kind,
+                    category_id=row.category_id,
+                    name=row.name,
+                    children=tuple(sorted(children.get(row.category_id, ()), key=lambda child: child.name)),
+                )
+                roots.append(node)
+                nodes[(node.kind, node.category_id)] = node
+                for child in node.children:
+                    nodes[(child.kind, child.category_id)] = child
+        return _Snapshot(roots=tuple(sorted(roots, key=lambda root: root.name)), nodes=nodes)
+
+
+def list_category(node: CategoryNode, cursor: CategoryCursor | None = None) -> CategoryPage:
+    """
+    Возвращает страницу запчастей или товаров категории одним запросом.
+
+    Args:
+        node (CategoryNode): Категория запчастей или товаров.
+        cursor (CategoryCursor | None): Позиция, с которой продолжить; None — первая страница.
+
+    Returns:
+        CategoryPage: Элементы страницы и позиция следующей страницы.
+    """
+    limit = catalog_settings.page_size
+    # Лишняя строка показывает, есть ли следующая страница, без отдельного запроса.
+    hits = catalog_search_repository.list_category(node.kind, node.category_id, limit + 1, cursor)
+    if len(hits) <= limit:
+        return CategoryPage(items=hits)
+    items = hits[:limit]
+    return CategoryPage(items=items, next_cursor=CategoryCursor(name=items[-1].name, item_id=items[-1].item_id))
+
+
+category_tree = CategoryTree(category_repository)
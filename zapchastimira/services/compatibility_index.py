@@ -0,0 +1,61 @@
+import time
+from typing import Callable
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session, sessionmaker
+
+from zapchastimira.common import tables
+from zapchastimira.common.db_utils import get_sessionmaker
+from zapchastimira.repositories.compatibility import replace_compatibility
+from zapchastimira.services.search_vector import RebuildReport
+
+
+def rebuild_compatibility_index(
+    sessionmaker: sessionmaker[Session] | None = None,
+    batch_size: int = 5000,
+    pause: float = 0.0,
+    progress: Callable[[RebuildReport], None] | None = None,
+) -> RebuildReport:
+    """
+    Заново строит индекс совместимости `part_compatibility` из колонки `parts.compatibility`.
+
+    Запчасти перебираются по первичному ключу (keyset), записи индекса каждого
+    пакета заменяются в отдельной транзакции. Нужен после первого развертывания
+    и после изменения правил разбора (`parse_compatibility`); запись через
+    `PartRepository` и импорт каталога обновляют индекс сами.
+
+    Args:
+        sessionmaker (sessionmaker[Session] | None): Фабрика сессий; по умолчанию общая.
+        batch_size (int): Количество запчастей в одном пакете.
+        pause (float): Пауза между пакетами в секундах, чтобы снизить нагрузку на базу.
+        progress (Callable[[RebuildReport], None] | None): Вызывается после каждого пакета.
+
+    Returns:
+        RebuildReport: Итог пересборки; `rows` — количество обработанных запчастей.
+    """
+    sessionmaker = sessionmaker or get_sessionmaker()
+    key = tables.Part.part_id
+    report = RebuildReport(table=tables.PartCompatibility.__tablename__)
+    started = time.perf_counter()
+
+    last_key = None
+    while True:
+        stmt = sa.select(key, tables.Part.compatibility).order_by(key).limit(batch_size)
+        if last_key is not None:
+            stmt = stmt.where(key > last_key)
+        with sessionmaker.begin() as session:
+            batch = session.execute(stmt).all()
+            if not batch:
+                break
+            replace_compatibility(session, dict(batch))
+        last_key = batch[-1].part_id
+        report.rows += len(batch)
+        report.batches += 1
+        report.elapsed = time.perf_counter() - started
+        if progress is not None:
+            progress(report)
+        if pause:
+            time.sleep(pause)
+
+    report.elapsed = time.perf_counter() - started
+    return report
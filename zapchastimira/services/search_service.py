@@ -1,26 +1,163 @@
-from typing import List, Union
+from dataclasses import dataclass
+from typing import List
 
-from zapchastimira.repositories.part import PartDTO, part_repository
-from zapchastimira.repositories.product import ProductDTO, product_repository
+from zapchastimira.common.cache import CacheStats, TTLCache
+from zapchastimira.common.compatibility import Vehicle
+from zapchastimira.common.search_query import ParsedQuery, looks_like_part_number, normalize_part_number, parse_query
+from zapchastimira.common.settings import CacheSettings, SearchSettings
+from zapchastimira.repositories.search import CatalogCursor, SearchHit, catalog_search_repository, catalog_version
+from zapchastimira.repositories.user_cars import user_cars_repository
 
+search_settings = SearchSettings()
+cache_settings = CacheSettings()
 
-def search_by_products(query: str, user_id: str) -> List[Union[PartDTO, ProductDTO]]:
+PART_NUMBER_SEARCH = "part_number"
+
+# Ключ: способ поиска (конфигурация полнотекстового поиска или `part_number`), текст tsquery
+# или нормализованный артикул, курсор, размер выборки, автомобили пользователя и версия каталога.
+search_cache: TTLCache[tuple[str, str, CatalogCursor | None, int, tuple[Vehicle, ...], int], list[SearchHit]] = (
+    TTLCache(maxsize=cache_settings.search_maxsize, ttl=cache_settings.search_ttl)
+)
+
+
+@dataclass
+class SearchPage:
+    """
+    Одна страница результатов поиска.
+
+    Attributes:
+        items (List[SearchHit]): Запчасти и товары в порядке убывания релевантности.
+        next_cursor (CatalogCursor | None): Позиция для запроса следующей страницы или None, если страниц больше нет.
+    """
+
+    items: List[SearchHit]
+    next_cursor: CatalogCursor | None = None
+
+
+def normalize_query(query: str) -> ParsedQuery:
+    """
+    Разбирает запрос с настройками поиска приложения.
+
+    Одинаковые по смыслу запросы («Колодки  Bosch!» и «колодки bosch»)
+    дают одинаковый `tsquery`, поэтому попадают в одну запись кэша.
+
+    Args:
+        query (str): Запрос пользователя.
+
+    Returns:
+        ParsedQuery: Разобранный запрос.
+    """
+    return parse_query(
+        query,
+        config=search_settings.ts_config,
+        prefix_match=search_settings.prefix_match,
+        prefix_min_length=search_settings.prefix_min_length,
+        max_terms=search_settings.max_terms,
+    )
+
+
+def search_cache_stats() -> CacheStats:
+    """
+    Возвращает статистику кэша результатов поиска.
+
+    Returns:
+        CacheStats: Попадания, промахи, вытеснения и размер кэша.
+    """
+    return search_cache.stats()
+
+
+def user_vehicles(user_id: str) -> tuple[Vehicle, ...]:
+    """
+    Возвращает автомобили пользователя, которые учитываются в поиске.
+
+    Args:
+        user_id (str): ID пользователя.
+
+    Returns:
+        tuple[Vehicle, ...]: Автомобили пользователя; пустой кортеж, если учет отключен (`SEARCH_VEHICLE_MODE=off`).
+    """
+    if search_settings.vehicle_mode == "off":
+        return ()
+    return user_cars_repository.get_vehicles(user_id)
+
+
+def search_by_part_number(query: str, limit: int) -> list[SearchHit]:
+    """
+    Ищет запчасти по артикулу, минуя полнотекстовый поиск.
+
+    Args:
+        query (str): Запрос, похожий на артикул (см. `looks_like_part_number`).
+        limit (int): Максимальное количество результатов.
+
+    Returns:
+        list[SearchHit]: Запчасти с точным, префиксным или нечетким совпадением артикула.
+    """
+    part_number = normalize_part_number(query)
+    key = (PART_NUMBER_SEARCH, part_number, None, limit, (), catalog_version.value)
+    hits = search_cache.get(key)
+    if hits is None:
+        hits = catalog_search_repository.find_by_part_number(
+            part_number, limit, min_similarity=search_settings.part_number_similarity or None
+        )
+        search_cache.set(key, hits)
+    return hits
+
+
+def search_by_products(
+    query: str,
+    user_id: str,
+    limit: int | None = None,
+    cursor: CatalogCursor | None = None,
+) -> SearchPage:
     """
     Ищет товары и запчасти, соответствующие запросу пользователя.
 
-    Эта функция выполняет поиск как по запчастям, так и по товарам, используя
-    соответствующие репозитории, и возвращает объединенный список результатов.
+    Запрос, похожий на артикул, сначала ищется по нормализованному артикулу
+    (`search_by_part_number`); если ничего не найдено, выполняется обычный поиск.
+    Поиск по обоим каталогам выполняется одним запросом: запчасти и товары
+    ранжируются вместе (`ts_rank_cd`), и на страницу попадают лучшие `limit`
+    результатов независимо от каталога. Если у пользователя есть автомобили,
+    запчасти, подходящие к ним по индексу совместимости, поднимаются в выдаче
+    или остаются единственными запчастями в ней (см. `SearchSettings.vehicle_mode`).
+    Страницы кэшируются по нормализованному запросу (см. `normalize_query`) и
+    автомобилям пользователя, поэтому пользователи без автомобилей и с одинаковыми
+    автомобилями делят записи кэша; запрос без слов не отправляется в базу.
+    Запись в каталог через репозитории увеличивает `catalog_version`, и
+    закэшированные страницы перестают использоваться. Изменения, сделанные
+    другими процессами, становятся видны не позже чем через `CACHE_SEARCH_TTL`.
 
     Args:
         query (str): Запрос для поиска (например, часть названия или артикул).
-        user_id (str): Идентификатор пользователя (может использоваться в будущем для
-                       персонализации результатов или логгирования).
+        user_id (str): ID пользователя, по автомобилям которого уточняется выдача.
+        limit (int | None): Размер страницы; по умолчанию `SearchSettings.page_size`.
+        cursor (CatalogCursor | None): Позиция, после которой начинается страница; None — первая страница.
 
     Returns:
-        List[Union[PartDTO, ProductDTO]]: Список DTO (Data Transfer Object)
-        запчастей и товаров, соответствующих поисковому запросу.
+        SearchPage: Страница результатов и курсор следующей страницы.
     """
-    result_by_parts, _ = part_repository.get_all(query)
-    result_by_products, _ = product_repository.get_all(query)
+    limit = limit or search_settings.page_size
+    if cursor is None and looks_like_part_number(query, search_settings.part_number_min_length):
+        hits = search_by_part_number(query, limit)
+        if hits:
+            return SearchPage(items=hits)
+
+    normalized = normalize_query(query)
+    if normalized.is_empty:
+        return SearchPage(items=[])
+
+    vehicles = user_vehicles(user_id)
+    key = (normalized.config, normalized.tsquery, cursor, limit + 1, vehicles, catalog_version.value)
+    hits = search_cache.get(key)
+    if hits is None:
+        boost = search_settings.vehicle_boost if search_settings.vehicle_mode == "boost" else None
+        hits = catalog_search_repository.search(normalized, limit + 1, cursor, vehicles=vehicles, vehicle_boost=boost)
+        search_cache.set(key, hits)
+
+    if len(hits) <= limit:
+        return SearchPage(items=hits)
 
-    return result_by_parts + result_by_products
+    last = hits[limit - 1]
+    return SearchPage(
+        items=hits[:limit],
+        next_cursor=CatalogCursor(rank=last.rank, kind=last.kind, item_id=last.item_id),
+    )
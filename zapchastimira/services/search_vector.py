@@ -0,0 +1,193 @@
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session, sessionmaker
+
+from zapchastimira.common import tables
+from zapchastimira.common.db_utils import get_sessionmaker
+
+# Если параметр включен в транзакции, триггеры не пересчитывают search_vector:
+# вектор записывает вызывающий код теми же SQL-функциями, что и триггеры.
+SKIP_SEARCH_VECTOR_SETTING = "zapchastimira.skip_search_vector"
+
+
+def category_path(
+    category_name: sa.ColumnElement[str | None], base_category_name: sa.ColumnElement[str | None]
+) -> sa.ColumnElement[str]:
+    """
+    Строит выражение колонки `category_path`: название категории и базовой категории.
+
+    Args:
+        category_name (sa.ColumnElement[str | None]): Название категории.
+        base_category_name (sa.ColumnElement[str | None]): Название базовой категории.
+
+    Returns:
+        sa.ColumnElement[str]: Выражение, совпадающее с SQL-функциями `*_category_path`.
+    """
+    return sa.func.concat_ws(" ", category_name, base_category_name)
+
+
+def part_search_vector(
+    part_number: sa.ColumnElement[str],
+    name: sa.ColumnElement[str],
+    brand: sa.ColumnElement[str],
+    compatibility: sa.ColumnElement[str | None],
+    description: sa.ColumnElement[str | None],
+    category_path: sa.ColumnElement[str | None],
+) -> sa.ColumnElement:
+    """
+    Строит выражение поискового вектора запчасти.
+
+    Вызывает SQL-функцию `part_search_vector`, которую использует и триггер
+    `parts_search_vector_update`: артикул и название получают вес A, бренд — B,
+    применимость и категория — C, описание — D.
+
+    Args:
+        part_number (sa.ColumnElement[str]): Артикул.
+        name (sa.ColumnElement[str]): Название запчасти.
+        brand (sa.ColumnElement[str]): Бренд.
+        compatibility (sa.ColumnElement[str | None]): Применимость.
+        description (sa.ColumnElement[str | None]): Описание запчасти.
+        category_path (sa.ColumnElement[str | None]): Названия категории и базовой категории.
+
+    Returns:
+        sa.ColumnElement: Выражение для колонки `parts.search_vector`.
+    """
+    return sa.func.part_search_vector(part_number, name, brand, compatibility, description, category_path)
+
+
+def product_search_vector(
+    name: sa.ColumnElement[str],
+    description: sa.ColumnElement[str | None],
+    category_path: sa.ColumnElement[str | None],
+) -> sa.ColumnElement:
+    """
+    Строит выражение поискового вектора товара.
+
+    Вызывает SQL-функцию `product_search_vector`, которую использует и триггер
+    `products_search_vector_update`: название получает вес A, категория — C, описание — D.
+
+    Args:
+        name (sa.ColumnElement[str]): Название товара.
+        description (sa.ColumnElement[str | None]): Описание товара.
+        category_path (sa.ColumnElement[str | None]): Названия категории и базовой категории.
+
+    Returns:
+        sa.ColumnElement: Выражение для колонки `products.search_vector`.
+    """
+    return sa.func.product_search_vector(name, description, category_path)
+
+
+def skip_search_vector_triggers(session: Session) -> None:
+    """
+    Отключает пересчет search_vector триггерами до конца текущей транзакции.
+
+    Вызывающий код обязан сам записать вектор для всех затронутых строк.
+
+    Args:
+        session (Session): Сессия с открытой транзакцией.
+    """
+    session.execute(sa.select(sa.func.set_config(SKIP_SEARCH_VECTOR_SETTING, "on", True)))
+
+
+@dataclass
+class RebuildReport:
+    """
+    Итог пересборки поисковых векторов.
+
+    Attributes:
+        table (str): Имя таблицы.
+        rows (int): Количество пересобранных строк.
+        batches (int): Количество пакетов (транзакций).
+        elapsed (float): Длительность в секундах.
+    """
+
+    table: str
+    rows: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+
+
+def _rebuild_statement(table: type[tables.Base], category_table: type[tables.Base], ids: list[str]) -> sa.Update:
+    category = category_table.__table__
+    base_category = tables.Category.__table__
+    paths = (
+        sa.select(category.c.category_id, category_path(category.c.name, base_category.c.name).label("path"))
+        .select_from(category.outerjoin(base_category, base_category.c.category_id == category.c.base_categoty_id))
+        .cte("paths")
+    )
+
+    target = table.__table__
+    columns = target.c
+    if table is tables.Part:
+        vector = part_search_vector(
+            columns.part_number, columns.name, columns.brand, columns.compatibility, columns.description, paths.c.path
+        )
+    else:
+        vector = product_search_vector(columns.name, columns.description, paths.c.path)
+    key = target.primary_key.columns[0]
+
+    return (
+        sa.update(target)
+        .values(category_path=paths.c.path, search_vector=vector)
+        .where(key == sa.any_(sa.literal(ids, sa.ARRAY(sa.String))), columns.category_id == paths.c.category_id)
+    )
+
+
+def rebuild_search_vectors(
+    table: str,
+    sessionmaker: sessionmaker[Session] | None = None,
+    batch_size: int = 5000,
+    pause: float = 0.0,
+    progress: Callable[[RebuildReport], None] | None = None,
+) -> RebuildReport:
+    """
+    Пересобирает `category_path` и `search_vector` всех строк таблицы пакетами.
+
+    Строки перебираются по первичному ключу (keyset), каждый пакет обновляется
+    одним `UPDATE ... FROM` (названия категорий берутся из CTE) в отдельной
+    транзакции, поэтому блокируются только строки текущего пакета, а таблица
+    остается доступной для чтения и записи.
+
+    Args:
+        table (str): `parts` или `products`.
+        sessionmaker (sessionmaker[Session] | None): Фабрика сессий; по умолчанию общая.
+        batch_size (int): Количество строк в одном пакете.
+        pause (float): Пауза между пакетами в секундах, чтобы снизить нагрузку на базу.
+        progress (Callable[[RebuildReport], None] | None): Вызывается после каждого пакета.
+
+    Returns:
+        RebuildReport: Итог пересборки.
+    """
+    model, category_model = {
+        "parts": (tables.Part, tables.PartCategory),
+        "products": (tables.Product, tables.ProductCategory),
+    }[table]
+    sessionmaker = sessionmaker or get_sessionmaker()
+    key = model.__table__.primary_key.columns[0]
+    report = RebuildReport(table=table)
+    started = time.perf_counter()
+
+    last_key = None
+    while True:
+        ids = sa.select(key).order_by(key).limit(batch_size)
+        if last_key is not None:
+            ids = ids.where(key > last_key)
+        with sessionmaker.begin() as session:
+            batch = list(session.scalars(ids))
+            if not batch:
+                break
+            skip_search_vector_triggers(session)
+            report.rows += session.execute(_rebuild_statement(model, category_model, batch)).rowcount
+        last_key = batch[-1]
+        report.batches += 1
+        report.elapsed = time.perf_counter() - started
+        if progress is not None:
+            progress(report)
+        if pause:
+            time.sleep(pause)
+
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,229 @@
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session, sessionmaker
+
+from zapchastimira.common import tables
+from zapchastimira.common.db_utils import get_sessionmaker
+from zapchastimira.services.catalog_import import RowError, parse_price, parse_quantity, read_rows
+from zapchastimira.services.search_vector import skip_search_vector_triggers
+
+
+@dataclass(frozen=True)
+class StockChange:
+    """
+    Изменение цены и остатка запчасти из складской системы.
+
+    Attributes:
+        part_number (str): Артикул запчасти.
+        price (float | None): Новая цена; None — цена не меняется.
+        stock_quantity (int | None): Новый остаток; None — остаток не меняется.
+    """
+
+    part_number: str
+    price: float | None = None
+    stock_quantity: int | None = None
+
+
+@dataclass
+class SyncReport:
+    """
+    Итог синхронизации цен и остатков.
+
+    Attributes:
+        received (int): Количество полученных изменений.
+        updated (int): Количество запчастей, у которых изменились цена или остаток.
+        unchanged (int): Количество изменений, совпавших с текущими значениями.
+        unknown (list[str]): Артикулы, которых нет в каталоге.
+        errors (list[RowError]): Строки ленты, не прошедшие проверку.
+        elapsed (float): Длительность синхронизации в секундах.
+    """
+
+    received: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    unknown: list[str] = field(default_factory=list)
+    errors: list[RowError] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        Скорость обработки ленты.
+
+        Returns:
+            float: Количество полученных изменений в секунду.
+        """
+        return self.received / self.elapsed if self.elapsed else 0.0
+
+
+def parse_stock_change(row: dict[str, Any]) -> StockChange:
+    """
+    Проверяет строку ленты изменений.
+
+    Args:
+        row (dict[str, Any]): Значения `part_number`, `price` и `stock_quantity`.
+
+    Returns:
+        StockChange: Изменение цены и остатка.
+
+    Raises:
+        ValueError: Если артикул не указан, значения некорректны или не указано ни одно из них.
+    """
+    part_number = str(row.get("part_number") or "").strip()
+    if not part_number:
+        raise ValueError("missing required fields: part_number")
+
+    values: dict[str, Any] = {}
+    for name, parser in (("price", parse_price), ("stock_quantity", parse_quantity)):
+        value = row.get(name)
+        if value is None or isinstance(value, str) and not value.strip():
+            continue
+        try:
+            values[name] = parser(value)
+        except ValueError as exc:
+            raise ValueError(f"{name}: {exc}") from exc
+    if not values:
+        raise ValueError("neither price nor stock_quantity is set")
+    return StockChange(part_number=part_number, **values)
+
+
+class StockSync:
+    """
+    Применяет ленту изменений цен и остатков только к действительно изменившимся запчастям.
+
+    Изменения обрабатываются пакетами: текущие значения пакета читаются одним
+    запросом по `part_number = ANY(...)`, отличия вычисляются в памяти, и
+    изменившиеся строки записываются одним `UPDATE ... FROM (VALUES ...)`.
+    Обновляются только `price`, `stock_quantity` и `updated_at`, поэтому
+    поисковый вектор не пересчитывается, а PostgreSQL может выполнить HOT-обновление
+    без записи в индексы.
+
+    Attributes:
+        sessionmaker (sessionmaker[Session]): Фабрика сессий SQLAlchemy.
+        batch_size (int): Количество изменений в одном пакете.
+    """
+
+    def __init__(self, sessionmaker: sessionmaker[Session], batch_size: int = 2000):
+        """
+        Инициализирует синхронизацию.
+
+        Args:
+            sessionmaker (sessionmaker[Session]): Фабрика сессий SQLAlchemy.
+            batch_size (int): Количество изменений в одном пакете.
+        """
+        self.sessionmaker = sessionmaker
+        self.batch_size = batch_size
+
+    def _apply_batch(self, changes: list[StockChange], report: SyncReport) -> None:
+        # Из нескольких изменений одного артикула в пакете действует последнее.
+        latest = {change.part_number: change for change in changes}
+        current_stmt = sa.select(tables.Part.part_number, tables.Part.price, tables.Part.stock_quantity).where(
+            tables.Part.part_number == sa.any_(sa.literal(list(latest), sa.ARRAY(sa.String)))
+        )
+
+        with self.sessionmaker.begin() as session:
+            current = {row.part_number: (row.price, row.stock_quantity) for row in session.execute(current_stmt)}
+
+            updates = []
+            for part_number, change in latest.items():
+                if part_number not in current:
+                    report.unknown.append(part_number)
+                    continue
+                price, stock_quantity = current[part_number]
+                new_price = price if change.price is None else change.price
+                new_stock_quantity = stock_quantity if change.stock_quantity is None else change.stock_quantity
+                if (new_price, new_stock_quantity) == (price, stock_quantity):
+                    report.unchanged += 1
+                else:
+                    updates.append((part_number, new_price, new_stock_quantity))
+
+            if not updates:
+                return
+
+            skip_search_vector_triggers(session)
+            values = sa.values(
+                sa.column("part_number", sa.String),
+                sa.column("price", sa.Float),
+                sa.column("stock_quantity", sa.Integer),
+                name="changes",
+            ).data(updates)
+            part = tables.Part.__table__
+            stmt = (
+                sa.update(part)
+                .values(price=values.c.price, stock_quantity=values.c.stock_quantity, updated_at=sa.func.now())
+                .where(
+                    part.c.part_number == values.c.part_number,
+                    # Значение могло измениться после чтения: повторная запись тех же цифр не нужна.
+                    sa.or_(
+                        part.c.price.is_distinct_from(values.c.price),
+                        part.c.stock_quantity.is_distinct_from(values.c.stock_quantity),
+                    ),
+                )
+            )
+            report.updated += session.execute(stmt).rowcount
+
+    def apply(
+        self,
+        changes: Iterable[StockChange],
+        progress: Callable[[SyncReport], None] | None = None,
+        report: SyncReport | None = None,
+    ) -> SyncReport:
+        """
+        Применяет изменения цен и остатков.
+
+        Args:
+            changes (Iterable[StockChange]): Лента изменений.
+            progress (Callable[[SyncReport], None] | None): Вызывается после каждого пакета.
+            report (SyncReport | None): Отчет, в который добавляются результаты (например, с ошибками разбора).
+
+        Returns:
+            SyncReport: Итог синхронизации.
+        """
+        report = report or SyncReport()
+        started = time.perf_counter()
+        changes = iter(changes)
+        while batch := list(itertools.islice(changes, self.batch_size)):
+            report.received += len(batch)
+            self._apply_batch(batch, report)
+            report.elapsed = time.perf_counter() - started
+            if progress is not None:
+                progress(report)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+
+def _parse_feed(rows: Iterable[tuple[int, dict[str, Any]]], report: SyncReport) -> Iterator[StockChange]:
+    for line, row in rows:
+        try:
+            yield parse_stock_change(row)
+        except ValueError as exc:
+            report.errors.append(RowError(line=line, message=str(exc)))
+
+
+def sync_stock(
+    path: str,
+    batch_size: int = 2000,
+    file_format: str | None = None,
+    delimiter: str | None = None,
+    progress: Callable[[SyncReport], None] | None = None,
+) -> SyncReport:
+    """
+    Применяет ленту изменений цен и остатков из файла CSV, JSONL или XLSX.
+
+    Args:
+        path (str): Путь к файлу с колонками `part_number`, `price`, `stock_quantity`.
+        batch_size (int): Количество изменений в одном пакете.
+        file_format (str | None): Формат файла; по умолчанию определяется по расширению.
+        delimiter (str | None): Разделитель CSV; по умолчанию определяется автоматически.
+        progress (Callable[[SyncReport], None] | None): Вызывается после каждого пакета.
+
+    Returns:
+        SyncReport: Итог синхронизации.
+    """
+    report = SyncReport()
+    changes = _parse_feed(read_rows(path, file_format, delimiter), report)
+    return StockSync(sessionmaker=get_sessionmaker(), batch_size=batch_size).apply(changes, progress, report)
@@ -0,0 +1,178 @@
+import argparse
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import sqlalchemy as sa
+from sqlalchemy.orm import sessionmaker as make_sessionmaker
+
+from zapchastimira.common.compatibility import Vehicle
+from zapchastimira.common.db_utils import PREPARED_STATEMENTS_OPTION, get_engine
+from zapchastimira.common.search_query import normalize_part_number
+from zapchastimira.repositories.contact import ContactRepository
+from zapchastimira.repositories.part import PartRepository
+from zapchastimira.repositories.product import ProductRepository
+from zapchastimira.repositories.search import CatalogSearchRepository
+from zapchastimira.repositories.user import UserRepository
+from zapchastimira.repositories.user_cars import UserCarsRepository
+from zapchastimira.services.search_service import normalize_query
+
+# Выборки всей таблицы, для которых последовательное чтение ожидаемо.
+FULL_SCAN_EXPECTED = {"ContactRepository.get_all", "ContactRepository.get_fingerprint"}
+
+
+@dataclass
+class QueryPlan:
+    """
+    План выполнения одного запроса репозитория.
+
+    Attributes:
+        label (str): Метод репозитория, который выполнил запрос.
+        statement (str): SQL-запрос.
+        plan (list[str]): Строки плана `EXPLAIN`.
+    """
+
+    label: str
+    statement: str
+    plan: list[str] = field(default_factory=list)
+
+    @property
+    def seq_scans(self) -> list[str]:
+        """
+        Узлы плана с последовательным чтением таблицы.
+
+        Returns:
+            list[str]: Строки плана с `Seq Scan`.
+        """
+        return [line.strip() for line in self.plan if "Seq Scan on" in line]
+
+
+def repository_calls(args: argparse.Namespace) -> list[tuple[str, Callable[[], Any]]]:
+    """
+    Составляет список вызовов репозиториев, планы которых нужно проверить.
+
+    Репозитории создаются без кэшей, чтобы каждый вызов дошел до базы данных, и
+    без подготовленных запросов, чтобы перехватывался их SQL, а не `EXECUTE`.
+
+    Args:
+        args (argparse.Namespace): Аргументы командной строки с примерами параметров.
+
+    Returns:
+        list[tuple[str, Callable[[], Any]]]: Пары (название, вызов).
+    """
+    engine = get_engine().execution_options(**{PREPARED_STATEMENTS_OPTION: False})
+    sessionmaker = make_sessionmaker(bind=engine, expire_on_commit=False)
+    parts = PartRepository(sessionmaker=sessionmaker)
+    products = ProductRepository(sessionmaker=sessionmaker)
+    users = UserRepository(sessionmaker=sessionmaker)
+    contacts = ContactRepository(sessionmaker=sessionmaker)
+    catalog = CatalogSearchRepository(sessionmaker=sessionmaker)
+    user_cars = UserCarsRepository(sessionmaker=sessionmaker)
+    vehicles = (Vehicle(make="toyota", model="camry", year=2015),)
+
+    return [
+        ("PartRepository.get_by_id", lambda: parts.get_by_id(args.item_id)),
+        ("PartRepository.get_all", lambda: parts.get_all(args.query)),
+        ("ProductRepository.get_by_id", lambda: products.get_by_id(args.item_id)),
+        ("ProductRepository.get_all", lambda: products.get_all(args.query)),
+        ("CatalogSearchRepository.search", lambda: catalog.search(normalize_query(args.query), limit=6)),
+        (
+            "CatalogSearchRepository.search (vehicle boost)",
+            lambda: catalog.search(normalize_query(args.query), limit=6, vehicles=vehicles, vehicle_boost=1.0),
+        ),
+        (
+            "CatalogSearchRepository.search (vehicle filter)",
+            lambda: catalog.search(normalize_query(args.query), limit=6, vehicles=vehicles),
+        ),
+        (
+            "CatalogSearchRepository.find_by_part_number",
+            lambda: catalog.find_by_part_number(normalize_part_number(args.part_number), limit=5),
+        ),
+        ("UserRepository.get_by_id", lambda: users.get_by_id(args.item_id)),
+        ("UserRepository.get_user_by_telegram_id", lambda: users.get_user_by_telegram_id(args.tg_uid)),
+        ("UserRepository.get_user_by_phone", lambda: users.get_user_by_phone(args.phone)),
+        ("UserRepository.get_all", lambda: users.get_all(limit=100, after=args.item_id, estimate_total=True)),
+        ("UserCarsRepository.get_vehicles", lambda: user_cars.get_vehicles(args.item_id)),
+        ("ContactRepository.get_all", lambda: contacts.get_all()),
+        ("ContactRepository.get_fingerprint", lambda: contacts.get_fingerprint()),
+        ("ContactRepository.get_contact_by_phone", lambda: contacts.get_contact_by_phone(args.phone)),
+    ]
+
+
+def collect_plans(args: argparse.Namespace) -> list[QueryPlan]:
+    """
+    Выполняет вызовы репозиториев, перехватывает их SQL и строит для него планы.
+
+    Args:
+        args (argparse.Namespace): Аргументы командной строки.
+
+    Returns:
+        list[QueryPlan]: Планы всех перехваченных запросов.
+    """
+    engine = get_engine()
+    captured: list[tuple[str, str, Any]] = []
+    current_label = [""]
+
+    def capture(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        captured.append((current_label[0], statement, parameters))
+
+    sa.event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for label, call in repository_calls(args):
+            current_label[0] = label
+            call()
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", capture)
+
+    explain = "EXPLAIN (ANALYZE, BUFFERS) " if args.analyze else "EXPLAIN "
+    plans = []
+    with engine.connect() as connection:
+        if args.no_seqscan:
+            connection.exec_driver_sql("SET enable_seqscan = off")
+        for label, statement, parameters in captured:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            rows = connection.exec_driver_sql(explain + statement, parameters).all()
+            plans.append(QueryPlan(label=label, statement=statement, plan=[row[0] for row in rows]))
+        connection.rollback()
+    return plans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Отчет EXPLAIN по запросам репозиториев")
+    parser.add_argument("--query", default="фильтры", help="Поисковый запрос для get_all")
+    parser.add_argument("--part-number", default="AB-00012.3", help="Артикул для поиска по артикулу")
+    parser.add_argument("--tg-uid", default="0", help="Telegram ID для поиска пользователя")
+    parser.add_argument("--phone", default="+70000000000", help="Телефон для поиска пользователя и контакта")
+    parser.add_argument("--item-id", default="00000000-0000-0000-0000-000000000000", help="ID для get_by_id")
+    parser.add_argument("--analyze", action="store_true", help="Выполнять запросы (EXPLAIN ANALYZE)")
+    parser.add_argument(
+        "--no-seqscan",
+        action="store_true",
+        help="Запретить планировщику Seq Scan, чтобы проверить наличие индексов на маленьких таблицах",
+    )
+    parser.add_argument("--fail-on-seqscan", action="store_true", help="Завершиться с кодом 1 при наличии Seq Scan")
+    args = parser.parse_args()
+
+    plans = collect_plans(args)
+    regressions = []
+    for plan in plans:
+        print(f"=== {plan.label}")
+        print(plan.statement.strip())
+        print()
+        print("\n".join(plan.plan))
+        print()
+        if plan.seq_scans and plan.label not in FULL_SCAN_EXPECTED:
+            regressions.append(plan)
+
+    if regressions:
+        print("Seq Scan detected:")
+        for plan in regressions:
+            for line in plan.seq_scans:
+                print(f"  {plan.label}: {line}")
+        if args.fail_on_seqscan:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import sys
+
+from zapchastimira.services.catalog_import import FORMATS, CatalogImportError, ImportReport, import_catalog
+
+
+def print_progress(report: ImportReport) -> None:
+    print(
+        f"batch {report.batches}: {report.rows_read} rows read, {report.rows_imported} imported, "
+        f"{len(report.errors)} errors, {report.rows_per_second:.0f} rows/s",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Импорт запчастей или товаров из CSV, JSONL или XLSX",
+        epilog="Кэш поиска хранится в памяти процессов бота, поэтому запущенный бот начнет находить "
+        "импортированные строки не позже чем через CACHE_SEARCH_TTL секунд.",
+    )
+    parser.add_argument("kind", choices=["parts", "products"], help="Что импортировать")
+    parser.add_argument("path", help="Путь к файлу; колонки называются как поля PartDTO или ProductDTO")
+    parser.add_argument("--format", choices=FORMATS, help="Формат файла; по умолчанию по расширению")
+    parser.add_argument("--delimiter", help="Разделитель CSV; по умолчанию определяется автоматически")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Количество строк в одной транзакции")
+    parser.add_argument("--max-errors", type=int, default=20, help="Сколько ошибок строк напечатать")
+    parser.add_argument("--strict", action="store_true", help="Завершиться с кодом 1, если есть ошибки строк")
+    parser.add_argument("--quiet", action="store_true", help="Не печатать прогресс после каждого пакета")
+    args = parser.parse_args()
+
+    try:
+        report = import_catalog(
+            args.path,
+            args.kind,
+            batch_size=args.batch_size,
+            file_format=args.format,
+            delimiter=args.delimiter,
+            progress=None if args.quiet else print_progress,
+        )
+    except CatalogImportError as exc:
+        parser.error(str(exc))
+
+    for error in report.errors[: args.max_errors]:
+        print(f"line {error.line}: {error.message}")
+    if len(report.errors) > args.max_errors:
+        print(f"... {len(report.errors) - args.max_errors} more errors")
+    print(
+        f"Imported {report.rows_imported} of {report.rows_read} rows in {report.batches} batches, "
+        f"{report.elapsed:.1f} s, {report.rows_per_second:.0f} rows/s, {len(report.errors)} errors"
+    )
+    if args.strict and report.errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
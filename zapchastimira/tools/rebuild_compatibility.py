@@ -0,0 +1,36 @@
+import argparse
+import sys
+
+from zapchastimira.services.compatibility_index import rebuild_compatibility_index
+from zapchastimira.services.search_vector import RebuildReport
+
+
+def print_progress(report: RebuildReport) -> None:
+    print(f"{report.table}: batch {report.batches}, {report.rows} parts, {report.elapsed:.1f} s", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Пересборка индекса совместимости запчастей с автомобилями",
+        epilog="Кэш поиска хранится в памяти процессов бота, поэтому запущенный бот начнет учитывать "
+        "новый индекс не позже чем через CACHE_SEARCH_TTL секунд.",
+    )
+    parser.add_argument("--batch-size", type=int, default=5000, help="Количество запчастей в одной транзакции")
+    parser.add_argument("--pause", type=float, default=0.0, help="Пауза между пакетами в секундах")
+    parser.add_argument("--quiet", action="store_true", help="Не печатать прогресс после каждого пакета")
+    args = parser.parse_args()
+
+    report = rebuild_compatibility_index(
+        batch_size=args.batch_size,
+        pause=args.pause,
+        progress=None if args.quiet else print_progress,
+    )
+    rate = report.rows / report.elapsed if report.elapsed else 0.0
+    print(
+        f"{report.table}: indexed {report.rows} parts in {report.batches} batches, "
+        f"{report.elapsed:.1f} s ({rate:.0f} parts/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import sys
+
+from zapchastimira.services.search_vector import RebuildReport, rebuild_search_vectors
+
+TABLES = ["parts", "products"]
+
+
+def print_progress(report: RebuildReport) -> None:
+    print(f"{report.table}: batch {report.batches}, {report.rows} rows, {report.elapsed:.1f} s", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Пакетная пересборка поисковых векторов запчастей и товаров",
+        epilog="Кэш поиска хранится в памяти процессов бота, поэтому запущенный бот начнет находить "
+        "по новым векторам не позже чем через CACHE_SEARCH_TTL секунд.",
+    )
+    parser.add_argument(
+        "--table", dest="tables", action="append", choices=TABLES, help="Какую таблицу пересобрать; по умолчанию обе"
+    )
+    parser.add_argument("--batch-size", type=int, default=5000, help="Количество строк в одной транзакции")
+    parser.add_argument("--pause", type=float, default=0.0, help="Пауза между пакетами в секундах")
+    parser.add_argument("--quiet", action="store_true", help="Не печатать прогресс после каждого пакета")
+    args = parser.parse_args()
+
+    for table in args.tables or TABLES:
+        report = rebuild_search_vectors(
+            table,
+            batch_size=args.batch_size,
+            pause=args.pause,
+            progress=None if args.quiet else print_progress,
+        )
+        rate = report.rows / report.elapsed if report.elapsed else 0.0
+        print(
+            f"{table}: rebuilt {report.rows} rows in {report.batches} batches, "
+            f"{report.elapsed:.1f} s ({rate:.0f} rows/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
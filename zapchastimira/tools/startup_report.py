@@ -0,0 +1,204 @@
+"""
+Отчет о времени холодного запуска бота.
+
+Запускает новые процессы Python, как при старте контейнера, и выводит:
+
+- время до готовности к приему обновлений по этапам: запуск интерпретатора,
+  импорт модуля бота, загрузка настроек, создание бота с обработчиками;
+- прогрев: первое подключение к базе и сборка готовых ответов с деревом
+  категорий. Синхронный бот и webhook прогреваются в фоне, уже принимая
+  обновления, асинхронный — до начала приема;
+- разбор импорта в духе `python -X importtime` по подсистемам: пакеты
+  `zapchastimira.*`, сторонние библиотеки и стандартная библиотека, и самые
+  медленные модули.
+
+Настройки бота и базы берутся из переменных окружения, как при обычном запуске.
+
+Примеры:
+    python -m zapchastimira.tools.startup_report
+    python -m zapchastimira.tools.startup_report --module zapchastimira.interface.webhook --budget 1.0 \\
+        --fail-over-budget
+"""
+
+import argparse
+import importlib
+import json
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+PACKAGE = "zapchastimira"
+BOT_MODULES = [
+    "zapchastimira.interface.telegram",
+    "zapchastimira.interface.webhook",
+    "zapchastimira.interface.async_bot",
+]
+READY_PHASES = ("interpreter", "import", "settings", "bot")
+WARMUP_PHASES = ("database", "replies")
+# Асинхронный бот собирает готовые ответы до начала приема обновлений (см. `async_bot.run`).
+BLOCKING_WARMUP = {"zapchastimira.interface.async_bot"}
+# Подсистемы с меньшей долей времени импорта объединяются в `other`.
+MIN_SHARE = 0.01
+
+
+@dataclass
+class ImportRecord:
+    """
+    Строка отчета `-X importtime`.
+
+    Attributes:
+        module (str): Имя модуля.
+        self_time (float): Время импорта самого модуля без вложенных импортов в секундах.
+        cumulative (float): Время импорта вместе с вложенными импортами в секундах.
+    """
+
+    module: str
+    self_time: float
+    cumulative: float
+
+    @property
+    def subsystem(self) -> str:
+        """
+        Подсистема модуля: подпакет `zapchastimira`, сторонняя библиотека или `stdlib`.
+
+        Returns:
+            str: Имя подсистемы.
+        """
+        parts = self.module.split(".")
+        if parts[0] == PACKAGE:
+            return ".".join(parts[:2])
+        if parts[0] in sys.stdlib_module_names or parts[0].startswith("_"):
+            return "stdlib"
+        return parts[0]
+
+
+def measure_imports(module: str) -> list[ImportRecord]:
+    """
+    Импортирует модуль в новом процессе с `-X importtime` и разбирает отчет.
+
+    Args:
+        module (str): Импортируемый модуль.
+
+    Returns:
+        list[ImportRecord]: Модули в порядке завершения импорта.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line.removeprefix("import time:").split("|")
+        records.append(ImportRecord(name.strip(), int(self_time) / 1e6, int(cumulative) / 1e6))
+    return records
+
+
+def measure_phases(module: str) -> dict[str, float | str]:
+    """
+    Запускает бота до готовности к приему обновлений в новом процессе и замеряет этапы.
+
+    Args:
+        module (str): Модуль бота.
+
+    Returns:
+        dict[str, float | str]: Длительность этапов в секундах; при ошибке прогрева — ее текст
+            по ключу `warmup_error`.
+    """
+    spawned = time.time()
+    result = subprocess.run(
+        [sys.executable, "-m", __spec__.name, "--phases-of", module], capture_output=True, text=True, check=True
+    )
+    phases = json.loads(result.stdout.splitlines()[-1])
+    phases["interpreter"] = phases.pop("started") - spawned
+    return phases
+
+
+def run_phases(module: str) -> None:
+    # Выполняется в отдельном процессе: модули бота еще не импортированы.
+    phases: dict[str, float | str] = {"started": time.time()}
+
+    def timed(name: str, step: Callable[[], object]) -> None:
+        started = time.perf_counter()
+        step()
+        phases[name] = time.perf_counter() - started
+
+    timed("import", lambda: importlib.import_module(module))
+    from zapchastimira.interface.telegram import app
+
+    timed("settings", lambda: app.settings)
+    # Асинхронный бот создается своей фабрикой, синхронный и webhook — через `app`.
+    timed("bot", getattr(sys.modules[module], "get_async_bot", lambda: app.bot))
+
+    # Дальше — то, что при запуске выполняется в фоне, уже после начала приема обновлений.
+    from zapchastimira.common.db_utils import get_engine
+    from zapchastimira.interface.replies import replies
+
+    try:
+        timed("database", lambda: get_engine().connect().close())
+        timed("replies", replies.refresh)
+    except Exception as exc:
+        phases["warmup_error"] = f"{type(exc).__name__}: {exc}".splitlines()[0]
+    print(json.dumps(phases))
+
+
+def print_report(
+    module: str, phases: dict[str, float | str], records: list[ImportRecord], budget: float, top: int
+) -> bool:
+    blocking = module in BLOCKING_WARMUP
+    ready_phases = READY_PHASES + WARMUP_PHASES if blocking else READY_PHASES
+    ready = sum(float(phases.get(name, 0.0)) for name in ready_phases)
+    print(f"{module}: ready to receive updates in {ready * 1000:.0f} ms (budget {budget * 1000:.0f} ms)")
+    for name in READY_PHASES:
+        print(f"  {name:<14}{float(phases[name]) * 1000:>8.1f} ms")
+    print("warm-up (before receiving updates):" if blocking else "warm-up (in background):")
+    if "warmup_error" in phases:
+        print(f"  failed: {phases['warmup_error']}")
+    for name in WARMUP_PHASES:
+        if name in phases:
+            print(f"  {name:<14}{float(phases[name]) * 1000:>8.1f} ms")
+
+    total = sum(record.self_time for record in records)
+    spent_by_subsystem: dict[str, float] = {}
+    for record in records:
+        spent_by_subsystem[record.subsystem] = spent_by_subsystem.get(record.subsystem, 0.0) + record.self_time
+    subsystems: dict[str, list[ImportRecord]] = {}
+    for record in records:
+        name = record.subsystem if spent_by_subsystem[record.subsystem] >= total * MIN_SHARE else "other"
+        subsystems.setdefault(name, []).append(record)
+    print(f"imports: {len(records)} modules, {total * 1000:.0f} ms (with -X importtime overhead)")
+    for name, group in sorted(subsystems.items(), key=lambda item: -sum(record.self_time for record in item[1])):
+        spent = sum(record.self_time for record in group)
+        print(f"  {name:<36}{spent * 1000:>8.1f} ms{spent / total:>7.0%}{len(group):>6} modules")
+    print("slowest modules (self time):")
+    for record in sorted(records, key=lambda record: -record.self_time)[:top]:
+        print(f"  {record.module:<48}{record.self_time * 1000:>8.1f} ms")
+    return ready <= budget
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Отчет о времени холодного запуска бота")
+    parser.add_argument("--module", choices=BOT_MODULES, default=BOT_MODULES[0], help="Модуль запуска бота")
+    parser.add_argument("--budget", type=float, default=1.0, help="Допустимое время до готовности в секундах")
+    parser.add_argument("--top", type=int, default=15, help="Сколько самых медленных модулей показать")
+    parser.add_argument(
+        "--fail-over-budget", action="store_true", help="Завершиться с ошибкой, если запуск дольше бюджета"
+    )
+    parser.add_argument("--phases-of", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phases_of:
+        run_phases(args.phases_of)
+        return
+
+    within_budget = print_report(
+        args.module, measure_phases(args.module), measure_imports(args.module), args.budget, args.top
+    )
+    if args.fail_over_budget and not within_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
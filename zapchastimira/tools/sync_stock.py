@@ -0,0 +1,53 @@
+import argparse
+import sys
+
+from zapchastimira.services.catalog_import import FORMATS, CatalogImportError
+from zapchastimira.services.stock_sync import SyncReport, sync_stock
+
+
+def print_progress(report: SyncReport) -> None:
+    print(
+        f"{report.received} changes: {report.updated} updated, {report.unchanged} unchanged, "
+        f"{len(report.unknown)} unknown, {report.rows_per_second:.0f} rows/s",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Синхронизация цен и остатков запчастей по ленте изменений",
+        epilog="Кэш поиска хранится в памяти процессов бота, поэтому в результатах поиска запущенного бота "
+        "новые цены и остатки появятся не позже чем через CACHE_SEARCH_TTL секунд.",
+    )
+    parser.add_argument("path", help="CSV, JSONL или XLSX с колонками part_number, price, stock_quantity")
+    parser.add_argument("--format", choices=FORMATS, help="Формат файла; по умолчанию по расширению")
+    parser.add_argument("--delimiter", help="Разделитель CSV; по умолчанию определяется автоматически")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Количество изменений в одной транзакции")
+    parser.add_argument("--max-errors", type=int, default=20, help="Сколько ошибок и неизвестных артикулов напечатать")
+    parser.add_argument("--quiet", action="store_true", help="Не печатать прогресс после каждого пакета")
+    args = parser.parse_args()
+
+    try:
+        report = sync_stock(
+            args.path,
+            batch_size=args.batch_size,
+            file_format=args.format,
+            delimiter=args.delimiter,
+            progress=None if args.quiet else print_progress,
+        )
+    except CatalogImportError as exc:
+        parser.error(str(exc))
+
+    for error in report.errors[: args.max_errors]:
+        print(f"line {error.line}: {error.message}")
+    for part_number in report.unknown[: args.max_errors]:
+        print(f"unknown part_number: {part_number}")
+    print(
+        f"Received {report.received} changes in {report.elapsed:.1f} s ({report.rows_per_second:.0f} rows/s): "
+        f"{report.updated} updated, {report.unchanged} unchanged, {len(report.unknown)} unknown, "
+        f"{len(report.errors)} errors"
+    )
+
+
+if __name__ == "__main__":
+    main()